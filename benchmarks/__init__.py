@@ -0,0 +1 @@
+# Backend __init__ files to make packages
@@ -0,0 +1,256 @@
+"""
+Attendance hot-path benchmarks.
+
+Drives the real FastAPI app in-process through httpx's ASGI transport against
+an in-memory Mongo stand-in (mongomock-motor), or a scratch database on a real
+server with --mongo-uri. Reports throughput, p50/p95/p99 latency and peak
+memory per scenario as JSON, optionally compared against a stored baseline.
+
+Usage (from the backend folder):
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.run --employees 1000 --days 30 --output bench.json
+    python -m benchmarks.run --employees 10000 --days 365 --baseline bench.json
+    python -m benchmarks.run --scenarios list_attendance list_employees --page-size 1000 [--no-fast-json]
+
+Large scales (100k employees, 365 days) are only practical with --mongo-uri;
+the database named by --database is dropped before seeding.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import httpx
+
+import database
+from services.attendance_codec import encode_fields
+
+SCENARIOS = ("mark_in", "mark_out", "dashboard_summary", "list_attendance", "list_employees")
+SEED_BATCH = 10_000
+
+
+def _employee_id(n: int) -> str:
+    return f"EMP{n:06d}"
+
+
+async def seed(employees: int, days: int, today: date) -> None:
+    """Employees on a 09:00–18:00 shift plus `days` of history before `today`."""
+    db = database.get_database()
+    await db["employees"].delete_many({})
+    await db["attendance"].delete_many({})
+
+    batch = []
+    for n in range(employees):
+        batch.append({
+            "employee_id": _employee_id(n),
+            "full_name": f"Employee {n}",
+            "email": f"employee{n}@example.com",
+            "department": f"Dept {n % 20}",
+            "shift_start_time": "09:00",
+            "shift_end_time": "18:00",
+        })
+        if len(batch) >= SEED_BATCH:
+            await db["employees"].insert_many(batch)
+            batch = []
+    if batch:
+        await db["employees"].insert_many(batch)
+
+    statuses = ("Present", "Late", "Early Exit", "Late & Early Exit")
+    batch = []
+    for day in range(1, days + 1):
+        att_date = str(today - timedelta(days=day))
+        for n in range(employees):
+            batch.append(encode_fields({
+                "employee_id": _employee_id(n),
+                "date": att_date,
+                "in_time": "09:05",
+                "out_time": "18:02",
+                "status": statuses[(n + day) % len(statuses)],
+            }))
+            if len(batch) >= SEED_BATCH:
+                await db["attendance"].insert_many(batch)
+                batch = []
+    if batch:
+        await db["attendance"].insert_many(batch)
+
+
+def _requests(scenario: str, count: int, employees: int, today: date, page_size: int):
+    """(method, url, json) for each iteration of a scenario."""
+    att_date = str(today)
+    for i in range(count):
+        employee_id = _employee_id(i % employees)
+        if scenario == "mark_in":
+            yield "POST", "/attendance/mark-in", {"employee_id": employee_id, "date": att_date, "in_time": "09:10"}
+        elif scenario == "mark_out":
+            yield "POST", "/attendance/mark-out", {"employee_id": employee_id, "date": att_date, "out_time": "18:05"}
+        elif scenario == "dashboard_summary":
+            yield "GET", f"/dashboard/summary?date={att_date}", None
+        elif scenario == "list_attendance":
+            yield "GET", f"/attendance?limit={page_size}", None
+        elif scenario == "list_employees":
+            yield "GET", f"/employees?limit={page_size}", None
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: str, args, today: date) -> dict:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+    errors: dict[int, int] = {}
+
+    async def one(method: str, url: str, body) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    # mark_in / mark_out touch each employee at most once per date
+    count = args.requests
+    if scenario in ("mark_in", "mark_out"):
+        count = min(count, args.employees)
+
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    requests = _requests(scenario, count, args.employees, today, args.page_size)
+    await asyncio.gather(*(one(*request) for request in requests))
+    cpu_seconds = time.process_time() - cpu_started
+    elapsed = time.perf_counter() - started
+    peak_traced_mb = None
+    if args.trace_memory:
+        peak_traced_mb = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        tracemalloc.stop()
+
+    latencies.sort()
+    rows = count * args.page_size if scenario.startswith("list_") else None
+    return {
+        "requests": count,
+        "errors": errors,
+        "cpu_seconds": round(cpu_seconds, 3),
+        # in-process CPU (app + client + mongomock) per 10k returned rows, for the list scenarios
+        "cpu_ms_per_10k_rows": round(cpu_seconds * 1000 / rows * 10_000, 2) if rows else None,
+        "throughput_rps": round(count / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "p99": round(_percentile(latencies, 99), 3),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+        "peak_traced_mb": peak_traced_mb,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return round(rss / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def compare(results: dict, baseline: dict) -> dict:
+    """Percentage change per scenario against a previous run (positive = slower / fewer rps)."""
+    deltas = {}
+    for scenario, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scenario)
+        if not previous:
+            continue
+        entry = {}
+        for pct in ("p50", "p95", "p99"):
+            before = previous["latency_ms"][pct]
+            if before:
+                entry[f"{pct}_pct"] = round((current["latency_ms"][pct] - before) / before * 100, 1)
+        if previous.get("throughput_rps"):
+            entry["throughput_pct"] = round(
+                (current["throughput_rps"] - previous["throughput_rps"]) / previous["throughput_rps"] * 100, 1
+            )
+        deltas[scenario] = entry
+    return deltas
+
+
+async def main(args) -> dict:
+    if args.mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        database.DATABASE_NAME = args.database
+        database.connect(AsyncIOMotorClient(args.mongo_uri))
+        await database.get_client().drop_database(args.database)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        from tests import mongomock_compat
+        mongomock_compat.install()
+        database.connect(AsyncMongoMockClient())
+
+    from main import app
+    from services import responses, sessions
+    responses.FAST_JSON_RESPONSES = not args.no_fast_json
+
+    today = date.today()
+    seed_started = time.perf_counter()
+    await seed(args.employees, args.days, today)
+    seed_seconds = round(time.perf_counter() - seed_started, 2)
+
+    results = {
+        "config": {
+            "employees": args.employees,
+            "days": args.days,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "page_size": args.page_size,
+            "fast_json": not args.no_fast_json,
+            "backend": "mongodb" if args.mongo_uri else "mongomock",
+            "python": platform.python_version(),
+        },
+        "seed_seconds": seed_seconds,
+        "scenarios": {},
+    }
+    token, _ = sessions.issue_token("bench", "Benchmark", "admin")
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        for scenario in args.scenarios:
+            results["scenarios"][scenario] = await run_scenario(client, scenario, args, today)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            results["vs_baseline"] = compare(results, json.load(fh))
+    database.close()
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=1000, help="seeded employees (e.g. 1000, 10000, 100000)")
+    parser.add_argument("--days", type=int, default=30, help="days of seeded history (e.g. 30, 365)")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=50, help="in-flight requests")
+    parser.add_argument("--page-size", type=int, default=100, help="limit for the list scenarios (max 1000)")
+    parser.add_argument("--no-fast-json", action="store_true", help="serialize list responses via response_model")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--mongo-uri", help="benchmark a real MongoDB instead of mongomock")
+    parser.add_argument("--database", default="hrms_bench", help="scratch database (dropped!) with --mongo-uri")
+    parser.add_argument("--trace-memory", action="store_true", help="track peak Python allocations (slower)")
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--baseline", help="compare against a previous results JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    report = asyncio.run(main(arguments))
+    text = json.dumps(report, indent=2)
+    if arguments.output:
+        with open(arguments.output, "w") as fh:
+            fh.write(text + "\n")
+    print(text)
@@ -1,6 +1,10 @@
 import os
+import threading
+from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
 from dotenv import load_dotenv
+from services.metrics import command_timer
 
 load_dotenv()
 
@@ -8,11 +12,150 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "hrms_lite")
 
-# ── Client & Database ─────────────────────────────────────────────
-client = AsyncIOMotorClient(MONGO_URI)
-db = client[DATABASE_NAME]
+# ── Pool Config (unset values fall back to the driver defaults) ───
+POOL_OPTIONS = {
+    "maxPoolSize": os.getenv("MONGO_MAX_POOL_SIZE"),
+    "minPoolSize": os.getenv("MONGO_MIN_POOL_SIZE"),
+    "maxIdleTimeMS": os.getenv("MONGO_MAX_IDLE_TIME_MS"),
+    "waitQueueTimeoutMS": os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+    "serverSelectionTimeoutMS": os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS"),
+}
+READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+
+
+def client_options() -> dict:
+    options = {name: int(value) for name, value in POOL_OPTIONS.items() if value}
+    options["readPreference"] = READ_PREFERENCE
+    return options
+
+
+# ── Pool Monitoring ───────────────────────────────────────────────
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters per server, fed by driver pool events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers: dict[str, dict] = {}
+
+    def _bump(self, address, **changes) -> None:
+        key = "%s:%s" % address
+        with self._lock:
+            stats = self._servers.setdefault(key, {
+                "open": 0, "in_use": 0, "waiting": 0,
+                "created_total": 0, "checkout_failed_total": 0, "cleared_total": 0,
+            })
+            for field, delta in changes.items():
+                stats[field] += delta
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {address: dict(stats) for address, stats in self._servers.items()}
+
+    def pool_created(self, event):
+        self._bump(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._bump(event.address, cleared_total=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._bump(event.address, open=1, created_total=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._bump(event.address, open=-1)
+
+    def connection_check_out_started(self, event):
+        self._bump(event.address, waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._bump(event.address, waiting=-1, checkout_failed_total=1)
+
+    def connection_checked_out(self, event):
+        self._bump(event.address, waiting=-1, in_use=1)
+
+    def connection_checked_in(self, event):
+        self._bump(event.address, in_use=-1)
+
+
+pool_stats = PoolStats()
+
+# ── Client Lifecycle ──────────────────────────────────────────────
+# The client is built inside the running event loop by the app lifespan
+# (`connect()` / `close()`); scripts get one lazily on first use.
+_client: Optional[AsyncIOMotorClient] = None
+
+
+def connect(client: AsyncIOMotorClient = None) -> AsyncIOMotorClient:
+    """Create the shared client (or install the given one) if none exists yet."""
+    global _client
+    if _client is None:
+        _client = client or AsyncIOMotorClient(
+            MONGO_URI, event_listeners=[pool_stats, command_timer], **client_options()
+        )
+    return _client
+
+
+def close() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def get_client() -> AsyncIOMotorClient:
+    return connect()
+
+
+def get_database():
+    return get_client()[DATABASE_NAME]
+
+
+class _Lazy:
+    """Resolves to the real Motor object for the current client on attribute access."""
+
+    def __init__(self, collection_name: str = None):
+        self._collection_name = collection_name
+        self._bound_client = None
+        self._target = None
+
+    def _resolve(self):
+        client = get_client()
+        if self._bound_client is not client:
+            database = client[DATABASE_NAME]
+            self._target = database[self._collection_name] if self._collection_name else database
+            self._bound_client = client
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __getitem__(self, name):
+        return self._resolve()[name]
+
+    def __repr__(self) -> str:
+        return f"<lazy {self._collection_name or DATABASE_NAME}>"
+
+
+# ── Database ──────────────────────────────────────────────────────
+db = _Lazy()
 
 # ── Collections (single source of truth for the whole application) ─
-employees_collection = db["employees"]
-attendance_collection = db["attendance"]
-admins_collection = db["admins"]
+employees_collection = _Lazy("employees")
+attendance_collection = _Lazy("attendance")
+attendance_archive_collection = _Lazy("attendance_archive")
+admins_collection = _Lazy("admins")
+daily_summary_collection = _Lazy("daily_summary")
+cache_versions_collection = _Lazy("cache_versions")
+revoked_sessions_collection = _Lazy("revoked_sessions")
+monthly_rollup_collection = _Lazy("monthly_rollup")
+report_months_collection = _Lazy("report_months")
+migrations_collection = _Lazy("migrations")
+purge_jobs_collection = _Lazy("purge_jobs")
@@ -1,15 +1,81 @@
-from fastapi import FastAPI
+import os
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from pymongo.errors import PyMongoError
+import database
+from database import db
+from services import (
+    attendance_archive,
+    attendance_close,
+    attendance_coalescer,
+    auto_absent,
+    employee_purge,
+    employee_search,
+    metrics,
+    sessions,
+)
+from services.indexes import ensure_indexes, check_query_plans
 from routes.employees import router as employees_router
 from routes.attendance import router as attendance_router
 from routes.admin import router as admin_router
-from routes.dashboard import router as dashboard_router
+from routes.dashboard import router as dashboard_router, stream_router as dashboard_stream_router
+from routes.reports import router as reports_router
+
+logger = logging.getLogger("hrms")
+
+AUTO_CREATE_INDEXES = os.getenv("AUTO_CREATE_INDEXES", "true").lower() in ("1", "true", "yes")
+QUERY_PLAN_CHECK = os.getenv("QUERY_PLAN_CHECK", "false").lower() in ("1", "true", "yes")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The Mongo client is created inside the running loop and closed on shutdown
+    database.connect()
+
+    # Make sure a fresh deployment never serves requests off collection scans
+    try:
+        if AUTO_CREATE_INDEXES:
+            await ensure_indexes(db)
+            await employee_search.backfill_search_fields()
+        if QUERY_PLAN_CHECK:
+            for entry in await check_query_plans(db):
+                if entry["collscan"]:
+                    logger.warning("COLLSCAN for query shape: %s", entry["query"])
+    except PyMongoError:
+        logger.exception("Index bootstrap failed; continuing without it")
+
+    tasks = [
+        asyncio.create_task(sessions.revocation_refresher()),
+        asyncio.create_task(employee_purge.purge_worker()),
+    ]
+    if auto_absent.AUTO_ABSENT:
+        tasks.append(asyncio.create_task(auto_absent.auto_absent_scheduler()))
+    if attendance_close.AUTO_CLOSE:
+        tasks.append(asyncio.create_task(attendance_close.auto_close_scheduler()))
+    if attendance_archive.ATTENDANCE_ARCHIVE:
+        tasks.append(asyncio.create_task(attendance_archive.archive_scheduler()))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Coalesced attendance writes already accepted must land before the client closes
+        await attendance_coalescer.drain()
+        database.close()
+
 
 app = FastAPI(
     title="HRMS Lite API",
     description="Human Resource Management System - Lite Edition",
     version="1.0.0",
+    lifespan=lifespan,
 )
+app.router.route_class = metrics.TimedRoute
 
 # CORS — allow all origins for development; restrict to frontend URL in production
 app.add_middleware(
@@ -18,12 +84,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """Server-Timing header plus per-route latency, DB and serialization histograms."""
+    stats = metrics.start_request()
+    started = time.perf_counter()
+    response = await call_next(request)
+    total_ms = (time.perf_counter() - started) * 1000
+
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", "unmatched")
+    response.headers["Server-Timing"] = stats.server_timing(total_ms)
+    metrics.observe(request.method, route_path, response.status_code, total_ms, stats)
+    return response
+
+# Session checks are in-memory HMAC verification — no database round trip
+protected = [Depends(sessions.require_session)]
 app.include_router(admin_router)
-app.include_router(employees_router)
-app.include_router(attendance_router)
-app.include_router(dashboard_router)
+app.include_router(employees_router, dependencies=protected)
+app.include_router(attendance_router, dependencies=protected)
+app.include_router(dashboard_router, dependencies=protected)
+app.include_router(dashboard_stream_router)
+app.include_router(reports_router, dependencies=protected)
 
 
 @app.get("/health", tags=["Health"])
@@ -31,6 +117,40 @@ async def health_check():
     return {"status": "ok", "message": "HRMS Lite API is running"}
 
 
+@app.get("/health/details", tags=["Health"])
+async def health_details():
+    """Ping latency and connection pool stats, for load balancer health checks."""
+    started = time.perf_counter()
+    try:
+        await db.command("ping")
+    except PyMongoError as exc:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "error": str(exc), "pool": database.pool_stats.snapshot()},
+        )
+    return {
+        "status": "ok",
+        "ping_ms": round((time.perf_counter() - started) * 1000, 2),
+        "pool": database.pool_stats.snapshot(),
+        "pool_options": database.client_options(),
+    }
+
+
+@app.get("/health/query-plans", tags=["Health"], dependencies=protected)
+async def query_plan_check():
+    """Explain every route query shape and flag any that fall back to COLLSCAN."""
+    report = await check_query_plans(db)
+    return {
+        "status": "degraded" if any(entry["collscan"] for entry in report) else "ok",
+        "queries": report,
+    }
+
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/", tags=["Root"])
 async def root():
     return {"message": "Welcome to HRMS Lite API. Visit /docs for Swagger UI."}
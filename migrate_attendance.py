@@ -0,0 +1,136 @@
+"""
+HRMS Lite — Attendance storage migration
+----------------------------------------
+Converts attendance records from "YYYY-MM-DD" / "HH:MM" strings to native
+types (BSON datetime date, minutes-since-midnight times) in place.
+
+Records are converted server-side in _id order, --batch-size at a time, with
+one pipeline update per batch; the last converted _id is checkpointed in the
+`migrations` collection, so an interrupted run picks up where it stopped.
+Values that do not parse are left as strings, and a batch the server rejects
+is retried record by record, so one bad record never blocks the run; both
+are reported at the end for review.
+
+Cut-over:
+  1. deploy with ATTENDANCE_STORAGE=dual (new writes native, reads match both)
+  2. python migrate_attendance.py
+  3. once it reports no string records left, switch to ATTENDANCE_STORAGE=native
+
+Usage:
+    python migrate_attendance.py [--batch-size 5000] [--restart]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+from database import close, attendance_collection, migrations_collection
+from services.attendance_codec import ATTENDANCE_STORAGE, has_string_fields, to_native_stage
+
+MIGRATION_ID = "attendance_native_types"
+DUPLICATE_KEY = 11000
+
+
+async def _convert_batch(first_id, last_id) -> tuple[int, int, int]:
+    """Convert one _id range; returns (converted, conflicts, failed)."""
+    batch_filter = {"_id": {"$gte": first_id, "$lte": last_id}, **has_string_fields()}
+    try:
+        result = await attendance_collection.update_many(batch_filter, [to_native_stage()])
+        return result.modified_count, 0, 0
+    except OperationFailure as exc:
+        print(f"  ⚠️   Batch {first_id}..{last_id} failed ({exc}); converting record by record")
+
+    # Some record in the range cannot be converted (a native record already
+    # exists for its employee_id / date, or the server rejects the value):
+    # convert the rest one by one and leave the failing records for review
+    ids = await attendance_collection.distinct("_id", batch_filter)
+    try:
+        result = await attendance_collection.bulk_write(
+            [UpdateOne({"_id": _id}, [to_native_stage()]) for _id in ids], ordered=False,
+        )
+        return result.modified_count, 0, 0
+    except BulkWriteError as exc:
+        conflicts = failed = 0
+        for error in exc.details.get("writeErrors", []):
+            if error.get("code") == DUPLICATE_KEY:
+                conflicts += 1
+                continue
+            failed += 1
+            print(f"  ❌  _id {ids[error['index']]}: {error.get('errmsg')}")
+        return exc.details.get("nModified", 0), conflicts, failed
+
+
+async def migrate(batch_size: int, restart: bool) -> None:
+    print("\n🚚  HRMS Lite — Attendance storage migration")
+    print("=" * 40)
+
+    if restart:
+        await migrations_collection.delete_one({"_id": MIGRATION_ID})
+    state = await migrations_collection.find_one({"_id": MIGRATION_ID}) or {}
+    last_id = state.get("last_id")
+    if last_id is not None:
+        print(f"\n↪️   Resuming after _id {last_id} ({state.get('converted', 0)} converted so far)")
+
+    converted = conflicts = failed = 0
+    while True:
+        page_filter = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        cursor = attendance_collection.find(page_filter, {"_id": 1}).sort("_id", 1).limit(batch_size)
+        ids = [doc["_id"] async for doc in cursor]
+        if not ids:
+            break
+
+        batch_converted, batch_conflicts, batch_failed = await _convert_batch(ids[0], ids[-1])
+        converted += batch_converted
+        conflicts += batch_conflicts
+        failed += batch_failed
+        last_id = ids[-1]
+        await migrations_collection.update_one(
+            {"_id": MIGRATION_ID},
+            {
+                "$set": {"last_id": last_id, "updated_at": datetime.now(timezone.utc)},
+                "$inc": {"converted": batch_converted, "conflicts": batch_conflicts, "failed": batch_failed},
+            },
+            upsert=True,
+        )
+        print(f"  ✅  {converted} converted, up to _id {last_id}")
+
+    remaining = await attendance_collection.count_documents(has_string_fields())
+    await migrations_collection.update_one(
+        {"_id": MIGRATION_ID},
+        {"$set": {"remaining": remaining, "finished_at": datetime.now(timezone.utc)}},
+        upsert=True,
+    )
+    print(f"\n📊  Converted {converted} records this run, {conflicts} duplicate-day conflicts, {failed} failed.")
+    if remaining:
+        print(
+            f"  ⚠️   {remaining} records still hold string values (conflicts or unparseable values) — "
+            "re-run with --restart after fixing them."
+        )
+    else:
+        print("  ✅  No string records left — ATTENDANCE_STORAGE=native is safe to enable.")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=5000, help="records converted per update")
+    parser.add_argument("--restart", action="store_true", help="ignore the saved checkpoint")
+    parser.add_argument("--force", action="store_true", help="run even while ATTENDANCE_STORAGE=string")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    if ATTENDANCE_STORAGE == "string" and not arguments.force:
+        raise SystemExit(
+            "ATTENDANCE_STORAGE=string: the API would stop finding converted records. "
+            "Deploy with ATTENDANCE_STORAGE=dual first (or pass --force)."
+        )
+    try:
+        asyncio.run(migrate(arguments.batch_size, arguments.restart))
+    finally:
+        close()
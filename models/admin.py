@@ -1,5 +1,6 @@
 from pydantic import BaseModel, field_validator
 from typing import Optional
+from datetime import datetime
 
 
 class AdminCreate(BaseModel):
@@ -33,3 +34,9 @@ class AdminResponse(BaseModel):
 class AdminLogin(BaseModel):
     username: str
     password: str
+
+
+class AdminSession(AdminResponse):
+    access_token: str
+    token_type: str = "bearer"
+    expires_at: datetime
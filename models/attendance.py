@@ -1,6 +1,8 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, field_validator, model_validator
 from typing import Literal, Optional
+from typing_extensions import TypedDict
 from datetime import date
+from services.attendance_rules import normalize_time
 
 
 class AttendanceCreate(BaseModel):
@@ -27,8 +29,49 @@ class AttendanceResponse(BaseModel):
     in_time: Optional[str] = None
     out_time: Optional[str] = None
     status: str
+    worked_minutes: Optional[int] = None
+    overtime_minutes: Optional[int] = None
 
     model_config = {"from_attributes": True}
 
 
+class AttendanceRow(TypedDict):
+    """AttendanceResponse as a plain dict, for serializing read results without building models."""
+    id: str
+    employee_id: str
+    date: str
+    in_time: Optional[str]
+    out_time: Optional[str]
+    status: str
+    worked_minutes: Optional[int]
+    overtime_minutes: Optional[int]
+
+
+class AttendanceEvent(BaseModel):
+    """A single event inside a bulk attendance batch."""
+    action: Literal["in", "out", "absent"]
+    employee_id: str
+    date: date
+    in_time: Optional[str] = None
+    out_time: Optional[str] = None
+
+    @field_validator("employee_id")
+    @classmethod
+    def not_empty(cls, v: str) -> str:
+        if not v or not v.strip():
+            raise ValueError("employee_id cannot be empty")
+        return v.strip()
+
+    @field_validator("in_time", "out_time")
+    @classmethod
+    def valid_time(cls, v: Optional[str]) -> Optional[str]:
+        # Stored zero-padded, so "9:05" and "09:05" compare and parse the same
+        return None if v is None else normalize_time(v)
 
+    @model_validator(mode="after")
+    def time_for_action(self) -> "AttendanceEvent":
+        if self.action == "in" and not self.in_time:
+            raise ValueError("in_time is required for action 'in'")
+        if self.action == "out" and not self.out_time:
+            raise ValueError("out_time is required for action 'out'")
+        return self
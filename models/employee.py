@@ -1,4 +1,5 @@
 from pydantic import BaseModel, EmailStr, field_validator
+from typing_extensions import TypedDict
 
 
 
@@ -35,3 +36,28 @@ class EmployeeResponse(BaseModel):
     shift_end_time: str
 
     model_config = {"from_attributes": True}
+
+
+class OffboardRequest(BaseModel):
+    employee_ids: list[str]
+
+    @field_validator("employee_ids")
+    @classmethod
+    def not_empty(cls, v: list[str]) -> list[str]:
+        ids = [employee_id.strip() for employee_id in v if employee_id and employee_id.strip()]
+        if not ids:
+            raise ValueError("employee_ids must contain at least one ID")
+        if len(ids) > 10_000:
+            raise ValueError("At most 10000 employees can be offboarded at once")
+        return ids
+
+
+class EmployeeRow(TypedDict):
+    """EmployeeResponse as a plain dict, for serializing read results without building models."""
+    id: str
+    employee_id: str
+    full_name: str
+    email: str
+    department: str
+    shift_start_time: str
+    shift_end_time: str
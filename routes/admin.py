@@ -1,46 +1,101 @@
 """
-Admin routes — verify admin credentials (no JWT, session-free)
+Admin routes — verify admin credentials and issue signed session tokens
 """
-import hashlib
-from fastapi import APIRouter, HTTPException, status
+import os
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from database import admins_collection
-from models.admin import AdminLogin, AdminResponse
+from models.admin import AdminLogin, AdminResponse, AdminSession
+from services import passwords, sessions
+from services.metrics import TimedRoute
+from services.throttle import TokenBucketThrottle
 
-router = APIRouter(prefix="/admin", tags=["Admin"])
+router = APIRouter(prefix="/admin", tags=["Admin"], route_class=TimedRoute)
 
+# Login attempts: a small burst, then a steady trickle per username and per client IP
+_user_throttle = TokenBucketThrottle(
+    capacity=float(os.getenv("LOGIN_BURST_PER_USER", "5")),
+    refill_per_second=float(os.getenv("LOGIN_RATE_PER_USER", "5")) / 60,
+)
+_ip_throttle = TokenBucketThrottle(
+    capacity=float(os.getenv("LOGIN_BURST_PER_IP", "20")),
+    refill_per_second=float(os.getenv("LOGIN_RATE_PER_IP", "30")) / 60,
+)
 
-def verify_password(password: str, stored: str) -> bool:
-    try:
-        salt, hashed = stored.split(":")
-        return hashlib.sha256(f"{salt}{password}".encode()).hexdigest() == hashed
-    except Exception:
-        return False
+
+def _throttle_login(username: str, request: Request) -> None:
+    user_key = username.lower()
+    ip_key = request.client.host if request.client else "unknown"
+    wait = max(_user_throttle.retry_after(user_key), _ip_throttle.retry_after(ip_key))
+    if wait:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts. Try again later.",
+            headers={"Retry-After": str(wait)},
+        )
+    _user_throttle.consume(user_key)
+    _ip_throttle.consume(ip_key)
 
 
-@router.post("/login", response_model=AdminResponse)
-async def admin_login(credentials: AdminLogin):
+@router.post("/login", response_model=AdminSession)
+async def admin_login(credentials: AdminLogin, request: Request):
     """
     Verify admin credentials.
-    Returns admin info on success, 401 on failure.
+    Returns admin info and a bearer session token on success, 401 on failure, 429 when throttled.
     """
+    _throttle_login(credentials.username, request)
+
     admin = await admins_collection.find_one({"username": credentials.username})
-    if not admin or not verify_password(credentials.password, admin["password_hash"]):
+    stored = admin["password_hash"] if admin else None
+    if not stored or not await passwords.verify_password(credentials.password, stored):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password.",
         )
-    return AdminResponse(
+
+    # Upgrade legacy salt:sha256 (or weaker scrypt) hashes now that we know the password
+    if passwords.needs_rehash(stored):
+        await admins_collection.update_one(
+            {"_id": admin["_id"], "password_hash": stored},
+            {"$set": {"password_hash": await passwords.hash_password(credentials.password)}},
+        )
+
+    role = admin.get("role", "admin")
+    token, expires_at = sessions.issue_token(admin["username"], admin["full_name"], role)
+    return AdminSession(
         username=admin["username"],
         full_name=admin["full_name"],
-        role=admin.get("role", "admin"),
+        role=role,
+        access_token=token,
+        expires_at=expires_at,
     )
 
 
+@router.post("/logout")
+async def admin_logout(session: Optional[dict] = Depends(sessions.optional_session)):
+    """Revoke the caller's session token."""
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated.")
+    await sessions.revoke(session)
+    return {"message": "Logged out."}
+
+
 @router.get("/info", response_model=AdminResponse)
-async def get_admin_info(username: str):
+async def get_admin_info(
+    username: Optional[str] = None,
+    session: Optional[dict] = Depends(sessions.optional_session),
+):
     """
-    Get admin info by username (for display purposes).
+    Get admin info (for display purposes).
+    Without `username` it is read from the session token, with no database lookup.
+    Looking up another admin by `username` also requires a session, so the
+    endpoint cannot be used to probe which usernames exist.
     """
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated.")
+    if username is None:
+        return AdminResponse(username=session["sub"], full_name=session["name"], role=session["role"])
+
     admin = await admins_collection.find_one({"username": username})
     if not admin:
         raise HTTPException(
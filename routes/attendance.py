@@ -1,33 +1,124 @@
-from fastapi import APIRouter, HTTPException, Query, status
-from typing import Optional
+import csv
+import io
+import json
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import Literal, Optional
+from pydantic import ValidationError
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from database import employees_collection, attendance_collection
-from models.attendance import AttendanceResponse
-from datetime import datetime, date, timedelta
-
-router = APIRouter(prefix="/attendance", tags=["Attendance"])
+from models.attendance import AttendanceResponse, AttendanceEvent
+from services.attendance_rules import in_status, normalize_time, resolve_out, resolve_out_expr
+from services.attendance_batch import ARCHIVED_DETAIL, apply_events
+from services import (
+    attendance_archive,
+    attendance_close,
+    attendance_codec,
+    attendance_coalescer,
+    attendance_events,
+    auto_absent,
+    employee_cache,
+    employee_purge,
+)
+from services.metrics import TimedRoute
+from services.responses import ATTENDANCE_ROWS, json_rows
+from services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    encode_cursor,
+    decode_cursor,
+    date_desc_after,
+)
+
+router = APIRouter(prefix="/attendance", tags=["Attendance"], route_class=TimedRoute)
+
+MAX_BULK_EVENTS = 50_000
+MAX_BACKFILL_DAYS = 366
+
+# Only the fields AttendanceResponse needs cross the wire on list endpoints
+ATTENDANCE_PROJECTION = {
+    "employee_id": 1, "date": 1, "in_time": 1, "out_time": 1, "status": 1,
+    "worked_minutes": 1, "overtime_minutes": 1,
+}
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FIELDS = (
+    "id", "employee_id", "date", "in_time", "out_time", "status", "worked_minutes", "overtime_minutes",
+)
 
 
 def serialize_attendance(record: dict) -> dict:
     return {
         "id": str(record["_id"]),
         "employee_id": record["employee_id"],
-        "date": str(record["date"]),
-        "in_time": record.get("in_time"),
-        "out_time": record.get("out_time"),
+        "date": attendance_codec.decode_date(record["date"]),
+        "in_time": attendance_codec.decode_time(record.get("in_time")),
+        "out_time": attendance_codec.decode_time(record.get("out_time")),
         "status": record["status"],
+        "worked_minutes": record.get("worked_minutes"),
+        "overtime_minutes": record.get("overtime_minutes"),
     }
 
 
-def parse_time(time_str: str) -> datetime.time:
-    """Helper to parse HH:MM string to time object for comparison"""
-    return datetime.strptime(time_str, "%H:%M").time()
+def _check_date(value: Optional[str]) -> None:
+    """400 unless `value` is a YYYY-MM-DD date (or absent)."""
+    if value is None:
+        return
+    try:
+        attendance_codec.parse_date(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format.")
+
+
+def _check_time(value) -> str:
+    """`value` as zero-padded "HH:MM", or 400."""
+    try:
+        return normalize_time(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Times must be in HH:MM format.")
+
+
+async def _check_writable(att_date: str) -> None:
+    """409 if `att_date` falls in an archived (read-only) month."""
+    watermark = await attendance_archive.archived_before()
+    if watermark and att_date < watermark:
+        raise HTTPException(status_code=409, detail=ARCHIVED_DETAIL)
+
+
+async def _insert_if_absent(employee_id: str, att_date: str, fields: dict) -> ObjectId:
+    """
+    Create the (employee_id, date) record in one upsert, or raise 409 if it exists.
+    The unique (employee_id, date) index turns a lost race into a duplicate-key error.
+    """
+    try:
+        result = await attendance_collection.update_one(
+            {"employee_id": employee_id, "date": attendance_codec.date_match(att_date)},
+            {"$setOnInsert": attendance_codec.encode_fields({"date": att_date, **fields})},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        result = None
+    if result is None or result.upserted_id is None:
+        raise HTTPException(status_code=409, detail="Attendance already has a record for this date.")
+    return result.upserted_id
 
 
-def add_minutes(time_obj: datetime.time, minutes: int) -> datetime.time:
-    """Add minutes to a time object"""
-    dt = datetime.combine(date.today(), time_obj)
-    new_dt = dt + timedelta(minutes=minutes)
-    return new_dt.time()
+async def _coalesced(action: str, employee_id: str, att_date: str, **times) -> AttendanceResponse:
+    """Apply one event through the group-commit coalescer, mapping its outcome to the route's response."""
+    try:
+        event = AttendanceEvent(action=action, employee_id=employee_id, date=att_date, **times)
+    except ValidationError as exc:
+        raise HTTPException(status_code=400, detail=exc.errors()[0]["msg"])
+    result = await attendance_coalescer.submit(event)
+    if result["status"] == "not_found":
+        raise HTTPException(status_code=404, detail=result["detail"])
+    if result["status"] == "conflict":
+        raise HTTPException(status_code=409, detail=result["detail"])
+    return AttendanceResponse(**serialize_attendance(result["record"]))
 
 
 @router.post("/mark-in", response_model=AttendanceResponse, status_code=status.HTTP_201_CREATED)
@@ -39,46 +130,27 @@ async def mark_in(data: dict):
 
     if not all([employee_id, att_date, in_time]):
         raise HTTPException(status_code=400, detail="Missing required fields")
-
-    # Validate employee
-    employee = await employees_collection.find_one({"employee_id": employee_id})
-    if not employee:
+    _check_date(att_date)
+    in_time = _check_time(in_time)
+    await _check_writable(att_date)
+    if attendance_coalescer.ATTENDANCE_COALESCE:
+        return await _coalesced("in", employee_id, att_date, in_time=in_time)
+
+    # Validate employee (served from the shift cache)
+    shift = await employee_cache.get_shift(employee_id)
+    if not shift:
         raise HTTPException(status_code=404, detail="Employee not found.")
 
-    # Check if already marked
-    existing = await attendance_collection.find_one({
-        "employee_id": employee_id,
-        "date": att_date,
-    })
-    if existing:
-        raise HTTPException(status_code=409, detail="Attendance already has a record for this date.")
-
-    shift_start_str = employee.get("shift_start_time", "09:00")
-    
-    # Calculate status based on 15 min delay rule
-    in_time_obj = parse_time(in_time)
-    shift_start_obj = parse_time(shift_start_str)
-    
-    # 15 min grace period
-    grace_period_end = add_minutes(shift_start_obj, 15)
-    
     # Initial status is incomplete because they haven't exited yet
-    # Or Late if they came in late
-    att_status = "Incomplete"
-    if in_time_obj > grace_period_end:
-        att_status = "Late"
-
-    new_record = {
-        "employee_id": employee_id,
-        "date": att_date,
-        "in_time": in_time,
-        "out_time": None,
-        "status": att_status
-    }
+    # Or Late if they came in after the 15 min grace period
+    att_status = in_status(in_time, shift.grace_end)
 
-    result = await attendance_collection.insert_one(new_record)
-    created = await attendance_collection.find_one({"_id": result.inserted_id})
-    return AttendanceResponse(**serialize_attendance(created))
+    new_fields = {"in_time": in_time, "out_time": None, "status": att_status}
+    record_id = await _insert_if_absent(employee_id, att_date, new_fields)
+    await attendance_events.record_transition(employee_id, att_date, None, att_status)
+    return AttendanceResponse(**serialize_attendance({
+        "_id": record_id, "employee_id": employee_id, "date": att_date, **new_fields,
+    }))
 
 
 @router.post("/mark-out", response_model=AttendanceResponse)
@@ -90,52 +162,38 @@ async def mark_out(data: dict):
 
     if not all([employee_id, att_date, out_time]):
         raise HTTPException(status_code=400, detail="Missing required fields")
-
-    # Find existing attendance to update
-    record = await attendance_collection.find_one({
-        "employee_id": employee_id,
-        "date": att_date,
-    })
-    
-    if not record:
-        raise HTTPException(status_code=404, detail="No IN record found for this date. Cannot mark OUT.")
-        
-    if record.get("out_time"):
-        raise HTTPException(status_code=409, detail="Already marked OUT for this date.")
+    _check_date(att_date)
+    out_time = _check_time(out_time)
+    await _check_writable(att_date)
+    if attendance_coalescer.ATTENDANCE_COALESCE:
+        return await _coalesced("out", employee_id, att_date, out_time=out_time)
 
     # Validate employee to get shift end time
-    employee = await employees_collection.find_one({"employee_id": employee_id})
-    if not employee:
+    shift = await employee_cache.get_shift(employee_id)
+    if not shift:
         raise HTTPException(status_code=404, detail="Employee not found.")
 
-    shift_end_str = employee.get("shift_end_time", "18:00")
-    
-    # Calculate final status
-    out_time_obj = parse_time(out_time)
-    shift_end_obj = parse_time(shift_end_str)
-    
-    current_status = record.get("status")
-    final_status = current_status
-    
-    # If early exit
-    if out_time_obj < shift_end_obj:
-        if current_status == "Late":
-            final_status = "Late & Early Exit" # Or just Early Exit depending on preference
-        else:
-            final_status = "Early Exit"
-    else:
-        # If they left on time or after shift
-        if current_status == "Incomplete":
-            final_status = "Present"
-        # If they were late but left on time, they stay "Late"
-        
-    await attendance_collection.update_one(
-        {"_id": record["_id"]},
-        {"$set": {"out_time": out_time, "status": final_status}}
+    # Close the open record and derive the final status in one atomic update;
+    # the out_time: None filter lets only one concurrent mark-out win
+    previous = await attendance_collection.find_one_and_update(
+        {"employee_id": employee_id, "date": attendance_codec.date_match(att_date), "out_time": None},
+        [{"$set": resolve_out_expr(out_time, shift.shift_end)}],
+        return_document=ReturnDocument.BEFORE,
     )
+    if previous is None:
+        # Slow path only: tell "no record" apart from "already out"
+        existing = {"employee_id": employee_id, "date": attendance_codec.date_match(att_date)}
+        if await attendance_collection.find_one(existing, {"_id": 1}):
+            raise HTTPException(status_code=409, detail="Already marked OUT for this date.")
+        raise HTTPException(status_code=404, detail="No IN record found for this date. Cannot mark OUT.")
 
-    updated = await attendance_collection.find_one({"_id": record["_id"]})
-    return AttendanceResponse(**serialize_attendance(updated))
+    # Same rules the pipeline applied, evaluated on the pre-image
+    closed = resolve_out(previous.get("status"), previous.get("in_time"), out_time, shift.shift_end)
+    await attendance_events.record_transition(
+        employee_id, att_date, previous.get("status"), closed["status"],
+        worked_minutes=closed["worked_minutes"],
+    )
+    return AttendanceResponse(**serialize_attendance({**previous, **closed}))
 
 
 @router.post("/mark-absent", response_model=AttendanceResponse)
@@ -145,48 +203,316 @@ async def mark_absent(data: dict):
 
     if not all([employee_id, att_date]):
         raise HTTPException(status_code=400, detail="Missing required fields")
+    _check_date(att_date)
+    await _check_writable(att_date)
+    if attendance_coalescer.ATTENDANCE_COALESCE:
+        return await _coalesced("absent", employee_id, att_date)
 
-    employee = await employees_collection.find_one({"employee_id": employee_id})
-    if not employee:
+    if not await employee_cache.get_shift(employee_id):
         raise HTTPException(status_code=404, detail="Employee not found.")
 
-    existing = await attendance_collection.find_one({"employee_id": employee_id, "date": att_date})
-    if existing:
-         raise HTTPException(status_code=409, detail="Attendance already has a record for this date.")
-         
-    new_record = {
-        "employee_id": employee_id,
-        "date": att_date,
-        "in_time": None,
-        "out_time": None,
-        "status": "Absent"
+    new_fields = {"in_time": None, "out_time": None, "status": "Absent"}
+    record_id = await _insert_if_absent(employee_id, att_date, new_fields)
+    await attendance_events.record_transition(employee_id, att_date, None, "Absent")
+    return AttendanceResponse(**serialize_attendance({
+        "_id": record_id, "employee_id": employee_id, "date": att_date, **new_fields,
+    }))
+
+
+async def _read_bulk_events(request: Request) -> list:
+    """Read a bulk payload as a JSON array or an NDJSON stream (one event per line)."""
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" not in content_type and "jsonlines" not in content_type:
+        try:
+            payload = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON.")
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array of events.")
+        return payload
+
+    raw_events = []
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                raw_events.append(line)
+        if len(raw_events) > MAX_BULK_EVENTS:
+            break
+    if buffer.strip():
+        raw_events.append(buffer)
+    return raw_events
+
+
+@router.post("/bulk")
+async def bulk_attendance(request: Request):
+    """
+    Apply a batch of attendance events in a few round trips.
+    Body is a JSON array, or NDJSON with Content-Type: application/x-ndjson.
+    Each event: {"action": "in" | "out" | "absent", "employee_id", "date", "in_time"?, "out_time"?}
+    """
+    raw_events = await _read_bulk_events(request)
+    if len(raw_events) > MAX_BULK_EVENTS:
+        raise HTTPException(status_code=413, detail=f"A batch may contain at most {MAX_BULK_EVENTS} events.")
+
+    results = {}
+    events = []
+    for index, raw in enumerate(raw_events):
+        try:
+            if isinstance(raw, bytes):
+                raw = json.loads(raw)
+            events.append((index, AttendanceEvent.model_validate(raw)))
+        except (ValueError, ValidationError) as exc:
+            results[index] = {"index": index, "status": "invalid", "detail": str(exc)}
+
+    results.update(await apply_events(events))
+
+    summary = {"created": 0, "updated": 0, "conflict": 0, "not_found": 0, "invalid": 0}
+    ordered = []
+    for index in range(len(raw_events)):
+        result = results[index]
+        summary[result["status"]] += 1
+        if result.get("record") is not None:
+            result["record"] = serialize_attendance(result["record"])
+        ordered.append(result)
+
+    return {"total": len(raw_events), **summary, "results": ordered}
+
+
+@router.post("/absentees")
+async def mark_absentees(
+    date: str = Query(..., description="Date to close out (YYYY-MM-DD), or range start when `to` is given"),
+    to: Optional[str] = Query(None, description="Inclusive range end (YYYY-MM-DD)"),
+):
+    """
+    Mark every employee without a record on the given date(s) as Absent,
+    e.g. to backfill days from before auto-absent was enabled. Weekends are
+    skipped unless AUTO_ABSENT_WEEKENDS is on.
+    """
+    try:
+        date_from = attendance_codec.parse_date(date)
+        date_to = attendance_codec.parse_date(to) if to else date_from
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format.")
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'date'.")
+    if (date_to - date_from).days >= MAX_BACKFILL_DAYS:
+        raise HTTPException(status_code=400, detail=f"A backfill may cover at most {MAX_BACKFILL_DAYS} days.")
+    await _check_writable(str(date_from))
+    created = await auto_absent.backfill(date_from, date_to)
+    return {"marked_absent": sum(created.values()), "dates": created}
+
+
+@router.post("/close")
+async def close_out_day(
+    date: str = Query(..., description="Date to close out (YYYY-MM-DD)"),
+    mode: Literal["close", "flag"] = Query("flag", description="close at shift end, or flag for review"),
+):
+    """
+    Resolve records left without an OUT time on a date — closed at the
+    employee's shift end or flagged `needs_review` — and store worked and
+    overtime minutes on every closed record of the date.
+    """
+    _check_date(date)
+    await _check_writable(date)
+    return {"date": date, "mode": mode, **await attendance_close.close_day(date, mode)}
+
+
+@router.post("/archive")
+async def archive_attendance():
+    """
+    Archive every month older than ATTENDANCE_HOT_MONTHS now instead of
+    waiting for the scheduler: dates before the new watermark become
+    read-only and their records move to compressed per-month documents.
+    """
+    return await attendance_archive.archive_closed_months()
+
+
+def _attendance_filter(
+    date: Optional[str],
+    date_from: Optional[str],
+    date_to: Optional[str],
+    after: Optional[str],
+    base: dict = None,
+) -> dict:
+    for value in (date, date_from, date_to):
+        _check_date(value)
+    # Employees being offboarded are hidden until their history is purged
+    query = dict(base or employee_purge.hidden_filter())
+    if date:
+        query["date"] = attendance_codec.date_match(date)
+    elif date_from or date_to:
+        query.update(attendance_codec.date_range(date_from, date_to))
+    if after:
+        query = {"$and": [query, date_desc_after(decode_cursor(after))]}
+    return query
+
+
+def _archive_scope(
+    date: Optional[str],
+    date_from: Optional[str],
+    date_to: Optional[str],
+    after: Optional[str],
+    base: dict = None,
+) -> dict:
+    """The archive-side arguments matching `_attendance_filter`'s hot query."""
+    return {
+        "date_from": date or date_from,
+        "date_to": date or date_to,
+        "employee_query": dict(base or employee_purge.hidden_filter()),
+        "after": decode_cursor(after) if after else None,
     }
 
-    result = await attendance_collection.insert_one(new_record)
-    created = await attendance_collection.find_one({"_id": result.inserted_id})
-    return AttendanceResponse(**serialize_attendance(created))
+
+async def _archived_rows(rows: list[dict], remaining: int, archive_scope: dict) -> list[dict]:
+    """Up to `remaining` archived records for the page, skipping any also among the hot `rows`."""
+    hot_ids = {record["_id"] for record in rows}
+    wanted = remaining
+    while True:
+        archived = await attendance_archive.find_page(limit=wanted, **archive_scope)
+        # A record being archived can briefly be in both stores: ask for more to make up for it
+        fresh = [record for record in archived if record["_id"] not in hot_ids]
+        if len(fresh) >= remaining or len(archived) < wanted:
+            return fresh[:remaining]
+        wanted = remaining + len(archived) - len(fresh)
+
+
+async def _attendance_page(query: dict, limit: int, response: Response, archive_scope: dict):
+    """One keyset page in (date DESC, _id DESC) order, with the next cursor header."""
+    cursor = (
+        attendance_collection.find(query, ATTENDANCE_PROJECTION)
+        .sort([("date", -1), ("_id", -1)])
+        .limit(limit + 1)
+    )
+    rows = await cursor.to_list(length=limit + 1)
+    # Archived records are older than hot ones, so the archive (which decompresses
+    # whole months) is only read when the hot collection cannot fill the page
+    remaining = limit + 1 - len(rows)
+    if remaining > 0:
+        archived = await _archived_rows(rows, remaining, archive_scope)
+        if archived:
+            rows = sorted(
+                rows + archived,
+                key=lambda record: (attendance_codec.decode_date(record["date"]), record["_id"]),
+                reverse=True,
+            )[:limit + 1]
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        position = {"d": attendance_codec.decode_date(last["date"]), "i": str(last["_id"])}
+        if isinstance(last["date"], datetime):
+            position["n"] = 1
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(position)
+    return json_rows(ATTENDANCE_ROWS, [serialize_attendance(record) for record in rows], response, headers)
 
 
 @router.get("", response_model=list[AttendanceResponse])
-async def get_all_attendance(date: Optional[str] = Query(None, description="Filter by date (YYYY-MM-DD)")):
-    query = {}
-    if date:
-        query["date"] = date
-    records = []
-    async for record in attendance_collection.find(query).sort("date", -1):
-        records.append(AttendanceResponse(**serialize_attendance(record)))
-    return records
+async def get_all_attendance(
+    response: Response,
+    date: Optional[str] = Query(None, description="Filter by date (YYYY-MM-DD)"),
+    date_from: Optional[str] = Query(None, alias="from", description="Range start, inclusive (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, alias="to", description="Range end, inclusive (YYYY-MM-DD)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+):
+    query = _attendance_filter(date, date_from, date_to, after)
+    return await _attendance_page(query, limit, response, _archive_scope(date, date_from, date_to, after))
+
+
+async def _export_records(query: dict, archive_scope: dict):
+    """Archived months first (all older than the hot collection), then the hot cursor."""
+    # A month being moved has records in both stores: remember the ones already written
+    stragglers = await attendance_archive.straggler_months()
+    exported = set()
+    async for month_records in attendance_archive.iter_months(**archive_scope):
+        for record in month_records:
+            if record["date"][:7] in stragglers:
+                exported.add(record["_id"])
+            yield record
+    cursor = (
+        attendance_collection.find(query, ATTENDANCE_PROJECTION)
+        .sort([("date", 1), ("_id", 1)])
+        .batch_size(EXPORT_BATCH_SIZE)
+    )
+    async for record in cursor:
+        if record["_id"] not in exported:
+            yield record
+
+
+async def _export_chunks(query: dict, export_format: str, archive_scope: dict):
+    """Yield the export body in chunks of EXPORT_BATCH_SIZE rows straight off the cursor."""
+    buffer = io.StringIO()
+    writer = None
+    if export_format == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+
+    rows = 0
+    async for record in _export_records(query, archive_scope):
+        row = serialize_attendance(record)
+        if writer:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(row))
+            buffer.write("\n")
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@router.get("/export")
+async def export_attendance(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    date_from: Optional[str] = Query(None, alias="from", description="Range start, inclusive (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, alias="to", description="Range end, inclusive (YYYY-MM-DD)"),
+    department: Optional[str] = Query(None, description="Only employees in this department"),
+):
+    """
+    Stream attendance history as NDJSON or CSV (oldest first) for payroll.
+    Rows are written as the cursor yields them (archived ones a month at a
+    time), so memory stays flat for any range.
+    """
+    for value in (date_from, date_to):
+        _check_date(value)
+    # Same employee scope for both stores: never the employees being offboarded
+    base = employee_purge.hidden_filter()
+    if department:
+        pending = employee_purge.pending_ids()
+        employee_ids = await employees_collection.distinct(
+            "employee_id", {"department": department, **employee_purge.NOT_DELETED}
+        )
+        base = {"employee_id": {"$in": [eid for eid in employee_ids if eid not in pending]}}
+    query = _attendance_filter(None, date_from, date_to, None, base=base)
+    archive_scope = {"date_from": date_from, "date_to": date_to, "employee_query": dict(base)}
+
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    filename = f"attendance_{date_from or 'start'}_{date_to or 'end'}.{export_format}"
+    return StreamingResponse(
+        _export_chunks(query, export_format, archive_scope),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/{employee_id}", response_model=list[AttendanceResponse])
 async def get_attendance_by_employee(
     employee_id: str,
-    date: Optional[str] = Query(None, description="Filter by date (YYYY-MM-DD)")
+    response: Response,
+    date: Optional[str] = Query(None, description="Filter by date (YYYY-MM-DD)"),
+    date_from: Optional[str] = Query(None, alias="from", description="Range start, inclusive (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, alias="to", description="Range end, inclusive (YYYY-MM-DD)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
 ):
-    query = {"employee_id": employee_id}
-    if date:
-        query["date"] = date
-    records = []
-    async for record in attendance_collection.find(query).sort("date", -1):
-        records.append(AttendanceResponse(**serialize_attendance(record)))
-    return records
+    if employee_id in employee_purge.pending_ids():
+        return []
+    base = {"employee_id": employee_id}
+    query = _attendance_filter(date, date_from, date_to, after, base=base)
+    return await _attendance_page(query, limit, response, _archive_scope(date, date_from, date_to, after, base))
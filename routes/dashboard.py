@@ -1,55 +1,140 @@
-from fastapi import APIRouter
-from database import employees_collection, attendance_collection
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from services import attendance_codec, dashboard_stream, sessions, summary_cache
+from services.attendance_rules import bucket_counts
+from services.metrics import TimedRoute
 from datetime import date as dt_date
 
-router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"], route_class=TimedRoute)
+# Mounted without the bearer-only dependency: EventSource cannot send headers
+stream_router = APIRouter(
+    prefix="/dashboard",
+    tags=["Dashboard"],
+    route_class=TimedRoute,
+    dependencies=[Depends(sessions.require_stream_session)],
+)
+
+
+def _check_date(value: Optional[str]) -> None:
+    """400 unless `value` is a YYYY-MM-DD date (or absent)."""
+    if value is None:
+        return
+    try:
+        attendance_codec.parse_date(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format.")
+
 
 @router.get("/summary")
 async def get_dashboard_summary(date: str = None):
     # Default to today if no date provided
     if not date:
         date = str(dt_date.today())
+    _check_date(date)
+
+    # Both are cache lookups on the hot path; misses fall back to Mongo concurrently
+    total_employees, status_counts = await asyncio.gather(
+        summary_cache.get_employee_count(),
+        summary_cache.get_status_counts(date),
+    )
 
-    # Total employees
-    total_employees = await employees_collection.count_documents({})
-    
-    # Get all attendance records for the date
-    attendance_records = []
-    async for record in attendance_collection.find({"date": date}):
-        attendance_records.append(record)
-        
-    total_present = 0
-    total_absent = 0
-    total_late = 0
-    total_early_exit = 0
-    total_incomplete = 0
-    
-    for rec in attendance_records:
-        status = rec.get("status", "")
-        if "Present" in status:
-            total_present += 1
-        elif "Absent" in status:
-            total_absent += 1
-        elif "Late" in status:
-            total_late += 1
-        elif "Early Exit" in status:
-            total_early_exit += 1
-        elif "Incomplete" in status:
-            total_incomplete += 1
-            
     # Calculate un-marked employees (assumed absent implicitly for the dashboard, or just 'unmarked')
-    marked_employees_count = len(attendance_records)
+    marked_employees_count = sum(status_counts.values())
     unmarked_employees = max(0, total_employees - marked_employees_count)
 
     return {
         "date": date,
         "total_employees": total_employees,
         "attendance": {
-            "present": total_present,
-            "late": total_late,
-            "early_exit": total_early_exit,
-            "incomplete": total_incomplete,
-            "absent": total_absent,
+            **bucket_counts(status_counts),
             "unmarked": unmarked_employees
         }
     }
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/stream-token")
+async def issue_stream_token(session: Optional[dict] = Depends(sessions.optional_session)):
+    """Short-lived token for `GET /dashboard/stream?token=` (checked once, when the stream opens)."""
+    if session is None:
+        raise HTTPException(status_code=401, detail="Not authenticated.")
+    token, expires_at = sessions.issue_token(
+        session["sub"], session["name"], session["role"],
+        ttl=sessions.SESSION_STREAM_TOKEN_TTL, scope=sessions.STREAM_SCOPE,
+    )
+    return {"token": token, "expires_at": expires_at}
+
+
+@stream_router.get("/stream")
+async def stream_dashboard_summary(request: Request, date: str = None):
+    """Server-sent events: a `snapshot` of the summary, then debounced `delta` frames as attendance changes."""
+    if not date:
+        date = str(dt_date.today())
+    _check_date(date)
+    if dashboard_stream.broadcaster.subscriber_count >= dashboard_stream.DASHBOARD_STREAM_MAX_SUBSCRIBERS:
+        raise HTTPException(status_code=503, detail="Too many dashboard streams open, retry later.")
+
+    async def events():
+        # Subscribed inside the generator so the finally below always unsubscribes
+        subscriber = await dashboard_stream.broadcaster.subscribe(date)
+        try:
+            while not await request.is_disconnected():
+                try:
+                    await asyncio.wait_for(subscriber.ready.wait(), timeout=dashboard_stream.DASHBOARD_STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                # Taken only once the previous frame was sent, so a slow client gets one merged frame
+                frame = subscriber.take()
+                if frame is None:
+                    continue
+                kind, counts = frame
+                if kind == "snapshot":
+                    total_employees = await summary_cache.get_employee_count()
+                    yield _sse("snapshot", {
+                        "date": date,
+                        "total_employees": total_employees,
+                        "attendance": {
+                            **bucket_counts(counts),
+                            "unmarked": max(0, total_employees - sum(counts.values())),
+                        },
+                    })
+                else:
+                    yield _sse("delta", {
+                        "date": date,
+                        "attendance": {**bucket_counts(counts), "unmarked": -sum(counts.values())},
+                    })
+        finally:
+            dashboard_stream.broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/summary/rebuild")
+async def rebuild_dashboard_summary(
+    date: str = Query(..., description="Date to rebuild (YYYY-MM-DD), or range start when `to` is given"),
+    to: Optional[str] = Query(None, description="Inclusive range end (YYYY-MM-DD)"),
+):
+    """Recompute cached summaries from the raw attendance collection."""
+    _check_date(date)
+    _check_date(to)
+    if to is None:
+        counts = await summary_cache.rebuild(date)
+        return {"rebuilt": 1, "dates": {date: bucket_counts(counts)}}
+    if to < date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'date'.")
+    by_date = await summary_cache.rebuild_range(date, to)
+    return {
+        "rebuilt": len(by_date),
+        "dates": {d: bucket_counts(counts) for d, counts in sorted(by_date.items())},
+    }
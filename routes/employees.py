@@ -1,8 +1,31 @@
-from fastapi import APIRouter, HTTPException, status
-from database import employees_collection, attendance_collection
-from models.employee import EmployeeCreate, EmployeeResponse
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from typing import Optional
+from database import employees_collection
+from models.employee import EmployeeCreate, EmployeeResponse, OffboardRequest
+from services import employee_cache, employee_purge, summary_cache
+from services.employee_search import directory_filter, search_fields
+from services.employee_import import ImportFormatError, import_employees, iter_csv_rows, iter_json_array
+from services.metrics import TimedRoute
+from services.responses import EMPLOYEE_ROWS, json_rows
+from services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    encode_cursor,
+    decode_cursor,
+    id_asc_after,
+)
 
-router = APIRouter(prefix="/employees", tags=["Employees"])
+router = APIRouter(prefix="/employees", tags=["Employees"], route_class=TimedRoute)
+
+EMPLOYEE_PROJECTION = {
+    "employee_id": 1,
+    "full_name": 1,
+    "email": 1,
+    "department": 1,
+    "shift_start_time": 1,
+    "shift_end_time": 1,
+}
 
 
 def serialize_employee(emp: dict) -> dict:
@@ -35,30 +58,68 @@ async def add_employee(employee: EmployeeCreate):
             detail=f"Employee with email '{employee.email}' already exists.",
         )
 
-    result = await employees_collection.insert_one(employee.model_dump())
+    result = await employees_collection.insert_one({
+        **employee.model_dump(), **search_fields(employee.full_name, employee.email),
+    })
+    summary_cache.adjust_employee_count(1)
+    await employee_cache.invalidate(employee.employee_id)
     created = await employees_collection.find_one({"_id": result.inserted_id})
     return EmployeeResponse(**serialize_employee(created))
 
 
+@router.post("/bulk")
+async def bulk_import_employees(request: Request):
+    """
+    Import many employees at once.
+    Body is CSV with a header row (Content-Type: text/csv) or a JSON array of employees;
+    it is parsed as it streams in and inserted in batches. Returns a per-row report.
+    """
+    content_type = request.headers.get("content-type", "")
+    rows = iter_csv_rows(request.stream()) if "csv" in content_type else iter_json_array(request.stream())
+    try:
+        return await import_employees(rows)
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
 @router.get("", response_model=list[EmployeeResponse])
-async def list_employees():
-    employees = []
-    async for emp in employees_collection.find():
-        employees.append(EmployeeResponse(**serialize_employee(emp)))
-    return employees
+async def list_employees(
+    response: Response,
+    department: Optional[str] = Query(None, description="Only employees in this department"),
+    q: Optional[str] = Query(None, description="Case-insensitive prefix of the name (or any word of it) or email"),
+    shift_start: Optional[str] = Query(None, description="Only employees whose shift starts at this time (HH:MM)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+):
+    query = {**directory_filter(department, q, shift_start), **employee_purge.NOT_DELETED}
+    if after:
+        query.update(id_asc_after(decode_cursor(after)))
+    cursor = employees_collection.find(query, EMPLOYEE_PROJECTION).sort("_id", 1).limit(limit + 1)
+    rows = await cursor.to_list(length=limit + 1)
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor({"i": str(rows[-1]["_id"])})
+    return json_rows(EMPLOYEE_ROWS, [serialize_employee(emp) for emp in rows], response, headers)
+
+
+@router.post("/offboard")
+async def offboard_employees(request: OffboardRequest):
+    """
+    Remove many employees at once. They disappear from every read immediately;
+    their attendance history is purged in the background.
+    """
+    results = await employee_purge.offboard(request.employee_ids)
+    scheduled = sum(1 for outcome in results.values() if outcome == "scheduled")
+    return {"scheduled": scheduled, "not_found": len(results) - scheduled, "results": results}
 
 
 @router.delete("/{employee_id}", status_code=status.HTTP_200_OK)
 async def delete_employee(employee_id: str):
-    employee = await employees_collection.find_one({"employee_id": employee_id})
-    if not employee:
+    results = await employee_purge.offboard([employee_id])
+    if results[employee_id] == "not_found":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Employee with ID '{employee_id}' not found.",
         )
-
-    # Also delete all attendance records for this employee
-    await attendance_collection.delete_many({"employee_id": employee_id})
-    await employees_collection.delete_one({"employee_id": employee_id})
-
-    return {"message": f"Employee '{employee_id}' and their attendance records deleted successfully."}
+    return {"message": f"Employee '{employee_id}' deleted; their attendance records are being removed."}
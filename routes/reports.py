@@ -0,0 +1,59 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from database import employees_collection, monthly_rollup_collection
+from services import attendance_archive, reports
+from services.employee_purge import NOT_DELETED
+from services.metrics import TimedRoute
+
+router = APIRouter(prefix="/reports", tags=["Reports"], route_class=TimedRoute)
+
+ROSTER_PROJECTION = {"_id": 0, "employee_id": 1, "full_name": 1, "department": 1}
+
+
+def _validate_month(month: str) -> str:
+    if not reports.MONTH_PATTERN.match(month):
+        raise HTTPException(status_code=400, detail="month must be in YYYY-MM format.")
+    return month
+
+
+@router.get("/monthly")
+async def monthly_report(
+    month: str = Query(..., description="Month to report on (YYYY-MM)"),
+    department: Optional[str] = Query(None, description="Only employees in this department"),
+):
+    """
+    Per-employee monthly totals: days present, late count, early exits, absences,
+    unmarked working days and hours worked. Served from the precomputed rollups.
+    """
+    _validate_month(month)
+    if not await reports.is_built(month):
+        await reports.build_month(month)
+
+    roster_query = {"department": department, **NOT_DELETED} if department else dict(NOT_DELETED)
+    roster = await employees_collection.find(roster_query, ROSTER_PROJECTION).to_list(length=None)
+    rollup_query = {"month": month}
+    if department:
+        rollup_query["employee_id"] = {"$in": [employee["employee_id"] for employee in roster]}
+    rollups = {doc["employee_id"]: doc async for doc in monthly_rollup_collection.find(rollup_query)}
+    month_working_days = reports.working_days(month)
+    return {
+        "month": month,
+        "department": department,
+        "working_days": month_working_days,
+        "employees": [
+            reports.report_row(employee, rollups.get(employee["employee_id"]), month_working_days)
+            for employee in roster
+        ],
+    }
+
+
+@router.post("/monthly/rebuild")
+async def rebuild_monthly_report(month: str = Query(..., description="Month to rebuild (YYYY-MM)")):
+    """Recompute a month's rollups from raw attendance."""
+    _validate_month(month)
+    await attendance_archive.archived_before()
+    if attendance_archive.is_archived(f"{month}-01"):
+        # The raw records are compressed away; the rollup was built before archiving
+        raise HTTPException(status_code=409, detail=f"{month} is archived; its rollup is final.")
+    await reports.build_month(month)
+    return {"message": f"Monthly rollup for {month} rebuilt."}
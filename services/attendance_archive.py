@@ -0,0 +1,362 @@
+"""
+Hot / cold split of attendance storage.
+
+The `attendance` collection holds only the most recent ATTENDANCE_HOT_MONTHS
+months (including the current one); every write path and today's dashboard
+work against it, so it and its indexes stay small enough to remain in RAM.
+Older months are compacted into `attendance_archive`, one document per
+employee and month:
+
+    {"_id": "2025-11:EMP001", "month": "2025-11", "employee_id": "EMP001",
+     "count": 21, "records": <zlib-compressed JSON rows>}
+
+Before a month is moved its report rollups are built (see `reports`); after
+it has moved, its per-date status counts are written to `daily_summary`,
+which is authoritative for archived dates whether or not SUMMARY_MATERIALIZE
+is on.
+
+The split is one watermark, `archived_before` (first day of the oldest hot
+month), stored in the `migrations` collection and re-read by each worker at
+most every ARCHIVE_WATERMARK_INTERVAL seconds. Dates before it are read-only.
+The archiver advances the watermark, waits until every worker has seen it and
+only then moves records, so no write lands behind it. List reads only turn
+to the archive when the hot collection cannot fill a page, and skip records
+already seen there, so records stay visible while a month is being moved.
+Exports likewise skip the hot copies of records already written from the
+archive.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+import zlib
+from collections import Counter, defaultdict
+from datetime import date as dt_date, datetime, timedelta, timezone
+from typing import Optional
+from bson import Binary, ObjectId
+from pymongo import DeleteOne, ReplaceOne
+from database import (
+    attendance_collection,
+    attendance_archive_collection,
+    daily_summary_collection,
+    migrations_collection,
+    purge_jobs_collection,
+)
+from services import attendance_codec, reports
+
+logger = logging.getLogger(__name__)
+
+ATTENDANCE_ARCHIVE = os.getenv("ATTENDANCE_ARCHIVE", "false").lower() in ("1", "true", "yes")
+ATTENDANCE_HOT_MONTHS = int(os.getenv("ATTENDANCE_HOT_MONTHS", "3"))
+ATTENDANCE_ARCHIVE_INTERVAL = float(os.getenv("ATTENDANCE_ARCHIVE_INTERVAL", "3600"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+ARCHIVE_WATERMARK_INTERVAL = 5.0
+if ATTENDANCE_HOT_MONTHS < 1:
+    raise RuntimeError("ATTENDANCE_HOT_MONTHS must be at least 1 (the current month stays hot)")
+
+WATERMARK_ID = "attendance_archive"
+# Optional record fields carried into the archive when present
+EXTRA_FIELDS = ("worked_minutes", "overtime_minutes", "needs_review")
+
+_watermark = {"value": None, "checked_at": 0.0}
+
+
+# ── Watermark ─────────────────────────────────────────────────────
+async def archived_before() -> Optional[str]:
+    """First hot date (YYYY-MM-DD); earlier dates are archived. None until a month has been archived."""
+    now = time.monotonic()
+    if now - _watermark["checked_at"] >= ARCHIVE_WATERMARK_INTERVAL:
+        _watermark["checked_at"] = now
+        doc = await migrations_collection.find_one({"_id": WATERMARK_ID})
+        _watermark["value"] = doc.get("archived_before") if doc else None
+    return _watermark["value"]
+
+
+def is_archived(date: str) -> bool:
+    """Whether `date` is behind the last watermark seen (`archived_before` refreshes it)."""
+    return _watermark["value"] is not None and date < _watermark["value"]
+
+
+def shift_month(month: str, offset: int) -> str:
+    year, mon = (int(part) for part in month.split("-"))
+    index = year * 12 + mon - 1 + offset
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+# ── Compressed rows ───────────────────────────────────────────────
+def _row(record: dict) -> dict:
+    """A hot record in archive form: API-format date and times, optional fields only when set."""
+    row = {
+        "_id": record["_id"],
+        "employee_id": record["employee_id"],
+        "date": attendance_codec.decode_date(record["date"]),
+        "in_time": attendance_codec.decode_time(record.get("in_time")),
+        "out_time": attendance_codec.decode_time(record.get("out_time")),
+        "status": record["status"],
+    }
+    for field in EXTRA_FIELDS:
+        if record.get(field) is not None:
+            row[field] = record[field]
+    return row
+
+
+def _pack(rows: list[dict]) -> Binary:
+    compact = [
+        {**{k: v for k, v in row.items() if k != "employee_id"}, "_id": str(row["_id"])}
+        for row in sorted(rows, key=lambda row: (row["date"], row["_id"]))
+    ]
+    return Binary(zlib.compress(json.dumps(compact, separators=(",", ":")).encode()))
+
+
+def _unpack(doc: dict) -> list[dict]:
+    rows = json.loads(zlib.decompress(doc["records"]))
+    for row in rows:
+        row["_id"] = ObjectId(row["_id"])
+        row["employee_id"] = doc["employee_id"]
+    return rows
+
+
+# ── Reads ─────────────────────────────────────────────────────────
+async def iter_months(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    employee_query: dict = None,
+    descending: bool = False,
+):
+    """
+    Archived records in [date_from, date_to], one month at a time, in
+    (date, _id) order. `employee_query` filters on `employee_id` as in a hot query.
+    Each month's documents are only fetched (and decompressed) once the caller
+    asks for that month, so a consumer that stops early reads no further.
+    """
+    watermark = await archived_before()
+    if watermark is None or (date_from and date_from >= watermark):
+        return
+    months = {"$lt": watermark[:7]}
+    if date_from:
+        months["$gte"] = date_from[:7]
+    if date_to:
+        months["$lte"] = date_to[:7]
+    employee_query = employee_query or {}
+    month_list = await attendance_archive_collection.distinct("month", {"month": months, **employee_query})
+
+    def in_range(row: dict) -> bool:
+        return (not date_from or row["date"] >= date_from) and (not date_to or row["date"] <= date_to)
+
+    for month in sorted(month_list, reverse=descending):
+        rows = [
+            row
+            async for doc in attendance_archive_collection.find({"month": month, **employee_query})
+            for row in _unpack(doc)
+            if in_range(row)
+        ]
+        if rows:
+            yield sorted(rows, key=lambda row: (row["date"], row["_id"]), reverse=descending)
+
+
+async def straggler_months() -> set[str]:
+    """Archived months that still have records in the hot collection (a move in progress)."""
+    watermark = await archived_before()
+    if watermark is None:
+        return set()
+    dates = await attendance_collection.distinct("date", attendance_codec.date_range(date_before=watermark))
+    return {attendance_codec.decode_date(value)[:7] for value in dates}
+
+
+async def find_page(
+    date_from: Optional[str],
+    date_to: Optional[str],
+    employee_query: dict,
+    after: Optional[dict],
+    limit: int,
+) -> list[dict]:
+    """Up to `limit` archived records in (date DESC, _id DESC) order, after cursor position `after`."""
+    if after:
+        date_to = min(date_to or after["d"], after["d"])
+    rows = []
+    async for month_rows in iter_months(date_from, date_to, employee_query, descending=True):
+        if after:
+            month_rows = [row for row in month_rows if (row["date"], row["_id"]) < (after["d"], after["i"])]
+        rows.extend(month_rows)
+        # Months arrive newest first, so older ones cannot make it onto this page
+        if len(rows) >= limit:
+            break
+    return rows[:limit]
+
+
+async def count_statuses_range(date_from: str, date_to: str) -> dict[str, dict]:
+    """Per-date status counts for the archived dates in [date_from, date_to], across both stores."""
+    watermark = await archived_before()
+    if watermark is None or date_from >= watermark:
+        return {}
+    counts: dict[str, Counter] = defaultdict(Counter)
+    # Records of a month being moved may briefly sit in both stores
+    seen = set()
+    cursor = attendance_collection.find(
+        attendance_codec.date_range(date_from, date_to, date_before=watermark), {"date": 1, "status": 1}
+    )
+    async for rec in cursor:
+        seen.add(rec["_id"])
+        counts[attendance_codec.decode_date(rec["date"])][rec["status"]] += 1
+    async for month_rows in iter_months(date_from, date_to):
+        for row in month_rows:
+            if row["_id"] not in seen:
+                counts[row["date"]][row["status"]] += 1
+    return {date: dict(by_status) for date, by_status in counts.items()}
+
+
+# ── Archival ──────────────────────────────────────────────────────
+async def summarize_month(month: str) -> None:
+    """Write the archived month's per-date status counts to `daily_summary`."""
+    first_day, next_month = reports.month_bounds(month)
+    last_day = (dt_date.fromisoformat(next_month) - timedelta(days=1)).isoformat()
+    by_date = await count_statuses_range(first_day, last_day)
+    rebuilt_at = datetime.now(timezone.utc)
+    await daily_summary_collection.delete_many({
+        "_id": {"$gte": first_day, "$lt": next_month, "$nin": list(by_date)},
+    })
+    if by_date:
+        await daily_summary_collection.bulk_write([
+            ReplaceOne({"_id": date}, {"_id": date, "by_status": counts, "rebuilt_at": rebuilt_at}, upsert=True)
+            for date, counts in by_date.items()
+        ], ordered=False)
+
+
+async def _archive_employees(month: str, by_employee: dict[str, list[dict]]) -> int:
+    """Merge hot records into the employees' archive documents for `month`, then delete them from hot."""
+    existing = {
+        doc["employee_id"]: doc
+        async for doc in attendance_archive_collection.find(
+            {"month": month, "employee_id": {"$in": list(by_employee)}}
+        )
+    }
+    archived_at = datetime.now(timezone.utc)
+    ops = []
+    moved = []
+    for employee_id, records in by_employee.items():
+        rows = {row["_id"]: row for row in _unpack(existing[employee_id])} if employee_id in existing else {}
+        for record in records:
+            rows[record["_id"]] = _row(record)
+            moved.append(record["_id"])
+        ops.append(ReplaceOne(
+            {"_id": f"{month}:{employee_id}"},
+            {
+                "_id": f"{month}:{employee_id}",
+                "month": month,
+                "employee_id": employee_id,
+                "count": len(rows),
+                "records": _pack(list(rows.values())),
+                "archived_at": archived_at,
+            },
+            upsert=True,
+        ))
+    if ops:
+        await attendance_archive_collection.bulk_write(ops, ordered=False)
+        await attendance_collection.bulk_write([DeleteOne({"_id": _id}) for _id in moved], ordered=False)
+    return len(moved)
+
+
+async def archive_month(month: str) -> int:
+    """Move one month's hot records into the archive; returns how many records moved."""
+    if not await reports.is_built(month):
+        await reports.build_month(month)
+    first_day, next_month = reports.month_bounds(month)
+    # Employees being purged stay hot; the purge worker removes their records
+    purging = {doc["_id"] async for doc in purge_jobs_collection.find({"state": "pending"}, {"_id": 1})}
+
+    moved = 0
+    last_employee = None
+    while True:
+        query = attendance_codec.date_range(first_day, date_before=next_month)
+        if last_employee is not None:
+            query["employee_id"] = {"$gt": last_employee}
+        page = await (
+            attendance_collection.find(query)
+            .sort([("employee_id", 1), ("date", 1)])
+            .hint([("employee_id", 1), ("date", 1)])
+            .limit(ARCHIVE_BATCH_SIZE)
+            .to_list(length=ARCHIVE_BATCH_SIZE)
+        )
+        if not page:
+            break
+        by_employee: dict[str, list[dict]] = defaultdict(list)
+        for record in page:
+            by_employee[record["employee_id"]].append(record)
+        if len(page) == ARCHIVE_BATCH_SIZE and len(by_employee) > 1:
+            # The last employee may continue on the next page; take all of it there
+            by_employee.pop(page[-1]["employee_id"])
+        last_employee = max(by_employee)
+        moved += await _archive_employees(
+            month, {employee_id: records for employee_id, records in by_employee.items() if employee_id not in purging}
+        )
+        if len(page) < ARCHIVE_BATCH_SIZE:
+            break
+
+    await summarize_month(month)
+    return moved
+
+
+async def _oldest_hot_date(before: str) -> Optional[str]:
+    oldest = []
+    # BSON orders strings before dates, so each stored type has its own minimum
+    for date_type in ("string", "date"):
+        doc = await attendance_collection.find_one(
+            {"$and": [attendance_codec.date_range(date_before=before), {"date": {"$type": date_type}}]},
+            {"date": 1},
+            sort=[("date", 1)],
+        )
+        if doc:
+            oldest.append(attendance_codec.decode_date(doc["date"]))
+    return min(oldest, default=None)
+
+
+async def archive_closed_months(today: dt_date = None) -> dict:
+    """Advance the watermark to keep ATTENDANCE_HOT_MONTHS months hot and archive everything behind it."""
+    today = today or dt_date.today()
+    target = shift_month(today.strftime("%Y-%m"), -(ATTENDANCE_HOT_MONTHS - 1)) + "-01"
+    doc = await migrations_collection.find_one({"_id": WATERMARK_ID})
+    watermark = doc.get("archived_before") if doc else None
+    if watermark is None or watermark < target:
+        await migrations_collection.update_one(
+            {"_id": WATERMARK_ID},
+            {"$max": {"archived_before": target}, "$set": {"updated_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        watermark = target
+        _watermark.update(value=watermark, checked_at=time.monotonic())
+        # Give every worker time to see the new watermark and stop writing behind it
+        await asyncio.sleep(2 * ARCHIVE_WATERMARK_INTERVAL)
+    _watermark.update(value=watermark, checked_at=time.monotonic())
+
+    moved = {}
+    oldest = await _oldest_hot_date(watermark)
+    if oldest:
+        month = oldest[:7]
+        while month < watermark[:7]:
+            moved[month] = await archive_month(month)
+            month = shift_month(month, 1)
+    return {"archived_before": watermark, "moved": moved}
+
+
+async def drop_employee(employee_id: str) -> list[dict]:
+    """Delete an employee's archived records; returns them so derived views can be adjusted."""
+    rows = [
+        row
+        async for doc in attendance_archive_collection.find({"employee_id": employee_id})
+        for row in _unpack(doc)
+    ]
+    await attendance_archive_collection.delete_many({"employee_id": employee_id})
+    return rows
+
+
+async def archive_scheduler() -> None:
+    """Background task (started from the app lifespan when ATTENDANCE_ARCHIVE is on)."""
+    while True:
+        try:
+            result = await archive_closed_months()
+            for month, moved in result["moved"].items():
+                logger.info("Archived %d attendance records of %s", moved, month)
+        except Exception:
+            logger.exception("Attendance archival run failed")
+        await asyncio.sleep(ATTENDANCE_ARCHIVE_INTERVAL)
@@ -0,0 +1,189 @@
+"""
+Batch attendance ingestion — applies many mark-in / mark-out / mark-absent
+events with a fixed number of round trips:
+
+  1. one `$in` lookup for the employees missing from the shift cache
+  2. one `$in` lookup for the existing (employee_id, date) records
+  3. one unordered `bulk_write` for all resulting inserts and updates
+
+Status rules are the same ones used by the single-event routes.
+"""
+import asyncio
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from database import attendance_collection
+from models.attendance import AttendanceEvent
+from services.attendance_rules import in_status, resolve_out
+from services import attendance_archive, attendance_codec, attendance_events, employee_cache
+from services.attendance_events import Transition
+
+DUPLICATE_KEY_ERROR = 11000
+ARCHIVED_DETAIL = "Attendance for this date is archived and read-only."
+OUT_FIELDS = ("out_time", "status", "worked_minutes", "overtime_minutes")
+
+
+def _result(index: int, event: AttendanceEvent, outcome: str, detail: str = None, record: dict = None) -> dict:
+    return {
+        "index": index,
+        "action": event.action,
+        "employee_id": event.employee_id,
+        "date": str(event.date),
+        "status": outcome,
+        "detail": detail,
+        "record": record,
+    }
+
+
+def _date_values(att_date: str) -> list:
+    match = attendance_codec.date_match(att_date)
+    return match["$in"] if isinstance(match, dict) else [match]
+
+
+async def _load_records(employee_ids: list[str], dates: list[str]) -> dict:
+    records = {}
+    cursor = attendance_collection.find({
+        "employee_id": {"$in": employee_ids},
+        "date": {"$in": [value for d in dates for value in _date_values(d)]},
+    })
+    async for rec in cursor:
+        records[(rec["employee_id"], attendance_codec.decode_date(rec["date"]))] = rec
+    return records
+
+
+async def _lost_updates(updates: dict) -> set:
+    """Keys whose mark-out was beaten by a concurrent writer (the record holds another out_time)."""
+    by_id = {record["_id"]: key for key, record in updates.items()}
+    cursor = attendance_collection.find({"_id": {"$in": list(by_id)}}, {"out_time": 1})
+    stored = {rec["_id"]: rec.get("out_time") async for rec in cursor}
+    return {
+        key for _id, key in by_id.items()
+        if stored.get(_id) != attendance_codec.encode_time(updates[key]["out_time"])
+    }
+
+
+async def apply_events(events: list[tuple[int, AttendanceEvent]]) -> dict[int, dict]:
+    """
+    Apply validated events in batch order and return a result per event index.
+
+    Events touching the same (employee_id, date) are resolved in memory, so a
+    mark-in followed by a mark-out in the same batch becomes a single insert.
+    """
+    results: dict[int, dict] = {}
+    if not events:
+        return results
+
+    watermark = await attendance_archive.archived_before()
+    if watermark:
+        writable = []
+        for index, event in events:
+            if str(event.date) < watermark:
+                results[index] = _result(index, event, "conflict", ARCHIVED_DETAIL)
+            else:
+                writable.append((index, event))
+        events = writable
+        if not events:
+            return results
+
+    employee_ids = list({event.employee_id for _, event in events})
+    dates = list({str(event.date) for _, event in events})
+    employees, records = await asyncio.gather(
+        employee_cache.get_shifts(employee_ids),
+        _load_records(employee_ids, dates),
+    )
+
+    inserts: dict[tuple, dict] = {}
+    updates: dict[tuple, dict] = {}
+    owners: dict[tuple, list[int]] = {}
+    # Status of each touched key before this batch (None for new records)
+    original_status: dict[tuple, str] = {}
+
+    for index, event in events:
+        att_date = str(event.date)
+        key = (event.employee_id, att_date)
+        employee = employees.get(event.employee_id)
+        if employee is None:
+            results[index] = _result(index, event, "not_found", "Employee not found.")
+            continue
+
+        record = records.get(key)
+        if event.action == "out":
+            if record is None:
+                results[index] = _result(index, event, "not_found", "No IN record found for this date. Cannot mark OUT.")
+                continue
+            if record.get("out_time"):
+                results[index] = _result(index, event, "conflict", "Already marked OUT for this date.")
+                continue
+            original_status.setdefault(key, record.get("status"))
+            record.update(resolve_out(record.get("status"), record.get("in_time"), event.out_time, employee.shift_end))
+            if key not in inserts:
+                updates[key] = record
+            results[index] = _result(index, event, "updated", record=dict(record))
+        else:
+            if record is not None:
+                results[index] = _result(index, event, "conflict", "Attendance already has a record for this date.")
+                continue
+            if event.action == "in":
+                att_status = in_status(event.in_time, employee.grace_end)
+                in_time = event.in_time
+            else:
+                att_status = "Absent"
+                in_time = None
+            record = {
+                "_id": ObjectId(),
+                "employee_id": event.employee_id,
+                "date": att_date,
+                "in_time": in_time,
+                "out_time": None,
+                "status": att_status,
+            }
+            original_status.setdefault(key, None)
+            records[key] = record
+            inserts[key] = record
+            results[index] = _result(index, event, "created", record=dict(record))
+        owners.setdefault(key, []).append(index)
+
+    ops = []
+    op_keys = []
+    for key, record in inserts.items():
+        ops.append(InsertOne(attendance_codec.encode_fields(record)))
+        op_keys.append(key)
+    for key, record in updates.items():
+        ops.append(UpdateOne(
+            {"_id": record["_id"], "out_time": None},
+            {"$set": attendance_codec.encode_fields({field: record[field] for field in OUT_FIELDS})},
+        ))
+        op_keys.append(key)
+
+    failed = set()
+    if ops:
+        try:
+            matched = (await attendance_collection.bulk_write(ops, ordered=False)).matched_count
+        except BulkWriteError as exc:
+            matched = exc.details.get("nMatched", 0)
+            # A concurrent writer got there first; report every event on that key as a conflict
+            for error in exc.details.get("writeErrors", []):
+                key = op_keys[error["index"]]
+                failed.add(key)
+                detail = "Attendance already has a record for this date."
+                if error.get("code") != DUPLICATE_KEY_ERROR:
+                    detail = error.get("errmsg", "Write failed.")
+                for index in owners.get(key, []):
+                    results[index].update(status="conflict", detail=detail, record=None)
+        # An update matching nothing is not a write error: find mark-outs that lost a race
+        if matched < len(updates):
+            for key in await _lost_updates(updates):
+                failed.add(key)
+                for index in owners.get(key, []):
+                    results[index].update(status="conflict", detail="Already marked OUT for this date.", record=None)
+
+    # Records only gain an out_time in a batch, so the worked time is all new
+    await attendance_events.record_transitions([
+        Transition(
+            key[0], key[1], original_status[key], records[key]["status"],
+            records[key].get("worked_minutes", 0),
+        )
+        for key in op_keys
+        if key not in failed
+    ])
+    return results
@@ -0,0 +1,134 @@
+"""
+End-of-day attendance close-out.
+
+`close_day` makes two keyset-paged passes over one date, CLOSE_BATCH_SIZE
+records at a time, so memory stays bounded whatever the headcount:
+
+  1. open records (IN but no OUT, found through the (date, out_time) index)
+     are either closed at the employee's shift end ("close") or marked
+     `needs_review` for an admin ("flag")
+  2. every closed record gets `worked_minutes` / `overtime_minutes`
+     (against the employee's shift end) where they are missing or stale
+
+Each page costs one read, one shift-cache lookup and one unordered
+`bulk_write`. Status and minute rules are the shared `resolve_out` ones.
+"""
+import asyncio
+import logging
+import os
+from datetime import date as dt_date, timedelta
+from pymongo import UpdateOne
+from database import attendance_collection
+from services import attendance_codec, attendance_events, employee_cache, reports, summary_cache
+from services.attendance_events import Transition
+from services.attendance_rules import resolve_out
+
+logger = logging.getLogger(__name__)
+
+CLOSE_MODES = ("close", "flag")
+CLOSE_BATCH_SIZE = int(os.getenv("CLOSE_BATCH_SIZE", "1000"))
+AUTO_CLOSE = os.getenv("AUTO_CLOSE", "false").lower() in ("1", "true", "yes")
+AUTO_CLOSE_MODE = os.getenv("AUTO_CLOSE_MODE", "flag")
+AUTO_CLOSE_INTERVAL = float(os.getenv("AUTO_CLOSE_INTERVAL", "3600"))
+if AUTO_CLOSE_MODE not in CLOSE_MODES:
+    raise RuntimeError(f"AUTO_CLOSE_MODE must be one of {CLOSE_MODES}")
+
+OPEN_PROJECTION = {"employee_id": 1, "in_time": 1, "status": 1}
+TIMESHEET_PROJECTION = {"employee_id": 1, "in_time": 1, "out_time": 1, "worked_minutes": 1, "overtime_minutes": 1}
+
+
+async def _pages(query: dict, projection: dict):
+    """Lists of matching records in _id order, one bounded page at a time."""
+    last_id = None
+    while True:
+        page_query = query if last_id is None else {**query, "_id": {"$gt": last_id}}
+        cursor = attendance_collection.find(page_query, projection).sort("_id", 1).limit(CLOSE_BATCH_SIZE)
+        page = await cursor.to_list(length=CLOSE_BATCH_SIZE)
+        if not page:
+            return
+        yield page
+        if len(page) < CLOSE_BATCH_SIZE:
+            return
+        last_id = page[-1]["_id"]
+
+
+async def close_open_records(att_date: str, mode: str) -> dict:
+    """Close or flag the records of `att_date` that have an IN but no OUT."""
+    counts = {"closed": 0, "flagged": 0}
+    raced = False
+    query = {"date": attendance_codec.date_match(att_date), "out_time": None, "in_time": {"$ne": None}}
+    if mode == "flag":
+        query["needs_review"] = {"$ne": True}
+
+    async for page in _pages(query, OPEN_PROJECTION):
+        shifts = await employee_cache.get_shifts([rec["employee_id"] for rec in page])
+        ops = []
+        transitions = []
+        for rec in page:
+            shift = shifts.get(rec["employee_id"])
+            if mode == "close" and shift is not None:
+                fields = resolve_out(rec.get("status"), rec["in_time"], shift.shift_end.strftime("%H:%M"), shift.shift_end)
+                fields["auto_closed"] = True
+                transitions.append(Transition(
+                    rec["employee_id"], att_date, rec.get("status"), fields["status"], fields["worked_minutes"],
+                ))
+                counts["closed"] += 1
+            else:
+                # Flag mode, or the employee is gone and there is no shift to close against
+                fields = {"needs_review": True}
+                counts["flagged"] += 1
+            ops.append(UpdateOne({"_id": rec["_id"], "out_time": None}, {"$set": attendance_codec.encode_fields(fields)}))
+        result = await attendance_collection.bulk_write(ops, ordered=False)
+        if result.modified_count < len(ops):
+            # Someone marked OUT meanwhile and recorded their own transition;
+            # which of ours lost is unknown, so the derived views are rebuilt instead
+            raced = True
+        else:
+            await attendance_events.record_transitions(transitions)
+    if raced and mode == "close":
+        await summary_cache.rebuild(att_date)
+        if await reports.is_built(att_date[:7]):
+            await reports.build_month(att_date[:7])
+    return counts
+
+
+async def compute_timesheets(att_date: str) -> int:
+    """Store worked and overtime minutes on every closed record of `att_date`; returns how many changed."""
+    updated = 0
+    query = {"date": attendance_codec.date_match(att_date), "out_time": {"$ne": None}}
+    async for page in _pages(query, TIMESHEET_PROJECTION):
+        shifts = await employee_cache.get_shifts([rec["employee_id"] for rec in page])
+        ops = []
+        for rec in page:
+            shift = shifts.get(rec["employee_id"])
+            if shift is None:
+                continue
+            fields = resolve_out(None, rec.get("in_time"), rec["out_time"], shift.shift_end)
+            minutes = {"worked_minutes": fields["worked_minutes"], "overtime_minutes": fields["overtime_minutes"]}
+            if any(rec.get(field) != value for field, value in minutes.items()):
+                ops.append(UpdateOne({"_id": rec["_id"]}, {"$set": minutes}))
+        if ops:
+            await attendance_collection.bulk_write(ops, ordered=False)
+            updated += len(ops)
+    return updated
+
+
+async def close_day(att_date: str, mode: str = AUTO_CLOSE_MODE) -> dict:
+    counts = await close_open_records(att_date, mode)
+    counts["timesheets_updated"] = await compute_timesheets(att_date)
+    return counts
+
+
+async def auto_close_scheduler() -> None:
+    """Background task (started from the app lifespan) closing out the previous day once."""
+    closed_day = None
+    while True:
+        yesterday = dt_date.today() - timedelta(days=1)
+        if closed_day != yesterday:
+            try:
+                counts = await close_day(str(yesterday))
+                closed_day = yesterday
+                logger.info("Closed out %s: %s", yesterday, counts)
+            except Exception:
+                logger.exception("Auto-close run failed")
+        await asyncio.sleep(AUTO_CLOSE_INTERVAL)
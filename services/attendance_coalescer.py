@@ -0,0 +1,79 @@
+"""
+Group commit for the single-event attendance routes.
+
+With ATTENDANCE_COALESCE on, `mark-in`, `mark-out` and `mark-absent` hand
+their event to `submit` instead of writing it themselves. Events arriving
+within ATTENDANCE_COALESCE_WINDOW_MS of the first one (or until
+ATTENDANCE_COALESCE_MAX_EVENTS are queued) are applied together through
+`attendance_batch.apply_events`: one shift lookup, one record lookup and one
+`bulk_write` for the whole group, in arrival order. Each caller then gets the
+result for its own event.
+
+At shift start this turns hundreds of concurrent requests, each holding a
+pooled connection for two or three round trips, into a handful of batches.
+The cost is up to one window of added latency per request.
+"""
+import asyncio
+import logging
+import os
+from models.attendance import AttendanceEvent
+from services.attendance_batch import apply_events
+
+logger = logging.getLogger(__name__)
+
+ATTENDANCE_COALESCE = os.getenv("ATTENDANCE_COALESCE", "false").lower() in ("1", "true", "yes")
+ATTENDANCE_COALESCE_WINDOW_MS = float(os.getenv("ATTENDANCE_COALESCE_WINDOW_MS", "5"))
+ATTENDANCE_COALESCE_MAX_EVENTS = int(os.getenv("ATTENDANCE_COALESCE_MAX_EVENTS", "500"))
+
+# Events waiting for the next flush, with the future each caller awaits
+_queue: dict[str, list[tuple[AttendanceEvent, asyncio.Future]]] = {"events": []}
+# Scheduled flushes, referenced until done so they are not garbage collected mid-write
+_tasks: set[asyncio.Task] = set()
+
+
+async def submit(event: AttendanceEvent) -> dict:
+    """Queue one event for the next group commit and return its `apply_events` result."""
+    future = asyncio.get_running_loop().create_future()
+    batch = _queue["events"]
+    batch.append((event, future))
+    if len(batch) >= ATTENDANCE_COALESCE_MAX_EVENTS:
+        _queue["events"] = []
+        _spawn(_flush(batch))
+    elif len(batch) == 1:
+        _spawn(_flush_after_window(batch))
+    # Shielded so a disconnecting client does not cancel the shared flush's result
+    return await asyncio.shield(future)
+
+
+def _spawn(coroutine) -> None:
+    task = asyncio.create_task(coroutine)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def drain() -> None:
+    """Wait for every queued or in-flight flush; called on shutdown before the Mongo client closes."""
+    while _tasks:
+        await asyncio.gather(*list(_tasks), return_exceptions=True)
+
+
+async def _flush_after_window(batch: list) -> None:
+    await asyncio.sleep(ATTENDANCE_COALESCE_WINDOW_MS / 1000)
+    # Already flushed if it filled up during the window
+    if _queue["events"] is batch:
+        _queue["events"] = []
+        await _flush(batch)
+
+
+async def _flush(batch: list) -> None:
+    try:
+        results = await apply_events([(index, event) for index, (event, _) in enumerate(batch)])
+    except Exception as exc:
+        logger.exception("Coalesced attendance batch of %d events failed", len(batch))
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(exc)
+        return
+    for index, (_, future) in enumerate(batch):
+        if not future.done():
+            future.set_result(results[index])
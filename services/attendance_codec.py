@@ -0,0 +1,162 @@
+"""
+Storage format of attendance dates and times.
+
+The API speaks "YYYY-MM-DD" dates and "HH:MM" times. In storage they are
+either those strings (legacy) or native types: the date as a BSON datetime at
+UTC midnight and the times as minutes since midnight, so range filters and
+hours-worked aggregations run on the server without string parsing.
+
+ATTENDANCE_STORAGE picks the format:
+
+  string  read and write strings (default, legacy deployments)
+  dual    write native, match both formats; use while `migrate_attendance.py` runs
+  native  read and write native only, once the migration has finished
+
+Reads decode both formats in every mode.
+"""
+import os
+from datetime import date as dt_date, datetime, time as dt_time
+from typing import Optional
+
+STORAGE_MODES = ("string", "dual", "native")
+ATTENDANCE_STORAGE = os.getenv("ATTENDANCE_STORAGE", "string").lower()
+if ATTENDANCE_STORAGE not in STORAGE_MODES:
+    raise RuntimeError(f"ATTENDANCE_STORAGE must be one of {STORAGE_MODES}")
+
+WRITES_NATIVE = ATTENDANCE_STORAGE != "string"
+TIME_FIELDS = ("in_time", "out_time")
+
+
+# ── Python values ─────────────────────────────────────────────────
+def parse_date(value: str) -> dt_date:
+    """
+    A client-supplied "YYYY-MM-DD" date; ValueError for anything else, including
+    the other ISO forms `date.fromisoformat` accepts ("20260220", "2026-W08-5").
+    """
+    parsed = datetime.strptime(value, "%Y-%m-%d").date()
+    if parsed.isoformat() != value:
+        raise ValueError("Dates must be in YYYY-MM-DD format")
+    return parsed
+
+
+def to_datetime(value: str) -> datetime:
+    return datetime.combine(dt_date.fromisoformat(value), dt_time())
+
+
+def encode_date(value: str):
+    return to_datetime(value) if WRITES_NATIVE else value
+
+
+def decode_date(value) -> str:
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+def encode_time(value: Optional[str]):
+    if value is None or not WRITES_NATIVE or isinstance(value, int):
+        return value
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def decode_time(value) -> Optional[str]:
+    if isinstance(value, int):
+        return f"{value // 60:02d}:{value % 60:02d}"
+    return value
+
+
+def encode_fields(fields: dict) -> dict:
+    """Storage form of the date / time fields present in `fields`; others pass through."""
+    encoded = dict(fields)
+    if "date" in encoded:
+        encoded["date"] = encode_date(encoded["date"])
+    for field in TIME_FIELDS:
+        if field in encoded:
+            encoded[field] = encode_time(encoded[field])
+    return encoded
+
+
+# ── Query fragments ───────────────────────────────────────────────
+def date_match(value: str):
+    """Filter value matching the records of one date."""
+    if ATTENDANCE_STORAGE == "string":
+        return value
+    if ATTENDANCE_STORAGE == "native":
+        return to_datetime(value)
+    return {"$in": [value, to_datetime(value)]}
+
+
+def date_range(date_from: Optional[str] = None, date_to: Optional[str] = None, date_before: Optional[str] = None) -> dict:
+    """
+    Filter (to merge into a query) for dates in [date_from, date_to], or
+    [date_from, date_before) when `date_before` is given.
+    """
+    def bounds(convert) -> dict:
+        condition = {}
+        if date_from:
+            condition["$gte"] = convert(date_from)
+        if date_to:
+            condition["$lte"] = convert(date_to)
+        if date_before:
+            condition["$lt"] = convert(date_before)
+        return condition
+
+    if ATTENDANCE_STORAGE == "string":
+        return {"date": bounds(str)}
+    if ATTENDANCE_STORAGE == "native":
+        return {"date": bounds(to_datetime)}
+    # Range operators only match values of the same BSON type
+    return {"$or": [{"date": bounds(str)}, {"date": bounds(to_datetime)}]}
+
+
+def string_minutes_expr(field: str) -> dict:
+    """
+    Aggregation expression: minutes since midnight of an "H:MM" / "HH:MM"
+    field, or null when it does not hold such a string. Split on ":" rather
+    than sliced by position so unpadded legacy values still parse, and
+    converted with onError so one bad record cannot fail a whole pipeline.
+    """
+    def part(index: int) -> dict:
+        return {"$convert": {
+            "input": {"$arrayElemAt": ["$$parts", index]},
+            "to": "int", "onError": None, "onNull": None,
+        }}
+
+    text = {"$cond": [{"$eq": [{"$type": f"${field}"}, "string"]}, f"${field}", ""]}
+    return {"$let": {
+        "vars": {"parts": {"$split": [text, ":"]}},
+        "in": {"$add": [{"$multiply": [part(0), 60]}, part(1)]},
+    }}
+
+
+def minutes_expr(field: str) -> dict:
+    """Aggregation expression: minutes since midnight of a stored time field."""
+    if ATTENDANCE_STORAGE == "native":
+        return f"${field}"
+    if ATTENDANCE_STORAGE == "string":
+        return string_minutes_expr(field)
+    return {"$cond": [{"$isNumber": f"${field}"}, f"${field}", string_minutes_expr(field)]}
+
+
+def to_native_stage() -> dict:
+    """
+    Pipeline-update `$set` converting any string date / times of a record in
+    place. A value that does not parse is left as it was (and still matches
+    `has_string_fields`) rather than failing the whole update.
+    """
+    def converted(field: str, expression: dict) -> dict:
+        return {"$cond": [{"$eq": [{"$type": f"${field}"}, "string"]}, expression, f"${field}"]}
+
+    stage = {"date": converted("date", {"$dateFromString": {
+        "dateString": "$date", "format": "%Y-%m-%d", "timezone": "UTC",
+        "onError": "$date", "onNull": "$date",
+    }})}
+    for field in TIME_FIELDS:
+        stage[field] = converted(field, {"$ifNull": [string_minutes_expr(field), f"${field}"]})
+    return {"$set": stage}
+
+
+def has_string_fields() -> dict:
+    """Filter for records that still hold a string date or time."""
+    return {"$or": [{field: {"$type": "string"}} for field in ("date", *TIME_FIELDS)]}
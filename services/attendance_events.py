@@ -0,0 +1,35 @@
+"""
+Attendance change fan-out.
+
+Write paths report what changed as `Transition`s once; every derived view
+(daily dashboard summary, monthly rollups, live dashboard streams) is updated
+from the same list.
+"""
+from typing import NamedTuple, Optional
+from services import dashboard_stream, reports, summary_cache
+
+
+class Transition(NamedTuple):
+    employee_id: str
+    date: str
+    old_status: Optional[str]     # None for a newly created record
+    new_status: Optional[str]     # None for a removed record
+    worked_minutes: int = 0       # change in minutes worked
+
+
+async def record_transitions(transitions: list[Transition]) -> None:
+    if not transitions:
+        return
+    await summary_cache.record_transitions([(t.date, t.old_status, t.new_status) for t in transitions])
+    dashboard_stream.broadcaster.publish(transitions)
+    await reports.record_transitions(transitions)
+
+
+async def record_transition(
+    employee_id: str,
+    date: str,
+    old_status: Optional[str],
+    new_status: Optional[str],
+    worked_minutes: int = 0,
+) -> None:
+    await record_transitions([Transition(employee_id, date, old_status, new_status, worked_minutes)])
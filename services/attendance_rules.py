@@ -0,0 +1,167 @@
+"""
+Attendance status rules — shared by the single-event routes and batch paths.
+"""
+from datetime import datetime, date, time, timedelta
+from functools import lru_cache
+from services.attendance_codec import encode_time, minutes_expr
+
+GRACE_PERIOD_MINUTES = 15
+DEFAULT_SHIFT_START = "09:00"
+DEFAULT_SHIFT_END = "18:00"
+
+# Dashboard bucket(s) each stored status counts towards. Combined statuses
+# count in every bucket they describe.
+STATUS_BUCKETS = {
+    "Present": ("present",),
+    "Late": ("late",),
+    "Early Exit": ("early_exit",),
+    "Late & Early Exit": ("late", "early_exit"),
+    "Incomplete": ("incomplete",),
+    "Absent": ("absent",),
+}
+SUMMARY_BUCKETS = ("present", "late", "early_exit", "incomplete", "absent")
+
+
+@lru_cache(maxsize=2048)
+def parse_time(time_str: str) -> time:
+    """Helper to parse HH:MM string to time object for comparison"""
+    return datetime.strptime(time_str, "%H:%M").time()
+
+
+def normalize_time(value) -> str:
+    """A client-supplied time as zero-padded "HH:MM" ("9:5" → "09:05"); ValueError if it is not a time."""
+    try:
+        return parse_time(value.strip()).strftime("%H:%M")
+    except (AttributeError, ValueError):
+        raise ValueError("Time must be in HH:MM format") from None
+
+
+def _as_time(value) -> time:
+    """A time from a time object, an "HH:MM" string or stored minutes since midnight."""
+    if isinstance(value, time):
+        return value
+    if isinstance(value, int):
+        return time(value // 60, value % 60)
+    return parse_time(value)
+
+
+def add_minutes(time_obj: time, minutes: int) -> time:
+    """Add minutes to a time object"""
+    dt = datetime.combine(date.today(), time_obj)
+    new_dt = dt + timedelta(minutes=minutes)
+    return new_dt.time()
+
+
+def minutes_of_day(value) -> int:
+    if isinstance(value, int):
+        return value
+    t = _as_time(value)
+    return t.hour * 60 + t.minute
+
+
+def worked_minutes(in_time, out_time) -> int:
+    """Minutes between IN and OUT (0 when either is missing or, on legacy records, unreadable)."""
+    if in_time is None or out_time is None:
+        return 0
+    try:
+        return max(0, minutes_of_day(out_time) - minutes_of_day(in_time))
+    except ValueError:
+        return 0
+
+
+def overtime_minutes(out_time, shift_end) -> int:
+    """Minutes worked past the shift end (0 when leaving on time or early)."""
+    if out_time is None:
+        return 0
+    return max(0, minutes_of_day(out_time) - minutes_of_day(shift_end))
+
+
+def grace_period_end(shift_start) -> time:
+    """Latest IN time that still counts as on time for a shift start."""
+    return add_minutes(_as_time(shift_start), GRACE_PERIOD_MINUTES)
+
+
+def in_status(in_time, grace_end) -> str:
+    """
+    Status for a fresh IN record: "Late" past the grace period end,
+    otherwise "Incomplete" until the employee marks OUT.
+    """
+    if _as_time(in_time) > _as_time(grace_end):
+        return "Late"
+    return "Incomplete"
+
+
+def out_status(current_status: str, out_time, shift_end) -> str:
+    """Final status once an OUT time is recorded against the shift end."""
+    if _as_time(out_time) < _as_time(shift_end):
+        if current_status == "Late":
+            return "Late & Early Exit"
+        return "Early Exit"
+    # If they left on time or after shift
+    if current_status == "Incomplete":
+        return "Present"
+    # If they were late but left on time, they stay "Late"
+    return current_status
+
+
+def resolve_out(current_status: str, in_time, out_time, shift_end) -> dict:
+    """
+    Every field an OUT time settles on a record: final status, worked and
+    overtime minutes. Pure, so request handlers and batch jobs share it.
+    """
+    return {
+        "out_time": out_time,
+        "status": out_status(current_status, out_time, shift_end),
+        "worked_minutes": worked_minutes(in_time, out_time),
+        "overtime_minutes": overtime_minutes(out_time, shift_end),
+    }
+
+
+def out_status_expr(out_time, shift_end) -> dict:
+    """
+    `out_status` as an aggregation expression over the stored `$status`,
+    for pipeline updates that must set the final status atomically.
+    """
+    if _as_time(out_time) < _as_time(shift_end):
+        return {"$cond": [{"$eq": ["$status", "Late"]}, "Late & Early Exit", "Early Exit"]}
+    return {"$cond": [{"$eq": ["$status", "Incomplete"]}, "Present", "$status"]}
+
+
+def worked_minutes_expr() -> dict:
+    """
+    `worked_minutes` as an aggregation expression over in_time / out_time.
+    An unreadable time makes the difference null, which `$max` skips, so
+    such records count 0 minutes like `worked_minutes` does.
+    """
+    return {"$cond": [
+        {"$and": [{"$gt": ["$in_time", None]}, {"$gt": ["$out_time", None]}]},
+        {"$max": [0, {"$subtract": [minutes_expr("out_time"), minutes_expr("in_time")]}]},
+        0,
+    ]}
+
+
+def resolve_out_expr(out_time, shift_end) -> dict:
+    """
+    `resolve_out` as a pipeline `$set` stage body over the stored status and
+    in_time. An unreadable legacy in_time counts 0 worked minutes, as in
+    `worked_minutes_expr`, instead of failing the update.
+    """
+    return {
+        "out_time": encode_time(out_time),
+        "status": out_status_expr(out_time, shift_end),
+        "worked_minutes": {"$cond": [
+            {"$gt": ["$in_time", None]},
+            {"$max": [0, {"$subtract": [minutes_of_day(out_time), minutes_expr("in_time")]}]},
+            0,
+        ]},
+        "overtime_minutes": overtime_minutes(out_time, shift_end),
+    }
+
+
+def bucket_counts(status_counts: dict) -> dict:
+    """Fold per-status record counts into the dashboard buckets."""
+    buckets = dict.fromkeys(SUMMARY_BUCKETS, 0)
+    for att_status, count in status_counts.items():
+        for bucket in STATUS_BUCKETS.get(att_status, ()):
+            buckets[bucket] += count
+    return buckets
@@ -0,0 +1,132 @@
+"""
+Automatic absent marking.
+
+Once an employee's shift has ended (plus AUTO_ABSENT_GRACE_MINUTES) without
+any attendance record for the day, they are marked Absent. Each run is:
+
+  1. one aggregation over `employees` that anti-joins `attendance` for the
+     date (a `$lookup` on the (employee_id, date) index keeping empty matches)
+  2. one unordered `bulk_write` of `$setOnInsert` upserts
+
+so a record made concurrently by mark-in always wins. The scheduler runs in
+every worker; the upserts make overlapping runs harmless.
+"""
+import asyncio
+import logging
+import os
+from datetime import date as dt_date, datetime, timedelta
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from database import employees_collection, attendance_collection
+from services import attendance_codec, attendance_events
+from services.attendance_events import Transition
+from services.attendance_rules import DEFAULT_SHIFT_START, DEFAULT_SHIFT_END, minutes_of_day
+
+logger = logging.getLogger(__name__)
+
+AUTO_ABSENT = os.getenv("AUTO_ABSENT", "false").lower() in ("1", "true", "yes")
+AUTO_ABSENT_GRACE_MINUTES = int(os.getenv("AUTO_ABSENT_GRACE_MINUTES", "60"))
+AUTO_ABSENT_INTERVAL = float(os.getenv("AUTO_ABSENT_INTERVAL", "300"))
+AUTO_ABSENT_WEEKENDS = os.getenv("AUTO_ABSENT_WEEKENDS", "false").lower() in ("1", "true", "yes")
+
+END_OF_DAY = "24:00"   # sorts after every HH:MM shift end
+
+
+def is_working_day(day: dt_date) -> bool:
+    return AUTO_ABSENT_WEEKENDS or day.weekday() < 5
+
+
+def absentee_pipeline(att_date: str, cutoff: str = END_OF_DAY) -> list[dict]:
+    """Employees whose shift ended by `cutoff` (HH:MM) and who have no record on `att_date`."""
+    shift_start = {"$ifNull": ["$shift_start_time", DEFAULT_SHIFT_START]}
+    shift_end = {"$ifNull": ["$shift_end_time", DEFAULT_SHIFT_END]}
+    conditions = [{"$lte": [shift_end, cutoff]}]
+    if cutoff != END_OF_DAY:
+        # An overnight shift ending "before" it starts is not over yet today
+        conditions.append({"$gt": [shift_end, shift_start]})
+    return [
+        {"$match": {"deleted": {"$ne": True}, "$expr": {"$and": conditions}}},
+        {"$lookup": {
+            "from": attendance_collection.name,
+            "localField": "employee_id",
+            "foreignField": "employee_id",
+            "pipeline": [
+                {"$match": {"date": attendance_codec.date_match(att_date)}},
+                {"$project": {"_id": 1}},
+                {"$limit": 1},
+            ],
+            "as": "records",
+        }},
+        {"$match": {"records": {"$size": 0}}},
+        {"$project": {"_id": 0, "employee_id": 1}},
+    ]
+
+
+async def mark_absentees(att_date: str, cutoff: str = END_OF_DAY) -> int:
+    """Mark every unrecorded employee whose shift is over as Absent; returns how many were created."""
+    absentees = [
+        doc["employee_id"]
+        async for doc in employees_collection.aggregate(absentee_pipeline(att_date, cutoff))
+    ]
+    if not absentees:
+        return 0
+
+    ops = [
+        UpdateOne(
+            {"employee_id": employee_id, "date": attendance_codec.date_match(att_date)},
+            {"$setOnInsert": {
+                "date": attendance_codec.encode_date(att_date),
+                "in_time": None, "out_time": None, "status": "Absent",
+            }},
+            upsert=True,
+        )
+        for employee_id in absentees
+    ]
+    try:
+        result = await attendance_collection.bulk_write(ops, ordered=False)
+        upserted = result.upserted_ids.keys()
+    except BulkWriteError as exc:
+        # Duplicate keys mean a concurrent mark-in or another worker got there first
+        upserted = [entry["index"] for entry in exc.details.get("upserted", [])]
+        unexpected = [e for e in exc.details.get("writeErrors", []) if e.get("code") != 11000]
+        if unexpected:
+            logger.error("Auto-absent for %s: %d write errors", att_date, len(unexpected))
+
+    await attendance_events.record_transitions([
+        Transition(absentees[index], att_date, None, "Absent") for index in upserted
+    ])
+    return len(upserted)
+
+
+async def backfill(date_from: dt_date, date_to: dt_date) -> dict[str, int]:
+    """Mark absentees for every working day in [date_from, date_to]; created count per date."""
+    created = {}
+    day = date_from
+    while day <= date_to:
+        if is_working_day(day):
+            created[str(day)] = await mark_absentees(str(day))
+        day += timedelta(days=1)
+    return created
+
+
+async def auto_absent_scheduler() -> None:
+    """Background task (started from the app lifespan) closing out the day shift by shift."""
+    closed_day = None
+    while True:
+        try:
+            now = datetime.now()
+            today = now.date()
+            # Finish the previous day once per process, covering shifts that ended after the last run
+            yesterday = today - timedelta(days=1)
+            if closed_day != yesterday:
+                if is_working_day(yesterday):
+                    await mark_absentees(str(yesterday))
+                closed_day = yesterday
+            cutoff = minutes_of_day(now.time()) - AUTO_ABSENT_GRACE_MINUTES
+            if is_working_day(today) and cutoff >= 0:
+                created = await mark_absentees(str(today), f"{cutoff // 60:02d}:{cutoff % 60:02d}")
+                if created:
+                    logger.info("Auto-marked %d employees absent for %s", created, today)
+        except Exception:
+            logger.exception("Auto-absent run failed")
+        await asyncio.sleep(AUTO_ABSENT_INTERVAL)
@@ -0,0 +1,151 @@
+"""
+Live dashboard fan-out for the `/dashboard/stream` SSE endpoint.
+
+One broadcaster per worker keeps a channel per watched date holding the
+current status counts. `attendance_events` publishes every attendance
+transition made in this worker; the channel accumulates them for
+DASHBOARD_STREAM_DEBOUNCE seconds and hands one delta to all subscribers,
+so N open screens cost one update per burst of changes instead of N polls.
+
+Every subscriber owns a single pending slot instead of a queue: while a
+slow client is still being written to, new deltas are merged into the slot
+and it receives one coalesced frame when it catches up.
+
+Writes handled by other workers (and purges) reach a channel through a
+resync every DASHBOARD_STREAM_RESYNC seconds, which recounts the date in
+Mongo (not this worker's summary LRU, which would lag by up to its TTL) and
+sends a fresh snapshot when the counts differ.
+"""
+import asyncio
+import logging
+import os
+from collections import Counter
+from typing import Optional
+from services import summary_cache
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_STREAM_DEBOUNCE = float(os.getenv("DASHBOARD_STREAM_DEBOUNCE", "0.5"))
+DASHBOARD_STREAM_RESYNC = float(os.getenv("DASHBOARD_STREAM_RESYNC", "30"))
+DASHBOARD_STREAM_HEARTBEAT = float(os.getenv("DASHBOARD_STREAM_HEARTBEAT", "15"))
+DASHBOARD_STREAM_MAX_SUBSCRIBERS = int(os.getenv("DASHBOARD_STREAM_MAX_SUBSCRIBERS", "1000"))
+
+
+def _nonzero(counts) -> dict:
+    return {status: count for status, count in counts.items() if count}
+
+
+class Subscriber:
+    """One connected screen: a single coalescing slot plus a wake-up event."""
+
+    def __init__(self, date: str):
+        self.date = date
+        self.ready = asyncio.Event()
+        self._snapshot: Optional[dict] = None
+        self._delta: Counter = Counter()
+
+    def push_snapshot(self, counts: dict) -> None:
+        self._snapshot = dict(counts)
+        self._delta.clear()
+        self.ready.set()
+
+    def push_delta(self, delta: Counter) -> None:
+        if self._snapshot is not None:
+            # An unsent snapshot absorbs the change
+            merged = Counter(self._snapshot)
+            merged.update(delta)
+            self._snapshot = _nonzero(merged)
+        else:
+            self._delta.update(delta)
+        self.ready.set()
+
+    def take(self) -> Optional[tuple[str, dict]]:
+        """("snapshot", status counts) or ("delta", status changes), or None if nothing is pending."""
+        self.ready.clear()
+        if self._snapshot is not None:
+            frame, self._snapshot = ("snapshot", self._snapshot), None
+            return frame
+        delta = _nonzero(self._delta)
+        self._delta.clear()
+        return ("delta", delta) if delta else None
+
+
+class _Channel:
+    def __init__(self, counts: dict):
+        self.counts = Counter(counts)
+        self.pending: Counter = Counter()
+        self.subscribers: set[Subscriber] = set()
+        self.flush: Optional[asyncio.Task] = None
+
+
+class Broadcaster:
+    def __init__(self):
+        self._channels: dict[str, _Channel] = {}
+        self._resync: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(channel.subscribers) for channel in self._channels.values())
+
+    async def subscribe(self, date: str) -> Subscriber:
+        channel = self._channels.get(date)
+        if channel is None:
+            counts = await summary_cache.get_status_counts(date)
+            # Another subscriber may have opened it while we awaited
+            channel = self._channels.setdefault(date, _Channel(counts))
+        subscriber = Subscriber(date)
+        channel.subscribers.add(subscriber)
+        subscriber.push_snapshot(_nonzero(channel.counts))
+        if self._resync is None or self._resync.done():
+            self._resync = asyncio.create_task(self._resync_loop())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        channel = self._channels.get(subscriber.date)
+        if channel is None:
+            return
+        channel.subscribers.discard(subscriber)
+        if not channel.subscribers:
+            if channel.flush is not None:
+                channel.flush.cancel()
+            del self._channels[subscriber.date]
+
+    def publish(self, transitions) -> None:
+        """Queue attendance transitions for the channels watching their dates (non-blocking)."""
+        for t in transitions:
+            channel = self._channels.get(t.date)
+            if channel is None or t.old_status == t.new_status:
+                continue
+            if t.old_status:
+                channel.pending[t.old_status] -= 1
+            if t.new_status:
+                channel.pending[t.new_status] += 1
+            if channel.flush is None or channel.flush.done():
+                channel.flush = asyncio.create_task(self._flush(t.date))
+
+    async def _flush(self, date: str) -> None:
+        await asyncio.sleep(DASHBOARD_STREAM_DEBOUNCE)
+        channel = self._channels.get(date)
+        if channel is None:
+            return
+        delta, channel.pending = channel.pending, Counter()
+        channel.counts.update(delta)
+        for subscriber in channel.subscribers:
+            subscriber.push_delta(delta)
+
+    async def _resync_loop(self) -> None:
+        while self._channels:
+            await asyncio.sleep(DASHBOARD_STREAM_RESYNC)
+            for date, channel in list(self._channels.items()):
+                try:
+                    counts = _nonzero(await summary_cache.fresh_status_counts(date))
+                except Exception:
+                    logger.exception("Dashboard stream resync failed for %s", date)
+                    continue
+                if counts != _nonzero(channel.counts) and not channel.pending:
+                    channel.counts = Counter(counts)
+                    for subscriber in channel.subscribers:
+                        subscriber.push_snapshot(counts)
+
+
+broadcaster = Broadcaster()
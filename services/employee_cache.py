@@ -0,0 +1,108 @@
+"""
+In-process employee shift cache for the attendance write paths.
+
+Entries hold the parsed shift times and the precomputed grace-period end,
+keyed by employee_id, in a size-bounded LRU with TTL. Local writes invalidate
+their own entries; other workers notice through a version stamp in the
+`cache_versions` collection, bumped on every employee change and re-checked
+at most every EMPLOYEE_CACHE_VERSION_INTERVAL seconds.
+"""
+import os
+import time
+from dataclasses import dataclass
+from datetime import time as dt_time
+from typing import Optional
+from pymongo import ReturnDocument
+from database import employees_collection, cache_versions_collection
+from services.cache import TTLCache
+from services.attendance_rules import (
+    DEFAULT_SHIFT_START,
+    DEFAULT_SHIFT_END,
+    parse_time,
+    grace_period_end,
+)
+
+EMPLOYEE_CACHE_SIZE = int(os.getenv("EMPLOYEE_CACHE_SIZE", "50000"))
+EMPLOYEE_CACHE_TTL = float(os.getenv("EMPLOYEE_CACHE_TTL", "300"))
+EMPLOYEE_CACHE_VERSION_INTERVAL = float(os.getenv("EMPLOYEE_CACHE_VERSION_INTERVAL", "2"))
+
+VERSION_KEY = "employees"
+SHIFT_PROJECTION = {"employee_id": 1, "shift_start_time": 1, "shift_end_time": 1}
+
+_shifts = TTLCache(maxsize=EMPLOYEE_CACHE_SIZE, ttl=EMPLOYEE_CACHE_TTL)
+_version = {"value": None, "checked_at": 0.0}
+
+
+@dataclass(frozen=True)
+class EmployeeShift:
+    employee_id: str
+    shift_start: dt_time
+    shift_end: dt_time
+    grace_end: dt_time
+
+
+def _from_document(emp: dict) -> EmployeeShift:
+    shift_start = parse_time(emp.get("shift_start_time") or DEFAULT_SHIFT_START)
+    return EmployeeShift(
+        employee_id=emp["employee_id"],
+        shift_start=shift_start,
+        shift_end=parse_time(emp.get("shift_end_time") or DEFAULT_SHIFT_END),
+        grace_end=grace_period_end(shift_start),
+    )
+
+
+async def _sync_version() -> None:
+    """Clear the cache if another worker changed employees since the last check."""
+    now = time.monotonic()
+    if now - _version["checked_at"] < EMPLOYEE_CACHE_VERSION_INTERVAL:
+        return
+    _version["checked_at"] = now
+    doc = await cache_versions_collection.find_one({"_id": VERSION_KEY})
+    remote = doc["version"] if doc else 0
+    if remote != _version["value"]:
+        _shifts.clear()
+        _version["value"] = remote
+
+
+async def get_shift(employee_id: str) -> Optional[EmployeeShift]:
+    """Shift info for one employee, or None if the employee does not exist."""
+    shifts = await get_shifts([employee_id])
+    return shifts.get(employee_id)
+
+
+async def get_shifts(employee_ids) -> dict[str, EmployeeShift]:
+    """Shift info for many employees; cache misses are resolved with one `$in` query."""
+    await _sync_version()
+    found = {}
+    missing = []
+    for employee_id in set(employee_ids):
+        shift = _shifts.get(employee_id)
+        if shift is None:
+            missing.append(employee_id)
+        else:
+            found[employee_id] = shift
+
+    if missing:
+        query = {"employee_id": missing[0]} if len(missing) == 1 else {"employee_id": {"$in": missing}}
+        # Offboarded employees count as missing while their history is purged
+        query["deleted"] = {"$ne": True}
+        async for emp in employees_collection.find(query, SHIFT_PROJECTION):
+            shift = _from_document(emp)
+            _shifts.set(shift.employee_id, shift)
+            found[shift.employee_id] = shift
+    return found
+
+
+async def invalidate(*employee_ids: str) -> None:
+    """Drop local entries and bump the shared version so other workers drop theirs."""
+    for employee_id in employee_ids:
+        _shifts.pop(employee_id)
+    doc = await cache_versions_collection.find_one_and_update(
+        {"_id": VERSION_KEY},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    # Our own bump needs no re-check; anything newer will still differ
+    if _version["value"] is not None and doc["version"] == _version["value"] + 1:
+        _version["value"] = doc["version"]
@@ -0,0 +1,190 @@
+"""
+Bulk employee import — validates and inserts an uploaded roster chunk by chunk.
+
+The upload (CSV with a header row, or a JSON array of objects) is parsed
+incrementally from the request stream. Every IMPORT_BATCH_SIZE rows cost:
+
+  1. one `$in` lookup on employee_id and one on email (run concurrently)
+  2. one unordered `insert_many` for the rows that passed
+
+Duplicates inside the upload itself are caught in memory before either query.
+"""
+import asyncio
+import codecs
+import csv
+import json
+import os
+from bson import ObjectId
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from database import employees_collection
+from models.employee import EmployeeCreate
+from services import employee_cache, summary_cache
+from services.employee_search import search_fields
+
+IMPORT_BATCH_SIZE = int(os.getenv("EMPLOYEE_IMPORT_BATCH_SIZE", "1000"))
+DUPLICATE_KEY_ERROR = 11000
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+# ── Streaming parsers ─────────────────────────────────────────────
+async def iter_csv_rows(chunks):
+    """Dicts keyed by the header row, read from an async iterator of byte chunks."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    header = None
+    pending = ""   # a record whose quoted field spans a line break
+    buffer = ""
+
+    def parse(lines: list[str]):
+        nonlocal header
+        for values in csv.reader(lines):
+            if not any(value.strip() for value in values):
+                continue
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            # Blank cells fall back to the model defaults (e.g. shift times)
+            yield {name: value.strip() for name, value in zip(header, values) if value.strip()}
+
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        complete = []
+        for line in lines:
+            pending += line + "\n"
+            if pending.count('"') % 2 == 0:
+                complete.append(pending)
+                pending = ""
+        for row in parse(complete):
+            yield row
+    tail = pending + buffer + decoder.decode(b"", final=True)
+    if tail.strip():
+        for row in parse([tail]):
+            yield row
+
+
+async def iter_json_array(chunks):
+    """Elements of a top-level JSON array, decoded as the bytes arrive."""
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    position = 0
+    started = finished = False
+
+    async for chunk in chunks:
+        buffer = buffer[position:] + text_decoder.decode(chunk)
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position >= len(buffer) or finished:
+                break
+            if not started:
+                if buffer[position] != "[":
+                    raise ImportFormatError("Body must be a JSON array of employees.")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                finished = True
+                position += 1
+                break
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break   # element continues in the next chunk
+            yield item
+
+    if not finished or buffer[position:].strip():
+        raise ImportFormatError("Body is not a complete JSON array.")
+
+
+# ── Import ────────────────────────────────────────────────────────
+async def _existing(field: str, values: list[str]) -> set[str]:
+    if not values:
+        return set()
+    cursor = employees_collection.find({field: {"$in": values}}, {"_id": 0, field: 1})
+    return {doc[field] async for doc in cursor}
+
+
+async def _import_batch(batch: list[tuple[int, EmployeeCreate]], results: list[dict]) -> int:
+    taken_ids, taken_emails = await asyncio.gather(
+        _existing("employee_id", [employee.employee_id for _, employee in batch]),
+        _existing("email", [employee.email for _, employee in batch]),
+    )
+    documents = []
+    rows = []
+    for row, employee in batch:
+        if employee.employee_id in taken_ids:
+            results[row].update(status="duplicate", detail=f"Employee with ID '{employee.employee_id}' already exists.")
+        elif employee.email in taken_emails:
+            results[row].update(status="duplicate", detail=f"Employee with email '{employee.email}' already exists.")
+        else:
+            fields = search_fields(employee.full_name, employee.email)
+            documents.append({"_id": ObjectId(), **employee.model_dump(), **fields})
+            rows.append(row)
+    if not documents:
+        return 0
+
+    failed = set()
+    try:
+        await employees_collection.insert_many(documents, ordered=False)
+    except BulkWriteError as exc:
+        # Lost a race with another writer between the lookup and the insert
+        for error in exc.details.get("writeErrors", []):
+            failed.add(error["index"])
+            detail = "Employee ID or email already exists."
+            if error.get("code") != DUPLICATE_KEY_ERROR:
+                detail = error.get("errmsg", "Write failed.")
+            results[rows[error["index"]]].update(status="duplicate", detail=detail)
+
+    for position, row in enumerate(rows):
+        if position not in failed:
+            results[row].update(status="created", id=str(documents[position]["_id"]))
+    return len(rows) - len(failed)
+
+
+async def import_employees(rows) -> dict:
+    """Validate and insert employees from an async iterator of raw rows; per-row report."""
+    results: list[dict] = []
+    seen_ids: set[str] = set()
+    seen_emails: set[str] = set()
+    batch: list[tuple[int, EmployeeCreate]] = []
+    created = 0
+
+    try:
+        async for raw in rows:
+            row = len(results)
+            results.append({"row": row, "employee_id": raw.get("employee_id") if isinstance(raw, dict) else None})
+            try:
+                employee = EmployeeCreate.model_validate(raw)
+            except ValidationError as exc:
+                results[row].update(status="invalid", detail=str(exc))
+                continue
+            if employee.employee_id in seen_ids:
+                results[row].update(status="duplicate", detail=f"Employee ID '{employee.employee_id}' repeats an earlier row.")
+                continue
+            if employee.email in seen_emails:
+                results[row].update(status="duplicate", detail=f"Email '{employee.email}' repeats an earlier row.")
+                continue
+            seen_ids.add(employee.employee_id)
+            seen_emails.add(employee.email)
+            batch.append((row, employee))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                created += await _import_batch(batch, results)
+                batch = []
+        if batch:
+            created += await _import_batch(batch, results)
+    finally:
+        # Earlier batches are committed even if the upload turns out to be malformed
+        if created:
+            summary_cache.adjust_employee_count(created)
+            await employee_cache.invalidate()
+
+    summary = {"created": 0, "duplicate": 0, "invalid": 0}
+    for result in results:
+        summary[result["status"]] += 1
+    return {"total": len(results), **summary, "results": results}
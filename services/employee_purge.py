@@ -0,0 +1,152 @@
+"""
+Employee offboarding — soft delete now, purge attendance in the background.
+
+`offboard` flags the employees `deleted` and queues one `purge_jobs` document
+each, in two writes whatever their history size. Read paths hide flagged
+employees right away: employee queries filter on the flag, attendance
+queries exclude the in-process `pending_ids()` set and dashboard counts
+subtract their records. The set is refreshed from `purge_jobs` on every
+offboarding and by the worker loop.
+
+`purge_worker` (started from the app lifespan, in every process) claims a
+job with a lease, deletes its attendance PURGE_BATCH_SIZE records at a time
+with a pause between batches, then its archived months, and finally removes
+the employee document. A crashed worker's lease expires and another one
+resumes where it stopped, since only the records still present are left to
+delete.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument, UpdateOne
+from database import employees_collection, attendance_collection, purge_jobs_collection
+from services import attendance_archive, attendance_codec, employee_cache, reports, summary_cache
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "500"))
+PURGE_BATCH_PAUSE = float(os.getenv("PURGE_BATCH_PAUSE", "0.05"))
+PURGE_INTERVAL = float(os.getenv("PURGE_INTERVAL", "10"))
+PURGE_LEASE_SECONDS = 60
+
+NOT_DELETED = {"deleted": {"$ne": True}}
+
+_pending: set[str] = set()
+_wake = asyncio.Event()
+
+
+def pending_ids() -> set[str]:
+    """Employees whose attendance is still being purged."""
+    return _pending
+
+
+def hidden_filter() -> dict:
+    """Attendance filter excluding employees that are being purged."""
+    return {"employee_id": {"$nin": list(_pending)}} if _pending else {}
+
+
+async def offboard(employee_ids: list[str]) -> dict[str, str]:
+    """Soft-delete employees and queue their purge; "scheduled" or "not_found" per ID."""
+    employee_ids = list(dict.fromkeys(employee_ids))
+    found = {
+        doc["employee_id"]
+        async for doc in employees_collection.find(
+            {"employee_id": {"$in": employee_ids}, **NOT_DELETED}, {"_id": 0, "employee_id": 1}
+        )
+    }
+    if found:
+        now = datetime.now(timezone.utc)
+        await employees_collection.update_many(
+            {"employee_id": {"$in": list(found)}, **NOT_DELETED},
+            {"$set": {"deleted": True, "deleted_at": now}},
+        )
+        # Re-queues a finished job left over from an earlier offboarding of the same ID
+        await purge_jobs_collection.bulk_write([
+            UpdateOne(
+                {"_id": employee_id},
+                {
+                    "$set": {"state": "pending", "removed": 0, "lease_until": now},
+                    "$unset": {"finished_at": ""},
+                    "$setOnInsert": {"created_at": now},
+                },
+                upsert=True,
+            )
+            for employee_id in found
+        ], ordered=False)
+        await refresh_pending()
+        summary_cache.adjust_employee_count(-len(found))
+        await employee_cache.invalidate(*found)
+        _wake.set()
+    return {employee_id: "scheduled" if employee_id in found else "not_found" for employee_id in employee_ids}
+
+
+# ── Purge worker ──────────────────────────────────────────────────
+async def _claim_job():
+    now = datetime.now(timezone.utc)
+    return await purge_jobs_collection.find_one_and_update(
+        {"state": "pending", "lease_until": {"$lte": now}},
+        {"$set": {"lease_until": now + timedelta(seconds=PURGE_LEASE_SECONDS)}},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def purge_employee(employee_id: str) -> int:
+    """Delete an offboarded employee's attendance in bounded batches, then the employee; returns records removed."""
+    removed = 0
+    while True:
+        batch = await attendance_collection.find(
+            {"employee_id": employee_id}, {"date": 1, "status": 1}
+        ).limit(PURGE_BATCH_SIZE).to_list(length=PURGE_BATCH_SIZE)
+        if not batch:
+            break
+        ids = [rec["_id"] for rec in batch]
+        result = await attendance_collection.delete_many({"_id": {"$in": ids}})
+        await summary_cache.record_transitions([
+            (attendance_codec.decode_date(rec["date"]), rec["status"], None) for rec in batch
+        ])
+        removed += result.deleted_count
+        await purge_jobs_collection.update_one(
+            {"_id": employee_id},
+            {
+                "$inc": {"removed": result.deleted_count},
+                "$set": {"lease_until": datetime.now(timezone.utc) + timedelta(seconds=PURGE_LEASE_SECONDS)},
+            },
+        )
+        # Let regular traffic through between batches
+        await asyncio.sleep(PURGE_BATCH_PAUSE)
+
+    archived = await attendance_archive.drop_employee(employee_id)
+    await summary_cache.record_transitions([(row["date"], row["status"], None) for row in archived])
+    removed += len(archived)
+    await reports.drop_employee(employee_id)
+    await employees_collection.delete_one({"employee_id": employee_id, "deleted": True})
+    await purge_jobs_collection.update_one(
+        {"_id": employee_id},
+        {"$set": {"state": "done", "finished_at": datetime.now(timezone.utc)}},
+    )
+    _pending.discard(employee_id)
+    return removed
+
+
+async def refresh_pending() -> None:
+    pending = {doc["_id"] async for doc in purge_jobs_collection.find({"state": "pending"}, {"_id": 1})}
+    _pending.clear()
+    _pending.update(pending)
+
+
+async def purge_worker() -> None:
+    """Background task (started from the app lifespan) draining the purge queue."""
+    while True:
+        try:
+            await refresh_pending()
+            while (job := await _claim_job()) is not None:
+                removed = await purge_employee(job["_id"])
+                logger.info("Purged employee %s (%d attendance records)", job["_id"], removed)
+        except Exception:
+            logger.exception("Employee purge run failed")
+        _wake.clear()
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=PURGE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
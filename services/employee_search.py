@@ -0,0 +1,64 @@
+"""
+Employee directory search.
+
+Each employee document carries `name_keys`: the case-folded full name plus
+each of its words. A multikey index on it turns an anchored, case-folded
+regex into an index range scan, so "jan", "doe" and "jane d" all find
+"Jane Doe" without scanning the directory. Email prefixes match the same way
+against `email_key`, the case-folded email, so "Jane.Doe@" finds
+"jane.doe@company.com" and vice versa.
+"""
+import re
+from typing import Optional
+from pymongo import UpdateOne
+from database import employees_collection
+
+BACKFILL_BATCH_SIZE = 1000
+# Only regex metacharacters are escaped: escaped spaces would end the index-usable prefix
+_REGEX_SPECIAL = re.compile(r"([.^$*+?()\[\]{}|\\])")
+
+
+def name_keys(full_name: str) -> list[str]:
+    folded = " ".join(full_name.casefold().split())
+    return list(dict.fromkeys([folded, *folded.split(" ")]))
+
+
+def search_fields(full_name: str, email: str) -> dict:
+    """Derived fields to store alongside an employee's own."""
+    return {"name_keys": name_keys(full_name), "email_key": email.casefold()}
+
+
+def directory_filter(
+    department: Optional[str] = None,
+    q: Optional[str] = None,
+    shift_start: Optional[str] = None,
+) -> dict:
+    query = {}
+    if department:
+        query["department"] = department
+    if shift_start:
+        query["shift_start_time"] = shift_start
+    term = " ".join((q or "").casefold().split())
+    if term:
+        prefix = {"$regex": "^" + _REGEX_SPECIAL.sub(r"\\\1", term)}
+        query["$or"] = [{"name_keys": prefix}, {"email_key": prefix}]
+    return query
+
+
+async def backfill_search_fields() -> int:
+    """Add the search fields to employees stored without them; returns how many were updated."""
+    updated = 0
+    missing = {"$or": [{"name_keys": {"$exists": False}}, {"email_key": {"$exists": False}}]}
+    cursor = employees_collection.find(missing, {"full_name": 1, "email": 1})
+    ops = []
+    async for emp in cursor:
+        fields = search_fields(emp.get("full_name") or "", emp.get("email") or "")
+        ops.append(UpdateOne({"_id": emp["_id"]}, {"$set": fields}))
+        if len(ops) >= BACKFILL_BATCH_SIZE:
+            await employees_collection.bulk_write(ops, ordered=False)
+            updated += len(ops)
+            ops = []
+    if ops:
+        await employees_collection.bulk_write(ops, ordered=False)
+        updated += len(ops)
+    return updated
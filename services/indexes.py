@@ -0,0 +1,195 @@
+"""
+Index bootstrap and query-plan diagnostics.
+
+`ensure_indexes` idempotently creates every index the routes rely on and runs
+from the app lifespan (and from setup.py). `check_query_plans` runs `explain`
+on each route's query shape and reports any that would fall back to COLLSCAN.
+"""
+import logging
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from services.attendance_codec import date_match, date_range
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_INDEXES = {
+    "employees": [
+        IndexModel([("employee_id", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING)], unique=True),
+        # directory search: department / shift filters in _id page order, name prefixes
+        IndexModel([("department", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("shift_start_time", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("name_keys", ASCENDING)]),
+        IndexModel([("email_key", ASCENDING)]),
+    ],
+    "attendance": [
+        # mark-in / mark-out / mark-absent, per-employee history
+        IndexModel([("employee_id", ASCENDING), ("date", ASCENDING)], unique=True),
+        # date equality and ranges, plus the (date, _id) keyset sort of list and export endpoints
+        IndexModel([("date", ASCENDING), ("_id", ASCENDING)]),
+        # dashboard status counts per date
+        IndexModel([("date", ASCENDING), ("status", ASCENDING)]),
+        # end-of-day close-out: open records of a date, paged by _id
+        IndexModel([("date", ASCENDING), ("out_time", ASCENDING), ("_id", ASCENDING)]),
+    ],
+    "attendance_archive": [
+        # archived list / export reads by month range, optionally for one employee
+        IndexModel([("month", ASCENDING), ("employee_id", ASCENDING)]),
+        IndexModel([("employee_id", ASCENDING), ("month", ASCENDING)]),
+    ],
+    "admins": [
+        IndexModel([("username", ASCENDING)], unique=True),
+    ],
+    "monthly_rollup": [
+        # monthly report reads, optionally narrowed to a department's employees
+        IndexModel([("month", ASCENDING), ("employee_id", ASCENDING)]),
+        IndexModel([("employee_id", ASCENDING)]),
+    ],
+    "purge_jobs": [
+        # job claiming, and finished jobs kept for a week
+        IndexModel([("state", ASCENDING), ("lease_until", ASCENDING)]),
+        IndexModel([("finished_at", ASCENDING)], expireAfterSeconds=7 * 24 * 3600),
+    ],
+    "revoked_sessions": [
+        # entries disappear once the revoked token would have expired anyway
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+}
+
+# Sample values in the configured storage format (see attendance_codec)
+_SAMPLE_DATE = date_match("2026-01-01")
+_SAMPLE_RANGE = date_range("2026-01-01", "2026-01-31")
+_DATE_DESC = {"date": DESCENDING, "_id": DESCENDING}
+
+# (label, command) pairs mirroring the query shapes issued by the routes
+QUERY_SHAPES = [
+    ("attendance: mark-in/out by employee and date", {
+        "find": "attendance",
+        "filter": {"employee_id": "EMP001", "date": _SAMPLE_DATE, "out_time": None},
+    }),
+    ("attendance: open records to close out", {
+        "find": "attendance",
+        "filter": {"date": _SAMPLE_DATE, "out_time": None, "in_time": {"$ne": None}},
+        "sort": {"_id": 1}, "limit": 1000,
+    }),
+    ("attendance: list by date", {
+        "find": "attendance", "filter": {"date": _SAMPLE_DATE}, "sort": _DATE_DESC, "limit": 101,
+    }),
+    ("attendance: list by date range", {
+        "find": "attendance",
+        "filter": _SAMPLE_RANGE,
+        "sort": _DATE_DESC,
+        "limit": 101,
+    }),
+    ("attendance: list all, newest first", {
+        "find": "attendance", "filter": {}, "sort": _DATE_DESC, "limit": 101,
+    }),
+    ("attendance: history for one employee", {
+        "find": "attendance", "filter": {"employee_id": "EMP001"}, "sort": _DATE_DESC, "limit": 101,
+    }),
+    ("attendance: export by date range", {
+        "find": "attendance",
+        "filter": _SAMPLE_RANGE,
+        "sort": {"date": ASCENDING, "_id": ASCENDING},
+    }),
+    ("attendance archive: months of one employee", {
+        "find": "attendance_archive",
+        "filter": {"month": {"$gte": "2025-01", "$lt": "2025-11"}, "employee_id": "EMP001"},
+        "sort": {"month": DESCENDING},
+    }),
+    ("dashboard: status counts for a date", {
+        "aggregate": "attendance",
+        "pipeline": [
+            {"$match": {"date": _SAMPLE_DATE}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+        ],
+        "cursor": {},
+    }),
+    ("employees: shift lookup", {
+        "find": "employees", "filter": {"employee_id": {"$in": ["EMP001", "EMP002"]}},
+    }),
+    ("employees: duplicate email check", {
+        "find": "employees", "filter": {"email": "jane@company.com"},
+    }),
+    ("employees: list page", {
+        "find": "employees", "filter": {}, "sort": {"_id": ASCENDING}, "limit": 101,
+    }),
+    ("reports: monthly rollups", {
+        "find": "monthly_rollup", "filter": {"month": "2026-01", "employee_id": {"$in": ["EMP001"]}},
+    }),
+    ("employees: department roster", {
+        "find": "employees", "filter": {"department": "Engineering"},
+    }),
+    ("employees: directory page by department", {
+        "find": "employees", "filter": {"department": "Engineering"}, "sort": {"_id": 1}, "limit": 101,
+    }),
+    ("employees: directory name / email prefix search", {
+        "find": "employees",
+        "filter": {"$or": [{"name_keys": {"$regex": "^jan"}}, {"email_key": {"$regex": "^jan"}}]},
+        "sort": {"_id": 1},
+        "limit": 101,
+    }),
+    ("admins: login", {
+        "find": "admins", "filter": {"username": "admin"},
+    }),
+]
+
+
+async def ensure_indexes(db) -> list[tuple[str, str, bool]]:
+    """
+    Create every required index (a no-op for ones that already exist).
+    Returns (collection, index name, unique) for each index ensured.
+    """
+    ensured = []
+    for collection_name, models in REQUIRED_INDEXES.items():
+        try:
+            names = await db[collection_name].create_indexes(models)
+        except OperationFailure:
+            # Usually an existing index with the same name but different options
+            logger.exception("Could not ensure indexes on %s", collection_name)
+            continue
+        for name, model in zip(names, models):
+            ensured.append((collection_name, name, bool(model.document.get("unique"))))
+    return ensured
+
+
+def _winning_plans(node):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "winningPlan":
+                yield value
+            elif key != "rejectedPlans":
+                yield from _winning_plans(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _winning_plans(item)
+
+
+def _stages(plan) -> list[str]:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_stages(item))
+    return stages
+
+
+async def check_query_plans(db) -> list[dict]:
+    """Explain each route query shape; `collscan` is True for any that scan the collection."""
+    report = []
+    for label, command in QUERY_SHAPES:
+        explain = await db.command({"explain": command, "verbosity": "queryPlanner"})
+        stages = []
+        for plan in _winning_plans(explain):
+            stages.extend(_stages(plan))
+        report.append({
+            "query": label,
+            "collection": command.get("find") or command.get("aggregate"),
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+        })
+    return report
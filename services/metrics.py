@@ -0,0 +1,188 @@
+"""
+Per-request timing and DB-call instrumentation.
+
+Each request gets a `RequestStats` in a context variable. The Mongo command
+listener adds round trips and DB time to it (Motor runs driver calls with a
+copy of the caller's context), `TimedRoute` records the endpoint (handler)
+time and the full route time, and the HTTP middleware in main.py turns it into
+a `Server-Timing` header and Prometheus histograms served at /metrics.
+"""
+import functools
+import inspect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+
+_current: ContextVar[Optional["RequestStats"]] = ContextVar("request_stats", default=None)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROUND_TRIP_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 13, 21, 50)
+
+
+class RequestStats:
+    """Timings collected for one request (milliseconds)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.db_calls = 0
+        self.db_ms = 0.0
+        self.handler_ms = 0.0
+        self.route_ms = 0.0
+
+    def add_db_call(self, duration_ms: float) -> None:
+        # Driver events may arrive from executor threads
+        with self._lock:
+            self.db_calls += 1
+            self.db_ms += duration_ms
+
+    @property
+    def serialize_ms(self) -> float:
+        """Route time outside the endpoint: request validation plus response serialization."""
+        return max(0.0, self.route_ms - self.handler_ms)
+
+    def server_timing(self, total_ms: float) -> str:
+        return ", ".join([
+            f'db;desc="{self.db_calls} calls";dur={self.db_ms:.2f}',
+            f"handler;dur={self.handler_ms:.2f}",
+            f"serialize;dur={self.serialize_ms:.2f}",
+            f"total;dur={total_ms:.2f}",
+        ])
+
+
+def start_request() -> RequestStats:
+    stats = RequestStats()
+    _current.set(stats)
+    return stats
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Attributes every Mongo command to the request that issued it."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        stats = _current.get()
+        if stats is not None:
+            stats.add_db_call(event.duration_micros / 1000)
+
+    def failed(self, event):
+        self.succeeded(event)
+
+
+command_timer = CommandTimer()
+
+
+def _timed_endpoint(endpoint):
+    # include_router re-creates routes from the already wrapped endpoint
+    if getattr(endpoint, "_timed", False) or not inspect.iscoroutinefunction(endpoint):
+        return endpoint
+
+    @functools.wraps(endpoint)
+    async def timed(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            stats = _current.get()
+            if stats is not None:
+                stats.handler_ms += (time.perf_counter() - started) * 1000
+
+    timed._timed = True
+    return timed
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that records handler time and total route time into the request stats."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            started = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                stats = _current.get()
+                if stats is not None:
+                    stats.route_ms += (time.perf_counter() - started) * 1000
+
+        return timed_handler
+
+
+# ── Prometheus exposition ─────────────────────────────────────────
+class Histogram:
+    """Cumulative-bucket histogram rendered in the Prometheus text format."""
+
+    def __init__(self, name: str, documentation: str, label_names: tuple, buckets: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            # per-bucket counts, then sum and count
+            series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            label_text = ",".join(f'{k}="{v}"' for k, v in zip(self.label_names, labels))
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {series[-2]}")
+            lines.append(f"{self.name}_count{{{label_text}}} {series[-1]}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "hrms_http_request_duration_seconds", "Total request latency.",
+    ("method", "route", "status"), LATENCY_BUCKETS,
+)
+HANDLER_SECONDS = Histogram(
+    "hrms_http_handler_duration_seconds", "Time spent in the endpoint function.",
+    ("method", "route"), LATENCY_BUCKETS,
+)
+SERIALIZE_SECONDS = Histogram(
+    "hrms_http_serialize_duration_seconds", "Request validation and response serialization time.",
+    ("method", "route"), LATENCY_BUCKETS,
+)
+DB_SECONDS = Histogram(
+    "hrms_db_duration_seconds", "Time spent in MongoDB commands per request.",
+    ("method", "route"), LATENCY_BUCKETS,
+)
+DB_ROUND_TRIPS = Histogram(
+    "hrms_db_round_trips", "MongoDB commands issued per request.",
+    ("method", "route"), ROUND_TRIP_BUCKETS,
+)
+HISTOGRAMS = (REQUEST_SECONDS, HANDLER_SECONDS, SERIALIZE_SECONDS, DB_SECONDS, DB_ROUND_TRIPS)
+
+
+def observe(method: str, route: str, status_code: int, total_ms: float, stats: RequestStats) -> None:
+    REQUEST_SECONDS.observe((method, route, str(status_code)), total_ms / 1000)
+    HANDLER_SECONDS.observe((method, route), stats.handler_ms / 1000)
+    SERIALIZE_SECONDS.observe((method, route), stats.serialize_ms / 1000)
+    DB_SECONDS.observe((method, route), stats.db_ms / 1000)
+    DB_ROUND_TRIPS.observe((method, route), stats.db_calls)
+
+
+def render() -> str:
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,63 @@
+"""
+Opaque keyset-pagination cursors.
+
+A cursor is the URL-safe base64 of a small JSON object holding the sort key
+of the last row on a page; the next page continues strictly after it.
+"""
+import base64
+import json
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from services.attendance_codec import ATTENDANCE_STORAGE, to_datetime
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: dict) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, dict):
+            raise ValueError
+        if "i" in values:
+            values["i"] = ObjectId(values["i"])
+        return values
+    except (ValueError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+
+
+def date_desc_after(cursor: dict) -> dict:
+    """
+    Filter for rows after `cursor` in (date DESC, _id DESC) order. The "n" flag
+    says the last row's date was stored natively (see attendance_codec).
+    """
+    if "d" not in cursor or "i" not in cursor:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    native = ATTENDANCE_STORAGE == "native" or bool(cursor.get("n"))
+    try:
+        last_date = to_datetime(cursor["d"]) if native else cursor["d"]
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    after = [
+        {"date": {"$lt": last_date}},
+        {"date": last_date, "_id": {"$lt": cursor["i"]}},
+    ]
+    if native and ATTENDANCE_STORAGE == "dual":
+        # BSON sorts dates above strings, so legacy string rows come after every native one
+        after.append({"date": {"$type": "string"}})
+    return {"$or": after}
+
+
+def id_asc_after(cursor: dict) -> dict:
+    """Filter for rows after `cursor` in _id ASC order."""
+    if "i" not in cursor:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    return {"_id": {"$gt": cursor["i"]}}
@@ -0,0 +1,69 @@
+"""
+Password hashing — scrypt via hashlib, run in a bounded thread pool so a
+burst of logins never blocks the event loop.
+
+Stored formats:
+    scrypt$<n>$<r>$<p>$<salt hex>$<hash hex>   current
+    <salt hex>:<sha256 hex>                    legacy, rehashed on next successful login
+"""
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+
+SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", str(2**14)))
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_DKLEN = 32
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-kdf")
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * n * r, dklen=SCRYPT_DKLEN,
+    )
+
+
+def hash_password_sync(password: str) -> str:
+    salt = secrets.token_bytes(16)
+    hashed = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${hashed.hex()}"
+
+
+def verify_password_sync(password: str, stored: str) -> bool:
+    try:
+        if stored.startswith("scrypt$"):
+            _, n, r, p, salt, hashed = stored.split("$")
+            candidate = _scrypt(password, bytes.fromhex(salt), int(n), int(r), int(p))
+            return hmac.compare_digest(candidate, bytes.fromhex(hashed))
+        salt, hashed = stored.split(":")
+        candidate = hashlib.sha256(f"{salt}{password}".encode()).hexdigest()
+        return hmac.compare_digest(candidate, hashed)
+    except Exception:
+        return False
+
+
+def needs_rehash(stored: str) -> bool:
+    """True for legacy hashes and scrypt hashes made with weaker parameters."""
+    if not stored.startswith("scrypt$"):
+        return True
+    try:
+        _, n, r, p, _, _ = stored.split("$")
+    except ValueError:
+        return True
+    return (int(n), int(r), int(p)) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, hash_password_sync, password)
+
+
+async def verify_password(password: str, stored: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, verify_password_sync, password, stored)
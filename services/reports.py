@@ -0,0 +1,242 @@
+"""
+Monthly attendance report engine.
+
+Per-employee monthly totals live in `monthly_rollup`:
+
+    {"_id": "2026-02:EMP001", "month": "2026-02", "employee_id": "EMP001",
+     "by_status": {"Present": 15, "Late": 2, ...}, "marked_days": 17, "worked_minutes": 8160}
+
+A month is built once from raw attendance with an aggregation pipeline and
+recorded in `report_months`. After that the attendance write paths keep it
+current with `$inc` upserts, so serving a report is a read of one document
+per employee.
+
+Builds follow the daily summary scheme (see `summary_cache`): the month is
+marked in `report_months` before counting, so increments are recorded from
+then on, and every `$inc` bumps the rollup's `version`. A build only
+replaces a rollup whose version is unchanged since it started counting and
+recounts that employee otherwise, so increments that land mid-build are
+never lost. The month is served once `built_at` is set.
+"""
+import calendar
+import logging
+import os
+import re
+from collections import defaultdict
+from datetime import date as dt_date, datetime, timezone
+from typing import Optional
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from database import attendance_collection, monthly_rollup_collection, report_months_collection
+from services.attendance_codec import date_range
+from services.attendance_rules import bucket_counts, worked_minutes_expr
+from services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+MONTH_PATTERN = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+REPORT_REBUILD_RETRIES = int(os.getenv("REPORT_REBUILD_RETRIES", "3"))
+
+# month -> True once `report_months` says it has been built
+_built_months = TTLCache(maxsize=64, ttl=60)
+
+
+def month_bounds(month: str) -> tuple[str, str]:
+    """First day of `month` and first day of the following month (YYYY-MM-DD)."""
+    year, mon = (int(part) for part in month.split("-"))
+    next_year, next_mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+    return f"{year:04d}-{mon:02d}-01", f"{next_year:04d}-{next_mon:02d}-01"
+
+
+def working_days(month: str, today: dt_date = None) -> int:
+    """Mon–Fri days of `month`, counted only up to today for the current month."""
+    today = today or dt_date.today()
+    year, mon = (int(part) for part in month.split("-"))
+    last_day = calendar.monthrange(year, mon)[1]
+    if (year, mon) == (today.year, today.month):
+        last_day = today.day
+    elif (year, mon) > (today.year, today.month):
+        return 0
+    return sum(1 for day in range(1, last_day + 1) if dt_date(year, mon, day).weekday() < 5)
+
+
+async def is_built(month: str) -> bool:
+    if _built_months.get(month):
+        return True
+    if await report_months_collection.find_one({"_id": month, "built_at": {"$exists": True}}, {"_id": 1}):
+        _built_months.set(month, True)
+        return True
+    return False
+
+
+async def _is_tracked(month: str) -> bool:
+    """Whether increments for `month` are recorded: it is built or being built."""
+    if _built_months.get(month):
+        return True
+    return await report_months_collection.find_one({"_id": month}, {"_id": 1}) is not None
+
+
+async def _count_month(month: str, employee_id: Optional[str] = None) -> dict[str, dict]:
+    """Rollup fields per employee for `month` (or just `employee_id`), counted from raw attendance."""
+    first_day, next_month = month_bounds(month)
+    match = date_range(first_day, date_before=next_month)
+    if employee_id:
+        match["employee_id"] = employee_id
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": {"employee_id": "$employee_id", "status": "$status"},
+            "days": {"$sum": 1},
+            "minutes": {"$sum": worked_minutes_expr()},
+        }},
+        {"$group": {
+            "_id": "$_id.employee_id",
+            "by_status": {"$push": {"k": "$_id.status", "v": "$days"}},
+            "marked_days": {"$sum": "$days"},
+            "worked_minutes": {"$sum": "$minutes"},
+        }},
+    ]
+    return {
+        row["_id"]: {
+            "by_status": {item["k"]: item["v"] for item in row["by_status"]},
+            "marked_days": row["marked_days"],
+            "worked_minutes": row["worked_minutes"],
+        }
+        async for row in attendance_collection.aggregate(pipeline)
+    }
+
+
+async def _versions(query: dict) -> dict[str, Optional[int]]:
+    """Current `version` of the rollups matching `query`, by employee."""
+    return {
+        doc["employee_id"]: doc.get("version")
+        async for doc in monthly_rollup_collection.find(query, {"employee_id": 1, "version": 1})
+    }
+
+
+def _rollup_doc(month: str, employee_id: str, fields: dict, version: Optional[int], updated_at: datetime) -> dict:
+    return {
+        "_id": f"{month}:{employee_id}", "month": month, "employee_id": employee_id,
+        **fields, "version": version or 0, "updated_at": updated_at,
+    }
+
+
+async def _store_month(month: str, rollups: dict[str, dict], versions: dict[str, Optional[int]]) -> list[str]:
+    """
+    Replace the counted rollups and delete ones no longer backed by records,
+    each only if its version is unchanged. Returns the employees that raced.
+    """
+    updated_at = datetime.now(timezone.utc)
+    employee_ids = list(rollups)
+    ops = [
+        # Matches only if no $inc landed while counting (a missing document upserts)
+        ReplaceOne(
+            {"_id": f"{month}:{employee_id}", "version": versions.get(employee_id)},
+            _rollup_doc(month, employee_id, rollups[employee_id], versions.get(employee_id), updated_at),
+            upsert=True,
+        )
+        for employee_id in employee_ids
+    ]
+    raced = []
+    if ops:
+        try:
+            await monthly_rollup_collection.bulk_write(ops, ordered=False)
+        except BulkWriteError as exc:
+            errors = exc.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in errors):
+                raise
+            # A version mismatch surfaces as a duplicate-key upsert
+            raced = [employee_ids[error["index"]] for error in errors]
+    for employee_id, version in versions.items():
+        if employee_id not in rollups:
+            result = await monthly_rollup_collection.delete_one(
+                {"_id": f"{month}:{employee_id}", "version": version}
+            )
+            if not result.deleted_count:
+                raced.append(employee_id)
+    return raced
+
+
+async def _rebuild_employee(month: str, employee_id: str) -> None:
+    """Recount one employee's rollup for `month` until no increment races it."""
+    for _ in range(REPORT_REBUILD_RETRIES):
+        versions = await _versions({"_id": f"{month}:{employee_id}"})
+        rollups = await _count_month(month, employee_id)
+        if not await _store_month(month, rollups, versions):
+            return
+    logger.warning("monthly_rollup rebuild for %s:%s kept racing concurrent writes", month, employee_id)
+
+
+async def build_month(month: str) -> None:
+    """(Re)build every employee's rollup for `month` from raw attendance."""
+    # Record increments from here on, so none is missed while counting
+    await report_months_collection.update_one(
+        {"_id": month},
+        {"$set": {"build_started_at": datetime.now(timezone.utc)}},
+        upsert=True,
+    )
+    versions = await _versions({"month": month})
+    rollups = await _count_month(month)
+    for employee_id in await _store_month(month, rollups, versions):
+        await _rebuild_employee(month, employee_id)
+    await report_months_collection.update_one(
+        {"_id": month},
+        {"$set": {"built_at": datetime.now(timezone.utc)}},
+        upsert=True,
+    )
+    _built_months.set(month, True)
+
+
+async def record_transitions(transitions) -> None:
+    """Apply attendance transitions to the rollups of months that have been built."""
+    deltas: dict[tuple[str, str], dict] = defaultdict(lambda: defaultdict(int))
+    for t in transitions:
+        if t.old_status == t.new_status and not t.worked_minutes:
+            continue
+        delta = deltas[(t.date[:7], t.employee_id)]
+        if t.old_status:
+            delta[f"by_status.{t.old_status}"] -= 1
+        if t.new_status:
+            delta[f"by_status.{t.new_status}"] += 1
+        delta["marked_days"] += (t.new_status is not None) - (t.old_status is not None)
+        delta["worked_minutes"] += t.worked_minutes
+
+    ops = []
+    for (month, employee_id), delta in deltas.items():
+        # Unbuilt months are computed from raw attendance on first request instead
+        if not await _is_tracked(month):
+            continue
+        inc = {field: change for field, change in delta.items() if change}
+        if inc:
+            ops.append(UpdateOne(
+                {"_id": f"{month}:{employee_id}"},
+                {
+                    "$inc": {**inc, "version": 1},
+                    "$set": {"updated_at": datetime.now(timezone.utc)},
+                    "$setOnInsert": {"month": month, "employee_id": employee_id},
+                },
+                upsert=True,
+            ))
+    if ops:
+        await monthly_rollup_collection.bulk_write(ops, ordered=False)
+
+
+async def drop_employee(employee_id: str) -> None:
+    await monthly_rollup_collection.delete_many({"employee_id": employee_id})
+
+
+def report_row(employee: dict, rollup: dict, month_working_days: int) -> dict:
+    by_status = {k: v for k, v in (rollup or {}).get("by_status", {}).items() if v}
+    buckets = bucket_counts(by_status)
+    marked_days = (rollup or {}).get("marked_days", 0)
+    return {
+        "employee_id": employee["employee_id"],
+        "full_name": employee.get("full_name"),
+        "department": employee.get("department"),
+        "days_present": marked_days - buckets["absent"],
+        "late": buckets["late"],
+        "early_exits": buckets["early_exit"],
+        "absences": buckets["absent"],
+        "unmarked_working_days": max(0, month_working_days - marked_days),
+        "hours_worked": round((rollup or {}).get("worked_minutes", 0) / 60, 2),
+    }
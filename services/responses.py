@@ -0,0 +1,31 @@
+"""
+Fast JSON path for read endpoints.
+
+List endpoints hand their serialized rows to `json_rows`, which encodes them
+to bytes in one pass with a compiled Pydantic `TypeAdapter` and returns a raw
+`Response`. FastAPI then skips both `response_model` validation and
+`jsonable_encoder`; the rows come from our own database, so validation stays
+on the write paths only. `response_model` is still declared on the routes for
+the OpenAPI schema.
+
+FAST_JSON_RESPONSES=false falls back to returning the rows through FastAPI's
+regular validation and encoding (e.g. to compare the two in benchmarks).
+"""
+import os
+from fastapi import Response
+from pydantic import TypeAdapter
+from models.attendance import AttendanceRow
+from models.employee import EmployeeRow
+
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "true").lower() in ("1", "true", "yes")
+
+ATTENDANCE_ROWS = TypeAdapter(list[AttendanceRow])
+EMPLOYEE_ROWS = TypeAdapter(list[EmployeeRow])
+
+
+def json_rows(adapter: TypeAdapter, rows: list[dict], response: Response, headers: dict = None):
+    """`rows` as a raw JSON response, or as-is for FastAPI to validate when the fast path is off."""
+    if not FAST_JSON_RESPONSES:
+        response.headers.update(headers or {})
+        return rows
+    return Response(content=adapter.dump_json(rows), media_type="application/json", headers=headers)
@@ -0,0 +1,204 @@
+"""
+Stateless admin sessions — HMAC-SHA256 signed, expiring tokens.
+
+    <kid>.<base64url(json claims)>.<base64url(signature)>
+
+Verification is an in-memory, constant-time check: no Mongo round trip per
+request. Keys come from SESSION_KEYS ("kid:secret,kid:secret"); the first one
+signs new tokens and every listed key still verifies, so keys can be rotated
+by prepending a new one. Logged-out tokens are kept in `revoked_sessions`
+(expired entries are removed by a TTL index) and mirrored in process,
+refreshed every SESSION_REVOCATION_REFRESH seconds.
+
+Server-sent event routes are opened by the browser's EventSource, which
+cannot send an Authorization header. They also accept a `?token=` issued
+with the "stream" scope: valid for SESSION_STREAM_TOKEN_TTL seconds and
+rejected everywhere else, so a token that ends up in an access log is of
+little use.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import Depends, HTTPException, Query, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from database import revoked_sessions_collection
+
+logger = logging.getLogger(__name__)
+
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(8 * 3600)))
+SESSION_REVOCATION_REFRESH = float(os.getenv("SESSION_REVOCATION_REFRESH", "30"))
+SESSION_STREAM_TOKEN_TTL = int(os.getenv("SESSION_STREAM_TOKEN_TTL", "60"))
+STREAM_SCOPE = "stream"
+AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "true").lower() in ("1", "true", "yes")
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+def _load_keys() -> tuple[str, dict[str, bytes]]:
+    keys = {}
+    signing_kid = None
+    for entry in filter(None, (part.strip() for part in os.getenv("SESSION_KEYS", "").split(","))):
+        kid, _, secret = entry.partition(":")
+        if not kid or not secret:
+            raise RuntimeError("SESSION_KEYS entries must look like 'kid:secret'")
+        keys[kid] = secret.encode()
+        signing_kid = signing_kid or kid
+    if not keys:
+        # Tokens from a per-process key do not survive restarts or work across workers
+        logger.warning("SESSION_KEYS is not set; using a random per-process signing key")
+        signing_kid = "local"
+        keys[signing_kid] = secrets.token_bytes(32)
+    return signing_kid, keys
+
+
+_signing_kid, _keys = _load_keys()
+_revoked: dict[str, float] = {}
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(kid: str, body: str) -> bytes:
+    return hmac.new(_keys[kid], f"{kid}.{body}".encode(), hashlib.sha256).digest()
+
+
+def issue_token(
+    username: str,
+    full_name: str,
+    role: str,
+    ttl: int = SESSION_TTL_SECONDS,
+    scope: Optional[str] = None,
+) -> tuple[str, datetime]:
+    now = int(time.time())
+    claims = {
+        "sub": username,
+        "name": full_name,
+        "role": role,
+        "iat": now,
+        "exp": now + ttl,
+        "jti": secrets.token_urlsafe(12),
+    }
+    if scope:
+        claims["scope"] = scope
+    body = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    token = f"{_signing_kid}.{body}.{_b64encode(_sign(_signing_kid, body))}"
+    return token, datetime.fromtimestamp(claims["exp"], tz=timezone.utc)
+
+
+def verify_token(token: str) -> dict:
+    """Claims of a valid token; raises InvalidToken otherwise."""
+    try:
+        kid, body, signature = token.split(".")
+        expected = _sign(kid, body)
+        provided = _b64decode(signature)
+    except (ValueError, KeyError):
+        raise InvalidToken("Malformed or unknown session token.")
+    if not hmac.compare_digest(expected, provided):
+        raise InvalidToken("Invalid session token.")
+    try:
+        claims = json.loads(_b64decode(body))
+    except ValueError:
+        raise InvalidToken("Malformed session token.")
+    if claims.get("exp", 0) < time.time():
+        raise InvalidToken("Session expired.")
+    if claims.get("jti") in _revoked:
+        raise InvalidToken("Session revoked.")
+    return claims
+
+
+# ── Revocation list ───────────────────────────────────────────────
+async def revoke(claims: dict) -> None:
+    expires_at = datetime.fromtimestamp(claims["exp"], tz=timezone.utc)
+    _revoked[claims["jti"]] = claims["exp"]
+    await revoked_sessions_collection.update_one(
+        {"_id": claims["jti"]},
+        {"$set": {"expires_at": expires_at}},
+        upsert=True,
+    )
+
+
+async def refresh_revocations() -> None:
+    now = datetime.now(timezone.utc)
+    revoked = {}
+    async for doc in revoked_sessions_collection.find({"expires_at": {"$gt": now}}):
+        expires_at = doc["expires_at"]
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        revoked[doc["_id"]] = expires_at.timestamp()
+    _revoked.clear()
+    _revoked.update(revoked)
+
+
+async def revocation_refresher() -> None:
+    """Background task (started from the app lifespan) keeping the revocation list current."""
+    while True:
+        try:
+            await refresh_revocations()
+        except Exception:
+            logger.exception("Could not refresh the session revocation list")
+        await asyncio.sleep(SESSION_REVOCATION_REFRESH)
+
+
+# ── FastAPI dependencies ──────────────────────────────────────────
+_bearer = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def optional_session(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
+) -> Optional[dict]:
+    """Claims when a bearer token is sent (401 if it is invalid), otherwise None."""
+    if credentials is None:
+        return None
+    try:
+        claims = verify_token(credentials.credentials)
+    except InvalidToken as exc:
+        raise _unauthorized(str(exc))
+    if claims.get("scope"):
+        raise _unauthorized("Scoped tokens are not valid as a bearer session.")
+    return claims
+
+
+async def require_session(session: Optional[dict] = Depends(optional_session)) -> Optional[dict]:
+    """Router dependency: rejects requests without a valid session when AUTH_REQUIRED is on."""
+    if session is None and AUTH_REQUIRED:
+        raise _unauthorized("Not authenticated.")
+    return session
+
+
+async def require_stream_session(
+    token: Optional[str] = Query(None, description="Stream token from POST /dashboard/stream-token"),
+    session: Optional[dict] = Depends(optional_session),
+) -> Optional[dict]:
+    """`require_session` for SSE routes: a bearer header or a stream-scoped `?token=`."""
+    if session is None and token is not None:
+        try:
+            session = verify_token(token)
+        except InvalidToken as exc:
+            raise _unauthorized(str(exc))
+        # Full session tokens stay out of URLs (and so out of access logs)
+        if session.get("scope") != STREAM_SCOPE:
+            raise _unauthorized("Only stream tokens are accepted as ?token=.")
+    return await require_session(session)
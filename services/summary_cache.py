@@ -0,0 +1,276 @@
+"""
+Per-date dashboard summary cache.
+
+Status counts for a date live in an in-process LRU (with TTL) and, when
+SUMMARY_MATERIALIZE is enabled, in the `daily_summary` collection:
+
+    {"_id": "2026-02-20", "by_status": {"Present": 120, "Late": 4, ...}}
+
+Attendance write paths report status transitions (e.g. Incomplete → Present)
+and both layers are updated with `$inc`, so reading a summary is a key lookup.
+A date that is in neither layer is rebuilt from the raw attendance collection.
+
+Every `$inc` also bumps the document's `version`. A rebuild only replaces
+the document if its version is unchanged since the rebuild started counting,
+and recounts otherwise, so increments that land mid-rebuild are never
+overwritten. Increments for a date with no document upsert a `partial` one,
+which readers ignore until a rebuild replaces it.
+
+Dates behind the archive watermark (see `attendance_archive`) are always kept
+in `daily_summary`, since recounting them means decompressing archived months.
+
+Both layers still count employees being offboarded until the purge removes
+their records (and reports those removals as transitions); readers get the
+counts without them.
+"""
+import os
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+from database import employees_collection, attendance_collection, daily_summary_collection
+from services import attendance_archive, employee_purge
+from services.attendance_codec import date_match, date_range, decode_date
+from services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "64"))
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", "30"))
+SUMMARY_MATERIALIZE = os.getenv("SUMMARY_MATERIALIZE", "false").lower() in ("1", "true", "yes")
+SUMMARY_REBUILD_RETRIES = int(os.getenv("SUMMARY_REBUILD_RETRIES", "3"))
+
+_status_counts = TTLCache(maxsize=SUMMARY_CACHE_SIZE, ttl=SUMMARY_CACHE_TTL)
+_employee_count = TTLCache(maxsize=1, ttl=SUMMARY_CACHE_TTL)
+
+
+async def count_statuses(date: str) -> dict:
+    """Per-status record counts for a date, grouped server-side."""
+    if attendance_archive.is_archived(date):
+        return (await attendance_archive.count_statuses_range(date, date)).get(date, {})
+    pipeline = [
+        {"$match": {"date": date_match(date)}},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+    ]
+    status_counts = {}
+    async for row in attendance_collection.aggregate(pipeline):
+        status_counts[row["_id"]] = row["count"]
+    return status_counts
+
+
+async def _purging_counts(date: str) -> Counter:
+    """Per-status counts of the records on `date` of employees being offboarded."""
+    counts = Counter()
+    pending = employee_purge.pending_ids()
+    if not pending:
+        return counts
+    employee_query = {"employee_id": {"$in": list(pending)}}
+    seen = set()
+    async for rec in attendance_collection.find({"date": date_match(date), **employee_query}, {"status": 1}):
+        seen.add(rec["_id"])
+        counts[rec["status"]] += 1
+    if attendance_archive.is_archived(date):
+        async for month_rows in attendance_archive.iter_months(date, date, employee_query):
+            counts.update(row["status"] for row in month_rows if row["_id"] not in seen)
+    return counts
+
+
+async def _visible(date: str, counts: dict) -> dict:
+    """`counts` less the records of employees being offboarded."""
+    hidden = await _purging_counts(date)
+    if not hidden:
+        return dict(counts)
+    return {
+        att_status: count - hidden[att_status]
+        for att_status, count in counts.items()
+        if count > hidden[att_status]
+    }
+
+
+async def fresh_status_counts(date: str) -> dict:
+    """Status counts read from Mongo, bypassing this worker's LRU (so other workers' writes show)."""
+    await attendance_archive.archived_before()
+    return await _visible(date, await count_statuses(date))
+
+
+async def get_status_counts(date: str) -> dict:
+    """Status counts for a date as the dashboard shows them."""
+    return await _visible(date, await _stored_status_counts(date))
+
+
+async def _stored_status_counts(date: str) -> dict:
+    """Status counts for a date: LRU → daily_summary → aggregation."""
+    cached = _status_counts.get(date)
+    if cached is not None:
+        return dict(cached)
+
+    counts = None
+    await attendance_archive.archived_before()
+    if SUMMARY_MATERIALIZE or attendance_archive.is_archived(date):
+        doc = await daily_summary_collection.find_one({"_id": date})
+        if doc and not doc.get("partial"):
+            counts = {k: v for k, v in doc.get("by_status", {}).items() if v}
+    if counts is None:
+        return await rebuild(date)
+
+    _status_counts.set(date, counts)
+    return dict(counts)
+
+
+async def get_employee_count() -> int:
+    cached = _employee_count.get("total")
+    if cached is None:
+        cached = await employees_collection.count_documents({"deleted": {"$ne": True}})
+        _employee_count.set("total", cached)
+    return cached
+
+
+def adjust_employee_count(delta: int) -> None:
+    cached = _employee_count.get("total")
+    if cached is not None:
+        _employee_count.set("total", max(0, cached + delta))
+
+
+def _summary_doc(date: str, counts: dict, version: Optional[int], rebuilt_at: datetime) -> dict:
+    return {"_id": date, "by_status": counts, "version": version or 0, "rebuilt_at": rebuilt_at}
+
+
+async def _versions(id_filter) -> dict[str, Optional[int]]:
+    """Current `version` of the daily_summary documents matching an `_id` filter."""
+    return {
+        doc["_id"]: doc.get("version")
+        async for doc in daily_summary_collection.find({"_id": id_filter}, {"version": 1})
+    }
+
+
+async def rebuild(date: str) -> dict:
+    """Recompute one date from the raw attendance collection and refresh both layers."""
+    await attendance_archive.archived_before()
+    if not (SUMMARY_MATERIALIZE or attendance_archive.is_archived(date)):
+        counts = await count_statuses(date)
+        _status_counts.set(date, counts)
+        return dict(counts)
+
+    for _ in range(SUMMARY_REBUILD_RETRIES):
+        version = (await _versions(date)).get(date)
+        counts = await count_statuses(date)
+        try:
+            # Matches only if no $inc landed while counting (a missing document upserts)
+            await daily_summary_collection.replace_one(
+                {"_id": date, "version": version},
+                _summary_doc(date, counts, version, datetime.now(timezone.utc)),
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            continue
+        _status_counts.set(date, counts)
+        return dict(counts)
+    # Still racing writers: serve the fresh count, leave persisting it to the next read
+    logger.warning("daily_summary rebuild for %s kept racing concurrent writes", date)
+    return dict(counts)
+
+
+async def rebuild_range(date_from: str, date_to: str) -> dict[str, dict]:
+    """Recompute every date in [date_from, date_to]: hot dates with a single aggregation, archived ones from the archive."""
+    watermark = await attendance_archive.archived_before()
+    versions = await _versions({"$gte": date_from, "$lte": date_to})
+    by_date: dict[str, dict] = defaultdict(dict)
+    hot_from = date_from
+    if watermark and date_from < watermark:
+        by_date.update(await attendance_archive.count_statuses_range(date_from, date_to))
+        hot_from = watermark
+    if hot_from <= date_to:
+        pipeline = [
+            {"$match": date_range(hot_from, date_to)},
+            {"$group": {"_id": {"date": "$date", "status": "$status"}, "count": {"$sum": 1}}},
+        ]
+        async for row in attendance_collection.aggregate(pipeline):
+            by_date[decode_date(row["_id"]["date"])][row["_id"]["status"]] = row["count"]
+
+    # Archived dates are always persisted, hot ones only when materializing
+    persisted = {"$gte": date_from, "$lte": date_to}
+    if not SUMMARY_MATERIALIZE:
+        persisted["$lt"] = hot_from
+    raced = []
+    if SUMMARY_MATERIALIZE or date_from < hot_from:
+        rebuilt_at = datetime.now(timezone.utc)
+        await daily_summary_collection.delete_many({"_id": {**persisted, "$nin": list(by_date)}})
+        dates = [date for date in by_date if SUMMARY_MATERIALIZE or date < hot_from]
+        ops = [
+            ReplaceOne(
+                {"_id": date, "version": versions.get(date)},
+                _summary_doc(date, by_date[date], versions.get(date), rebuilt_at),
+                upsert=True,
+            )
+            for date in dates
+        ]
+        if ops:
+            try:
+                await daily_summary_collection.bulk_write(ops, ordered=False)
+            except BulkWriteError as exc:
+                errors = exc.details.get("writeErrors", [])
+                if any(error.get("code") != 11000 for error in errors):
+                    raise
+                # A version mismatch surfaces as a duplicate-key upsert: recount those dates alone
+                raced = [dates[error["index"]] for error in errors]
+
+    for date, counts in by_date.items():
+        if date not in raced:
+            _status_counts.set(date, counts)
+    for date in raced:
+        by_date[date] = await rebuild(date)
+    return dict(by_date)
+
+
+async def record_transitions(transitions: list[tuple[str, Optional[str], Optional[str]]]) -> None:
+    """
+    Apply (date, old_status, new_status) transitions to both layers.
+    `old_status=None` means a new record, `new_status=None` a removed one.
+    """
+    deltas: dict[str, Counter] = defaultdict(Counter)
+    for date, old_status, new_status in transitions:
+        if old_status == new_status:
+            continue
+        if old_status:
+            deltas[date][old_status] -= 1
+        if new_status:
+            deltas[date][new_status] += 1
+
+    for date, delta in deltas.items():
+        cached = _status_counts.get(date)
+        if cached is None:
+            continue
+        for att_status, change in delta.items():
+            cached[att_status] = cached.get(att_status, 0) + change
+            if cached[att_status] <= 0:
+                cached.pop(att_status)
+
+    await attendance_archive.archived_before()
+    ops = []
+    for date, delta in deltas.items():
+        if not (SUMMARY_MATERIALIZE or attendance_archive.is_archived(date)):
+            continue
+        inc = {f"by_status.{att_status}": change for att_status, change in delta.items() if change}
+        if inc:
+            # A date that was never materialized gets a partial document, rebuilt from raw on first read
+            ops.append(UpdateOne(
+                {"_id": date},
+                {"$inc": {**inc, "version": 1}, "$setOnInsert": {"partial": True}},
+                upsert=True,
+            ))
+    if not ops:
+        return
+    try:
+        await daily_summary_collection.bulk_write(ops, ordered=False)
+    except PyMongoError:
+        # Drop both layers for these dates so the next read rebuilds them from raw
+        logger.exception("daily_summary update failed; invalidating dates %s", list(deltas))
+        for date in deltas:
+            _status_counts.pop(date)
+        await daily_summary_collection.delete_many({"_id": {"$in": list(deltas)}})
+
+
+async def record_transition(date: str, old_status: Optional[str], new_status: Optional[str]) -> None:
+    await record_transitions([(date, old_status, new_status)])
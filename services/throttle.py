@@ -0,0 +1,37 @@
+"""
+In-memory token-bucket throttle, keyed by arbitrary strings (username, IP).
+"""
+import math
+import time
+from collections import OrderedDict
+
+
+class TokenBucketThrottle:
+    """
+    Each key holds up to `capacity` tokens, refilled at `refill_per_second`.
+    Only the `max_keys` most recently used keys are tracked.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float, max_keys: int = 10_000):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def _tokens(self, key: str, now: float) -> float:
+        tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated_at) * self.refill_per_second)
+
+    def retry_after(self, key: str) -> int:
+        """Seconds until `key` has a token again (0 if one is available now)."""
+        tokens = self._tokens(key, time.monotonic())
+        if tokens >= 1:
+            return 0
+        return max(1, math.ceil((1 - tokens) / self.refill_per_second))
+
+    def consume(self, key: str) -> None:
+        now = time.monotonic()
+        self._buckets[key] = (max(0.0, self._tokens(key, now) - 1), now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
@@ -2,7 +2,7 @@
 HRMS Lite — Admin Setup & Seed Script
 --------------------------------------
 Run this ONCE after setting up the project to:
-  1. Create MongoDB indexes (unique constraints)
+  1. Create MongoDB indexes (the API also ensures these at startup)
   2. Create the default admin user
 
 Usage:
@@ -14,14 +14,14 @@ Override credentials via .env:
 
 import asyncio
 import os
-import hashlib
-import secrets
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # Import the single shared DB connection
-from database import client, db, admins_collection
+from database import close, db, admins_collection
+from services.indexes import ensure_indexes
+from services.passwords import hash_password_sync as hash_password
 
 # ── Admin credentials from .env ───────────────────────────────────
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
@@ -30,13 +30,6 @@ ADMIN_FULL_NAME = os.getenv("ADMIN_NAME", "System Administrator")
 # ─────────────────────────────────────────────────────────────────
 
 
-def hash_password(password: str) -> str:
-    """SHA-256 hash with a random salt."""
-    salt = secrets.token_hex(16)
-    hashed = hashlib.sha256(f"{salt}{password}".encode()).hexdigest()
-    return f"{salt}:{hashed}"
-
-
 async def setup():
     print("\n🚀  HRMS Lite — Setup Script")
     print("=" * 40)
@@ -44,18 +37,9 @@ async def setup():
     # ── 1. Create indexes ─────────────────────────────────────────
     print("\n📌  Creating database indexes...")
 
-    await db["employees"].create_index("employee_id", unique=True)
-    await db["employees"].create_index("email", unique=True)
-    print("  ✅  employees.employee_id  (unique)")
-    print("  ✅  employees.email        (unique)")
-
-    await db["attendance"].create_index(
-        [("employee_id", 1), ("date", 1)], unique=True
-    )
-    print("  ✅  attendance.(employee_id + date)  (unique compound)")
-
-    await db["admins"].create_index("username", unique=True)
-    print("  ✅  admins.username  (unique)")
+    for collection_name, index_name, unique in await ensure_indexes(db):
+        suffix = "  (unique)" if unique else ""
+        print(f"  ✅  {collection_name}.{index_name}{suffix}")
 
     # ── 2. Create admin user ──────────────────────────────────────
     print("\n👤  Setting up admin user...")
@@ -78,7 +62,7 @@ async def setup():
         print(f"  └─────────────────────────────────┘")
         print(f"\n  ⚠️   Change your password after first login!")
 
-    client.close()
+    close()
 
     print("\n✅  Setup complete! You can now start the server:")
     print("    uvicorn main:app --reload --port 8000\n")
@@ -0,0 +1,125 @@
+"""
+Shared fixtures: the real FastAPI app driven in-process through httpx's ASGI
+transport against a fresh in-memory Mongo stand-in (mongomock-motor) per test.
+
+Run from the backend folder:
+    pip install -r tests/requirements.txt
+    python -m pytest -q
+
+Operators mongomock lacks are filled in by `mongomock_compat`, test-only.
+"""
+from datetime import date
+
+import httpx
+import pytest
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+
+import database
+from database import attendance_archive_collection, attendance_collection, migrations_collection
+from main import app
+from services import (
+    attendance_archive,
+    employee_cache,
+    employee_purge,
+    reports,
+    sessions,
+    summary_cache,
+)
+from tests import mongomock_compat
+
+mongomock_compat.install()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _reset_process_state() -> None:
+    """Forget everything the services cache in process between requests."""
+    summary_cache._status_counts.clear()
+    summary_cache._employee_count.clear()
+    employee_cache._shifts.clear()
+    employee_cache._version.update(value=None, checked_at=0.0)
+    employee_purge._pending.clear()
+    attendance_archive._watermark.update(value=None, checked_at=0.0)
+    reports._built_months.clear()
+
+
+@pytest.fixture
+async def client():
+    database.close()
+    database.connect(AsyncMongoMockClient())
+    _reset_process_state()
+    token, _ = sessions.issue_token("tests", "Test Runner", "admin")
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://tests", headers=headers) as http:
+        yield http
+    database.close()
+
+
+@pytest.fixture
+def today() -> str:
+    return str(date.today())
+
+
+# Attendance history split across both stores (see the `history` fixture)
+WATERMARK = "2026-01-01"
+HOT_DATES = ("2026-01-02", "2026-01-03")
+ARCHIVED_DATES = ("2025-12-30", "2025-12-31")
+EMPLOYEES = ("EMP001", "EMP002")
+
+
+def attendance_record(employee_id: str, att_date: str) -> dict:
+    return {
+        "_id": ObjectId(),
+        "employee_id": employee_id,
+        "date": att_date,
+        "in_time": "09:00",
+        "out_time": "18:00",
+        "status": "Present",
+    }
+
+
+async def archive_records(records: list[dict]) -> None:
+    """Store records the way `archive_month` leaves them (one packed document per employee and month) behind WATERMARK."""
+    by_employee: dict[tuple[str, str], list[dict]] = {}
+    for rec in records:
+        by_employee.setdefault((rec["date"][:7], rec["employee_id"]), []).append(attendance_archive._row(rec))
+    for (month, employee_id), rows in by_employee.items():
+        await attendance_archive_collection.insert_one({
+            "_id": f"{month}:{employee_id}",
+            "month": month,
+            "employee_id": employee_id,
+            "count": len(rows),
+            "records": attendance_archive._pack(rows),
+        })
+    await migrations_collection.update_one(
+        {"_id": attendance_archive.WATERMARK_ID}, {"$set": {"archived_before": WATERMARK}}, upsert=True
+    )
+
+
+@pytest.fixture
+async def history(client):
+    """EMPLOYEES with two hot and two archived days each; returns every record."""
+    for employee_id in EMPLOYEES:
+        await add_employee(client, employee_id)
+    hot = [attendance_record(employee_id, att_date) for att_date in HOT_DATES for employee_id in EMPLOYEES]
+    archived = [attendance_record(employee_id, att_date) for att_date in ARCHIVED_DATES for employee_id in EMPLOYEES]
+    await attendance_collection.insert_many([dict(rec) for rec in hot])
+    await archive_records(archived)
+    return hot + archived
+
+
+async def add_employee(client, employee_id: str, department: str = "Engineering", **shift) -> dict:
+    response = await client.post("/employees", json={
+        "employee_id": employee_id,
+        "full_name": f"Employee {employee_id}",
+        "email": f"{employee_id.lower()}@example.com",
+        "department": department,
+        **shift,
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
@@ -0,0 +1,90 @@
+"""
+Fill-ins for gaps in mongomock, the in-memory Mongo stand-in the tests and
+the benchmarks run against. Each one mirrors what a real server does, so the
+app's queries and pipelines run unchanged; nothing here is imported by app code.
+
+Call `install()` once, before the app issues any query (see conftest.py).
+"""
+import datetime
+
+import mongomock.aggregate
+import mongomock.collection
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+_MISSING = object()
+
+
+def _accept_bulk_sort(method):
+    # pymongo >= 4.11 passes `sort=` for bulk updateOne / replaceOne, which mongomock predates
+    def wrapper(self, *args, sort=None, **kwargs):
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _bson_type(value) -> str:
+    if value is _MISSING:
+        return "missing"
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int" if -2**31 <= value < 2**31 else "long"
+    for python_type, name in (
+        (float, "double"), (str, "string"), (datetime.datetime, "date"),
+        (ObjectId, "objectId"), (dict, "object"), (list, "array"),
+    ):
+        if isinstance(value, python_type):
+            return name
+    raise NotImplementedError(f"$type of {type(value).__name__}")
+
+
+def _to_int(value) -> int:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip("-").isdigit() and value == value.strip():
+        return int(value)
+    raise ValueError(value)
+
+
+def _with_expressions(parse):
+    """`$type` and `$convert` (to int), which mongomock's expression parser lacks."""
+    def evaluate(parser, expression):
+        try:
+            return parse(parser, expression)
+        except KeyError:
+            return _MISSING
+
+    def wrapper(self, expression):
+        if isinstance(expression, dict) and len(expression) == 1:
+            (operator, argument), = expression.items()
+            if operator == "$type":
+                if isinstance(argument, list):
+                    argument, = argument
+                return _bson_type(evaluate(self, argument))
+            if operator == "$convert":
+                if argument.get("to") not in ("int", "long"):
+                    raise NotImplementedError(f"$convert to {argument.get('to')!r}")
+                value = evaluate(self, argument["input"])
+                if value is _MISSING or value is None:
+                    return parse(self, argument["onNull"]) if "onNull" in argument else None
+                try:
+                    return _to_int(value)
+                except ValueError:
+                    if "onError" not in argument:
+                        raise OperationFailure(f"Failed to parse number {value!r} in $convert")
+                    return parse(self, argument["onError"])
+        return parse(self, expression)
+    return wrapper
+
+
+def install() -> None:
+    builder = mongomock.collection.BulkOperationBuilder
+    builder.add_update = _accept_bulk_sort(builder.add_update)
+    builder.add_replace = _accept_bulk_sort(builder.add_replace)
+    mongomock.aggregate._Parser.parse = _with_expressions(mongomock.aggregate._Parser.parse)
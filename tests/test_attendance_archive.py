@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+from database import attendance_archive_collection, attendance_collection
+from services import attendance_archive
+from tests.conftest import ARCHIVED_DATES, EMPLOYEES, HOT_DATES, archive_records, attendance_record
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def archive_reads(monkeypatch):
+    """Limits passed to `attendance_archive.find_page`, one entry per call."""
+    calls = []
+    find_page = attendance_archive.find_page
+
+    async def spy(**kwargs):
+        calls.append(kwargs["limit"])
+        return await find_page(**kwargs)
+
+    monkeypatch.setattr(attendance_archive, "find_page", spy)
+    return calls
+
+
+class FindSpy:
+    """The archive collection, recording the filter of every `find`."""
+
+    def __init__(self):
+        self.filters = []
+
+    def find(self, query, *args, **kwargs):
+        self.filters.append(query)
+        return attendance_archive_collection.find(query, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(attendance_archive_collection, name)
+
+
+@pytest.fixture
+def archive_finds(monkeypatch):
+    """Filters of every find the archive module runs, one entry per call."""
+    spy = FindSpy()
+    monkeypatch.setattr(attendance_archive, "attendance_archive_collection", spy)
+    return spy.filters
+
+
+async def all_pages(client, path: str, limit: int, **params) -> list[list[dict]]:
+    pages = []
+    params = {"from": "2025-12-01", "to": "2026-01-31", "limit": limit, **params}
+    while True:
+        response = await client.get(path, params=params)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+        params["after"] = cursor
+
+
+def newest_first(records: list[dict]) -> list[str]:
+    return [str(rec["_id"]) for rec in sorted(records, key=lambda rec: (rec["date"], rec["_id"]), reverse=True)]
+
+
+async def test_cursor_pages_cross_from_hot_to_archive(client, history):
+    pages = await all_pages(client, "/attendance", limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 2]
+    assert [row["id"] for page in pages for row in page] == newest_first(history)
+
+
+async def test_hot_only_page_does_not_read_the_archive(client, history, archive_reads):
+    response = await client.get("/attendance", params={"from": "2025-12-01", "limit": 2})
+    assert len(response.json()) == 2
+    assert archive_reads == []
+
+
+async def test_archive_read_is_bounded_by_the_rows_still_needed(client, history, archive_reads):
+    await all_pages(client, "/attendance", limit=3)
+    # Page 1: 4 hot rows fill limit + 1; page 2: 1 hot row left, 3 more wanted; page 3: archive only
+    assert archive_reads == [3, 4]
+
+
+async def test_record_in_both_stores_is_listed_once(client, history):
+    moving = next(rec for rec in history if rec["date"] == ARCHIVED_DATES[0])
+    await attendance_collection.insert_one(dict(moving))
+
+    pages = await all_pages(client, "/attendance", limit=3)
+
+    ids = [row["id"] for page in pages for row in page]
+    assert ids == newest_first(history)
+
+
+async def test_archive_page_reads_only_the_months_it_needs(client, history, archive_finds):
+    await archive_records([attendance_record(employee_id, "2025-11-28") for employee_id in EMPLOYEES])
+
+    response = await client.get("/attendance", params={"from": "2025-11-01", "limit": 5})
+
+    assert len(response.json()) == 5
+    # December alone fills the page; November's documents are never fetched
+    assert [query["month"] for query in archive_finds] == ["2025-12"]
+
+
+async def test_export_writes_a_record_in_both_stores_once(client, history):
+    moving = next(rec for rec in history if rec["date"] == ARCHIVED_DATES[0])
+    await attendance_collection.insert_one(dict(moving))
+
+    response = await client.get("/attendance/export", params={"from": "2025-12-01", "to": "2026-01-31"})
+
+    ids = [json.loads(line)["id"] for line in response.text.splitlines()]
+    assert sorted(ids) == sorted(str(rec["_id"]) for rec in history)
+
+
+async def test_employee_history_spans_both_stores(client, history):
+    pages = await all_pages(client, "/attendance/EMP001", limit=1)
+    assert [row["date"] for page in pages for row in page] == [*reversed(HOT_DATES), *reversed(ARCHIVED_DATES)]
+
+
+async def test_archived_dates_are_read_only(client, history):
+    response = await client.post(
+        "/attendance/mark-in", json={"employee_id": "EMP001", "date": "2025-12-15", "in_time": "09:00"}
+    )
+    assert response.status_code == 409
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from database import attendance_collection
+from tests.conftest import add_employee
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_bulk_applies_events_and_reports_each_one(client, today):
+    await add_employee(client, "EMP001")
+    await add_employee(client, "EMP002")
+    response = await client.post("/attendance/bulk", json=[
+        {"action": "in", "employee_id": "EMP001", "date": today, "in_time": "09:30"},
+        {"action": "absent", "employee_id": "EMP002", "date": today},
+        {"action": "in", "employee_id": "EMP002", "date": today, "in_time": "09:00"},
+        {"action": "in", "employee_id": "EMP404", "date": today, "in_time": "09:00"},
+        {"action": "in", "employee_id": "EMP001", "date": today, "in_time": "9 o'clock"},
+    ])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["created"], body["conflict"], body["not_found"], body["invalid"]) == (5, 2, 1, 1, 1)
+    assert [result["status"] for result in body["results"]] == ["created", "created", "conflict", "not_found", "invalid"]
+    assert body["results"][0]["record"]["status"] == "Late"
+    assert await attendance_collection.count_documents({}) == 2
+
+
+async def test_bulk_accepts_ndjson(client, today):
+    await add_employee(client, "EMP001")
+    events = [
+        {"action": "in", "employee_id": "EMP001", "date": today, "in_time": "09:00"},
+        {"action": "out", "employee_id": "EMP001", "date": today, "out_time": "17:00"},
+    ]
+    response = await client.post(
+        "/attendance/bulk",
+        content="\n".join(json.dumps(event) for event in events) + "\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert [result["status"] for result in response.json()["results"]] == ["created", "updated"]
+    record = await attendance_collection.find_one({"employee_id": "EMP001"})
+    assert (record["out_time"], record["status"]) == ("17:00", "Early Exit")
+
+
+async def test_bulk_rejects_a_non_array_body(client):
+    response = await client.post("/attendance/bulk", json={"events": []})
+    assert response.status_code == 400
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from database import attendance_collection
+from services import attendance_batch, attendance_coalescer
+from tests.conftest import add_employee
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def coalesced(monkeypatch):
+    """Group commit on, with every `apply_events` call recorded by batch size."""
+    batches = []
+    apply_events = attendance_batch.apply_events
+
+    async def spy(events):
+        batches.append(len(events))
+        return await apply_events(events)
+
+    monkeypatch.setattr(attendance_coalescer, "ATTENDANCE_COALESCE", True)
+    monkeypatch.setattr(attendance_coalescer, "apply_events", spy)
+    return batches
+
+
+async def mark_in(client, employee_id, att_date):
+    return await client.post(
+        "/attendance/mark-in", json={"employee_id": employee_id, "date": att_date, "in_time": "09:20"}
+    )
+
+
+async def test_concurrent_marks_share_one_batch(client, today, coalesced):
+    for number in range(1, 6):
+        await add_employee(client, f"EMP{number:03d}")
+
+    responses = await asyncio.gather(*(mark_in(client, f"EMP{number:03d}", today) for number in range(1, 6)))
+
+    assert [response.status_code for response in responses] == [201] * 5
+    assert {response.json()["status"] for response in responses} == {"Late"}
+    assert coalesced == [5]
+    assert await attendance_collection.count_documents({}) == 5
+
+
+async def test_each_caller_gets_its_own_outcome(client, today, coalesced):
+    await add_employee(client, "EMP001")
+
+    responses = await asyncio.gather(
+        mark_in(client, "EMP001", today),
+        mark_in(client, "EMP001", today),
+        mark_in(client, "EMP404", today),
+    )
+
+    assert sorted(response.status_code for response in responses) == [201, 404, 409]
+
+
+async def test_drain_waits_for_queued_flushes(client, today, coalesced):
+    await add_employee(client, "EMP001")
+    pending = asyncio.create_task(mark_in(client, "EMP001", today))
+    while not attendance_coalescer._tasks:
+        await asyncio.sleep(0)
+
+    await attendance_coalescer.drain()
+
+    assert await attendance_collection.count_documents({}) == 1
+    assert (await pending).status_code == 201
@@ -0,0 +1,46 @@
+import csv
+import io
+import json
+
+import pytest
+
+from database import attendance_collection
+from tests.conftest import add_employee, attendance_record
+
+pytestmark = pytest.mark.anyio
+
+DATES = ("2026-01-05", "2026-01-06", "2026-01-07")
+
+
+@pytest.fixture
+async def records(client):
+    await add_employee(client, "EMP001", department="Engineering")
+    await add_employee(client, "EMP002", department="Sales")
+    rows = [attendance_record(employee_id, att_date) for att_date in DATES for employee_id in ("EMP001", "EMP002")]
+    await attendance_collection.insert_many([dict(row) for row in rows])
+    return rows
+
+
+async def test_ndjson_export_is_oldest_first(client, records):
+    response = await client.get("/attendance/export", params={"from": DATES[1]})
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["date"] for row in rows] == [DATES[1], DATES[1], DATES[2], DATES[2]]
+
+
+async def test_csv_export_has_a_header_row(client, records):
+    response = await client.get("/attendance/export", params={"format": "csv", "to": DATES[0]})
+
+    assert 'filename="attendance_start_2026-01-05.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(row["employee_id"], row["date"], row["status"]) for row in rows] == [
+        ("EMP001", DATES[0], "Present"), ("EMP002", DATES[0], "Present"),
+    ]
+
+
+async def test_department_export(client, records):
+    response = await client.get("/attendance/export", params={"department": "Sales"})
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert {row["employee_id"] for row in rows} == {"EMP002"}
+    assert len(rows) == len(DATES)
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from database import attendance_collection
+from tests.conftest import add_employee
+
+pytestmark = pytest.mark.anyio
+
+
+async def mark_in(client, employee_id, att_date, in_time):
+    return await client.post("/attendance/mark-in", json={"employee_id": employee_id, "date": att_date, "in_time": in_time})
+
+
+async def mark_out(client, employee_id, att_date, out_time):
+    return await client.post("/attendance/mark-out", json={"employee_id": employee_id, "date": att_date, "out_time": out_time})
+
+
+async def test_mark_in_within_grace_is_incomplete(client, today):
+    await add_employee(client, "EMP001")
+    response = await mark_in(client, "EMP001", today, "09:15")
+    assert response.status_code == 201
+    assert response.json()["status"] == "Incomplete"
+
+
+async def test_mark_in_after_grace_is_late(client, today):
+    await add_employee(client, "EMP001")
+    response = await mark_in(client, "EMP001", today, "09:16")
+    assert response.json()["status"] == "Late"
+
+
+async def test_unpadded_times_are_stored_zero_padded(client, today):
+    await add_employee(client, "EMP001")
+    response = await mark_in(client, "EMP001", today, "9:5")
+    assert response.status_code == 201
+    assert response.json()["in_time"] == "09:05"
+    record = await attendance_collection.find_one({"employee_id": "EMP001"})
+    assert record["in_time"] == "09:05"
+
+
+@pytest.mark.parametrize("in_time", ["25:00", "9:60", "nine", "09:00:00"])
+async def test_invalid_times_are_rejected(client, today, in_time):
+    await add_employee(client, "EMP001")
+    response = await mark_in(client, "EMP001", today, in_time)
+    assert response.status_code == 400
+    assert await attendance_collection.count_documents({}) == 0
+
+
+async def test_mark_out_after_shift_is_present_with_worked_minutes(client, today):
+    await add_employee(client, "EMP001")
+    await mark_in(client, "EMP001", today, "9:05")
+    response = await mark_out(client, "EMP001", today, "18:30")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "Present"
+    assert body["worked_minutes"] == 565
+    assert body["overtime_minutes"] == 30
+    record = await attendance_collection.find_one({"employee_id": "EMP001"})
+    assert (record["status"], record["worked_minutes"], record["overtime_minutes"]) == ("Present", 565, 30)
+
+
+async def test_late_and_early_mark_out(client, today):
+    await add_employee(client, "EMP001")
+    await mark_in(client, "EMP001", today, "10:00")
+    response = await mark_out(client, "EMP001", today, "17:00")
+    body = response.json()
+    assert body["status"] == "Late & Early Exit"
+    assert body["worked_minutes"] == 420
+    assert body["overtime_minutes"] == 0
+
+
+async def test_mark_out_uses_the_employee_shift(client, today):
+    await add_employee(client, "EMP001", shift_start_time="06:00", shift_end_time="14:00")
+    await mark_in(client, "EMP001", today, "06:10")
+    response = await mark_out(client, "EMP001", today, "14:00")
+    assert response.json()["status"] == "Present"
+    assert response.json()["worked_minutes"] == 470
+
+
+async def test_unreadable_legacy_in_time_counts_zero_minutes(client, today):
+    await add_employee(client, "EMP001")
+    await attendance_collection.insert_one(
+        {"employee_id": "EMP001", "date": today, "in_time": "9h05", "out_time": None, "status": "Incomplete"}
+    )
+    response = await mark_out(client, "EMP001", today, "18:00")
+    assert response.status_code == 200
+    assert response.json()["status"] == "Present"
+    assert response.json()["worked_minutes"] == 0
+
+
+async def test_second_mark_out_conflicts(client, today):
+    await add_employee(client, "EMP001")
+    await mark_in(client, "EMP001", today, "09:00")
+    assert (await mark_out(client, "EMP001", today, "18:00")).status_code == 200
+    assert (await mark_out(client, "EMP001", today, "19:00")).status_code == 409
+
+
+async def test_concurrent_mark_ins_create_one_record(client, today):
+    await add_employee(client, "EMP001")
+    responses = await asyncio.gather(*(mark_in(client, "EMP001", today, "09:00") for _ in range(5)))
+    assert sorted(response.status_code for response in responses) == [201, 409, 409, 409, 409]
+    assert await attendance_collection.count_documents({"employee_id": "EMP001"}) == 1
+
+
+async def test_concurrent_mark_outs_close_the_record_once(client, today):
+    await add_employee(client, "EMP001")
+    await mark_in(client, "EMP001", today, "09:00")
+    responses = await asyncio.gather(*(mark_out(client, "EMP001", today, f"18:0{i}") for i in range(5)))
+    assert sorted(response.status_code for response in responses) == [200, 409, 409, 409, 409]
+    winner = next(response.json() for response in responses if response.status_code == 200)
+    record = await attendance_collection.find_one({"employee_id": "EMP001"})
+    assert (record["out_time"], record["worked_minutes"]) == (winner["out_time"], winner["worked_minutes"])
+
+
+async def test_mark_out_without_mark_in_is_not_found(client, today):
+    await add_employee(client, "EMP001")
+    assert (await mark_out(client, "EMP001", today, "18:00")).status_code == 404
+
+
+async def test_bulk_events_normalize_times(client, today):
+    await add_employee(client, "EMP001")
+    response = await client.post("/attendance/bulk", json=[
+        {"action": "in", "employee_id": "EMP001", "date": today, "in_time": "9:00"},
+        {"action": "out", "employee_id": "EMP001", "date": today, "out_time": "18:00"},
+    ])
+    assert response.status_code == 200, response.text
+    record = await attendance_collection.find_one({"employee_id": "EMP001"})
+    assert (record["in_time"], record["out_time"], record["status"]) == ("09:00", "18:00", "Present")
+    assert record["worked_minutes"] == 540
@@ -0,0 +1,45 @@
+import pytest
+
+from services import sessions
+
+pytestmark = pytest.mark.anyio
+
+
+async def stream_token(client) -> str:
+    response = await client.post("/dashboard/stream-token")
+    assert response.status_code == 200
+    return response.json()["token"]
+
+
+async def test_stream_requires_a_token(client):
+    response = await client.get("/dashboard/stream", headers={"Authorization": ""})
+    assert response.status_code == 401
+
+
+async def test_stream_token_is_not_a_bearer_session(client):
+    token = await stream_token(client)
+    response = await client.get("/dashboard/summary", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+async def test_session_token_is_not_accepted_in_the_query(client):
+    session_token, _ = sessions.issue_token("tests", "Test Runner", "admin")
+    response = await client.get(
+        "/dashboard/stream", params={"token": session_token}, headers={"Authorization": ""}
+    )
+    assert response.status_code == 401
+
+
+async def test_stream_token_opens_the_stream():
+    token, _ = sessions.issue_token(
+        "tests", "Test Runner", "admin", ttl=sessions.SESSION_STREAM_TOKEN_TTL, scope=sessions.STREAM_SCOPE
+    )
+    # The route itself never ends, so check the dependency the stream router runs
+    claims = await sessions.require_stream_session(token=token, session=None)
+    assert (claims["sub"], claims["scope"]) == ("tests", sessions.STREAM_SCOPE)
+
+
+async def test_expired_stream_token_is_rejected(client):
+    token, _ = sessions.issue_token("tests", "Test Runner", "admin", ttl=-1, scope=sessions.STREAM_SCOPE)
+    response = await client.get("/dashboard/stream", params={"token": token}, headers={"Authorization": ""})
+    assert response.status_code == 401
@@ -0,0 +1,98 @@
+import pytest
+
+from database import daily_summary_collection
+from services import summary_cache
+from tests.conftest import add_employee
+
+pytestmark = pytest.mark.anyio
+
+
+async def mark_in(client, employee_id, att_date, in_time):
+    response = await client.post(
+        "/attendance/mark-in", json={"employee_id": employee_id, "date": att_date, "in_time": in_time}
+    )
+    assert response.status_code == 201, response.text
+
+
+async def summary(client, att_date) -> dict:
+    response = await client.get("/dashboard/summary", params={"date": att_date})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture
+def materialized(monkeypatch):
+    monkeypatch.setattr(summary_cache, "SUMMARY_MATERIALIZE", True)
+
+
+async def test_summary_counts_each_bucket(client, today):
+    for employee_id in ("EMP001", "EMP002", "EMP003", "EMP004"):
+        await add_employee(client, employee_id)
+    await mark_in(client, "EMP001", today, "09:00")
+    await mark_in(client, "EMP002", today, "10:00")
+    await client.post("/attendance/mark-absent", json={"employee_id": "EMP003", "date": today})
+
+    body = await summary(client, today)
+
+    assert body["total_employees"] == 4
+    assert body["attendance"] == {
+        "present": 0, "late": 1, "early_exit": 0, "incomplete": 1, "absent": 1, "unmarked": 1,
+    }
+
+
+async def test_cached_summary_follows_later_writes(client, today):
+    await add_employee(client, "EMP001")
+    await mark_in(client, "EMP001", today, "09:00")
+    assert (await summary(client, today))["attendance"]["incomplete"] == 1
+
+    await client.post("/attendance/mark-out", json={"employee_id": "EMP001", "date": today, "out_time": "18:00"})
+
+    attendance = (await summary(client, today))["attendance"]
+    assert (attendance["incomplete"], attendance["present"]) == (0, 1)
+
+
+async def test_materialized_summary_is_persisted_and_incremented(client, today, materialized):
+    await add_employee(client, "EMP001")
+    await add_employee(client, "EMP002")
+    await mark_in(client, "EMP001", today, "09:00")
+    await summary(client, today)
+    await mark_in(client, "EMP002", today, "10:00")
+
+    doc = await daily_summary_collection.find_one({"_id": today})
+    assert doc["by_status"] == {"Incomplete": 1, "Late": 1}
+    assert "partial" not in doc
+
+
+async def test_rebuild_recounts_when_a_write_lands_mid_count(client, today, materialized, monkeypatch):
+    await add_employee(client, "EMP001")
+    await add_employee(client, "EMP002")
+    await mark_in(client, "EMP001", today, "09:00")
+    count_statuses = summary_cache.count_statuses
+    counted = []
+
+    async def count_then_write(date):
+        counts = await count_statuses(date)
+        if not counted:
+            # Lands after the rebuild counted, before it stores the result
+            await mark_in(client, "EMP002", today, "09:00")
+        counted.append(counts)
+        return counts
+
+    monkeypatch.setattr(summary_cache, "count_statuses", count_then_write)
+    counts = await summary_cache.rebuild(today)
+
+    assert counted == [{"Incomplete": 1}, {"Incomplete": 2}]
+    assert counts == {"Incomplete": 2}
+    assert (await daily_summary_collection.find_one({"_id": today}))["by_status"] == {"Incomplete": 2}
+
+
+async def test_partial_document_is_rebuilt_on_read(client, today, materialized):
+    await add_employee(client, "EMP001")
+    await add_employee(client, "EMP002")
+    await mark_in(client, "EMP001", today, "09:00")
+    # An increment for a date never counted leaves a partial document
+    assert (await daily_summary_collection.find_one({"_id": today}))["partial"] is True
+
+    assert (await summary(client, today))["attendance"]["incomplete"] == 1
+    doc = await daily_summary_collection.find_one({"_id": today})
+    assert "partial" not in doc
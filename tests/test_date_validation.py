@@ -0,0 +1,42 @@
+import pytest
+
+from database import attendance_collection
+from tests.conftest import add_employee
+
+pytestmark = pytest.mark.anyio
+
+# Not YYYY-MM-DD, though date.fromisoformat on Python 3.11 accepts the first two
+BAD_DATES = ["20260220", "2026-W08-5", "2026-2-5", "2026-02-30", "garbage"]
+
+
+@pytest.mark.parametrize("att_date", BAD_DATES)
+async def test_mark_in_rejects_other_date_forms(client, att_date):
+    await add_employee(client, "EMP001")
+    response = await client.post(
+        "/attendance/mark-in", json={"employee_id": "EMP001", "date": att_date, "in_time": "09:00"}
+    )
+    assert response.status_code == 400
+    assert await attendance_collection.count_documents({}) == 0
+
+
+@pytest.mark.parametrize("att_date", BAD_DATES)
+async def test_list_filters_reject_other_date_forms(client, att_date):
+    response = await client.get("/attendance", params={"from": att_date})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("path", ["/dashboard/summary", "/dashboard/stream"])
+@pytest.mark.parametrize("att_date", BAD_DATES)
+async def test_dashboard_rejects_other_date_forms(client, path, att_date):
+    response = await client.get(path, params={"date": att_date})
+    assert response.status_code == 400
+
+
+async def test_summary_rebuild_checks_both_dates(client):
+    response = await client.post("/dashboard/summary/rebuild", params={"date": "2026-02-01", "to": "20260228"})
+    assert response.status_code == 400
+
+
+async def test_absentee_backfill_rejects_other_date_forms(client):
+    response = await client.post("/attendance/absentees", params={"date": "2026-W08-5"})
+    assert response.status_code == 400
@@ -0,0 +1,73 @@
+import pytest
+
+from database import employees_collection
+from services import employee_import
+from tests.conftest import add_employee
+
+pytestmark = pytest.mark.anyio
+
+CSV_BODY = (
+    "employee_id,full_name,email,department,shift_start_time\n"
+    "EMP010,Ada Lovelace,ada@example.com,Engineering,08:00\n"
+    "EMP011,Grace Hopper,not-an-email,Engineering,\n"
+    "EMP010,Ada Again,ada2@example.com,Engineering,\n"
+    "EMP012,Alan Turing,ada@example.com,Research,\n"
+    "EMP001,Existing Id,new@example.com,Research,\n"
+    '"EMP013","Hopper, Grace","grace@example.com","Engineering",\n'
+)
+
+
+async def import_csv(client, body: str) -> dict:
+    response = await client.post("/employees/bulk", content=body.encode(), headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_csv_import_report(client):
+    await add_employee(client, "EMP001")
+    report = await import_csv(client, CSV_BODY)
+
+    assert (report["total"], report["created"], report["duplicate"], report["invalid"]) == (6, 2, 3, 1)
+    statuses = [(result["row"], result["employee_id"], result["status"]) for result in report["results"]]
+    assert statuses == [
+        (0, "EMP010", "created"),
+        (1, "EMP011", "invalid"),
+        (2, "EMP010", "duplicate"),
+        (3, "EMP012", "duplicate"),
+        (4, "EMP001", "duplicate"),
+        (5, "EMP013", "created"),
+    ]
+    assert "repeats an earlier row" in report["results"][2]["detail"]
+    assert "already exists" in report["results"][4]["detail"]
+
+    created = await employees_collection.find_one({"employee_id": "EMP010"})
+    assert str(created["_id"]) == report["results"][0]["id"]
+    assert (created["shift_start_time"], created["shift_end_time"]) == ("08:00", "18:00")
+    assert (await employees_collection.find_one({"employee_id": "EMP013"}))["full_name"] == "Hopper, Grace"
+
+
+async def test_json_import_report(client):
+    response = await client.post("/employees/bulk", json=[
+        {"employee_id": "EMP020", "full_name": "Katherine Johnson", "email": "kj@example.com", "department": "Research"},
+        {"employee_id": "EMP021", "full_name": "X", "email": "x@example.com", "department": "Research"},
+    ])
+    report = response.json()
+    assert (report["created"], report["invalid"]) == (1, 1)
+    assert [result["status"] for result in report["results"]] == ["created", "invalid"]
+
+
+async def test_report_spans_insert_batches(client, monkeypatch):
+    monkeypatch.setattr(employee_import, "IMPORT_BATCH_SIZE", 2)
+    body = "employee_id,full_name,email,department\n" + "".join(
+        f"EMP{n:03d},Employee {n},e{n}@example.com,Engineering\n" for n in range(5)
+    )
+    report = await import_csv(client, body)
+    assert (report["total"], report["created"]) == (5, 5)
+    assert await employees_collection.count_documents({}) == 5
+
+
+async def test_malformed_json_body_is_rejected(client):
+    response = await client.post(
+        "/employees/bulk", content=b'[{"employee_id": "EMP030"', headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 400
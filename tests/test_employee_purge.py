@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from database import attendance_collection, purge_jobs_collection
+from services import employee_purge
+from tests.conftest import ARCHIVED_DATES, HOT_DATES, add_employee
+
+pytestmark = pytest.mark.anyio
+
+RANGE = {"from": "2025-12-01", "to": "2026-01-31"}
+
+
+@pytest.fixture
+async def offboarded(client, history):
+    """EMP002 offboarded; the purge worker is not running, so its history is still pending removal."""
+    response = await client.post("/employees/offboard", json={"employee_ids": ["EMP002"]})
+    assert response.json()["scheduled"] == 1
+    assert "EMP002" in employee_purge.pending_ids()
+    return history
+
+
+def employee_ids(rows: list[dict]) -> set[str]:
+    return {row["employee_id"] for row in rows}
+
+
+async def export_rows(client, **params) -> list[dict]:
+    response = await client.get("/attendance/export", params={**RANGE, **params})
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+async def test_list_hides_pending_purge_in_both_stores(client, offboarded):
+    response = await client.get("/attendance", params={**RANGE, "limit": 100})
+    rows = response.json()
+    assert employee_ids(rows) == {"EMP001"}
+    # EMP001's hot and archived days are all still there
+    assert len(rows) == 4
+
+
+async def test_employee_history_of_pending_purge_is_empty(client, offboarded):
+    response = await client.get("/attendance/EMP002", params=RANGE)
+    assert response.json() == []
+
+
+async def test_export_hides_pending_purge_in_both_stores(client, offboarded):
+    rows = await export_rows(client)
+    assert employee_ids(rows) == {"EMP001"}
+    assert [row["date"] for row in rows] == sorted(row["date"] for row in rows)
+    assert len(rows) == 4
+
+
+async def test_department_export_hides_pending_purge(client, offboarded):
+    rows = await export_rows(client, department="Engineering")
+    assert employee_ids(rows) == {"EMP001"}
+    assert len(rows) == 4
+
+
+async def test_csv_export_hides_pending_purge(client, offboarded):
+    response = await client.get("/attendance/export", params={**RANGE, "format": "csv"})
+    lines = response.text.strip().splitlines()
+    assert len(lines) == 1 + 4
+    assert not any("EMP002" in line for line in lines)
+
+
+async def test_directory_hides_offboarded_employees(client, offboarded):
+    response = await client.get("/employees")
+    assert [employee["employee_id"] for employee in response.json()] == ["EMP001"]
+
+
+@pytest.mark.parametrize("att_date", [HOT_DATES[0], ARCHIVED_DATES[0]])
+async def test_dashboard_does_not_count_pending_purge(client, offboarded, att_date):
+    response = await client.get("/dashboard/summary", params={"date": att_date})
+    body = response.json()
+    assert body["total_employees"] == 1
+    assert body["attendance"]["present"] == 1
+    assert body["attendance"]["unmarked"] == 0
+
+
+async def test_dashboard_counts_stay_right_once_the_purge_finishes(client, offboarded):
+    await client.get("/dashboard/summary", params={"date": HOT_DATES[0]})
+    await employee_purge.purge_employee("EMP002")
+
+    response = await client.get("/dashboard/summary", params={"date": HOT_DATES[0]})
+    assert response.json()["attendance"]["present"] == 1
+
+
+async def test_offboarding_again_after_a_finished_purge(client, offboarded, today):
+    await employee_purge.purge_employee("EMP002")
+    assert (await purge_jobs_collection.find_one({"_id": "EMP002"}))["state"] == "done"
+    await add_employee(client, "EMP002")
+    await client.post("/attendance/mark-in", json={"employee_id": "EMP002", "date": today, "in_time": "09:00"})
+
+    response = await client.post("/employees/offboard", json={"employee_ids": ["EMP002"]})
+
+    assert response.json()["scheduled"] == 1
+    job = await purge_jobs_collection.find_one({"_id": "EMP002"})
+    assert (job["state"], job["removed"]) == ("pending", 0)
+    assert "finished_at" not in job
+    assert "EMP002" in employee_purge.pending_ids()
+    assert (await employee_purge._claim_job())["_id"] == "EMP002"
+    assert await employee_purge.purge_employee("EMP002") == 1
+    assert await attendance_collection.count_documents({"employee_id": "EMP002"}) == 0
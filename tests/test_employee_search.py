@@ -0,0 +1,62 @@
+import pytest
+
+from database import employees_collection
+from services import employee_search
+from tests.conftest import add_employee
+
+pytestmark = pytest.mark.anyio
+
+
+async def search(client, **params) -> list[str]:
+    response = await client.get("/employees", params=params)
+    assert response.status_code == 200
+    return [employee["employee_id"] for employee in response.json()]
+
+
+@pytest.fixture
+async def directory(client):
+    for employee_id, full_name, email, department in (
+        ("EMP001", "Jane Doe", "Jane.Doe@Example.com", "Engineering"),
+        ("EMP002", "John Smith", "jsmith@example.com", "Sales"),
+        ("EMP003", "Janet  O'Neil", "janet@example.com", "Engineering"),
+    ):
+        response = await client.post("/employees", json={
+            "employee_id": employee_id, "full_name": full_name, "email": email, "department": department,
+        })
+        assert response.status_code == 201, response.text
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("jan", ["EMP001", "EMP003"]),
+    ("DOE", ["EMP001"]),
+    ("jane d", ["EMP001"]),
+    ("o'neil", ["EMP003"]),
+    ("smi", ["EMP002"]),
+])
+async def test_name_prefix_search(client, directory, q, expected):
+    assert await search(client, q=q) == expected
+
+
+@pytest.mark.parametrize("q", ["jane.doe@", "JANE.DOE", "Jane.Doe@Example"])
+async def test_email_prefix_search_ignores_case(client, directory, q):
+    assert await search(client, q=q) == ["EMP001"]
+
+
+async def test_search_combines_with_filters(client, directory):
+    assert await search(client, q="jan", department="Engineering") == ["EMP001", "EMP003"]
+    assert await search(client, q="jan", department="Sales") == []
+
+
+async def test_regex_characters_are_literal(client, directory):
+    assert await search(client, q="j.n") == []
+
+
+async def test_backfill_adds_search_fields_to_older_employees(client):
+    await add_employee(client, "EMP001")
+    await employees_collection.insert_one({
+        "employee_id": "EMP002", "full_name": "Legacy Person", "email": "Legacy@Example.com",
+        "department": "Sales",
+    })
+
+    assert await employee_search.backfill_search_fields() == 1
+    assert await search(client, q="legacy@") == ["EMP002"]
@@ -0,0 +1,58 @@
+import pytest
+
+from database import attendance_collection
+from tests.conftest import add_employee, attendance_record
+
+pytestmark = pytest.mark.anyio
+
+
+async def follow(client, path: str, **params) -> list[list[dict]]:
+    pages = []
+    while True:
+        response = await client.get(path, params=params)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+        params["after"] = cursor
+
+
+async def test_employee_pages_follow_the_cursor(client):
+    for number in range(1, 6):
+        await add_employee(client, f"EMP{number:03d}")
+
+    pages = await follow(client, "/employees", limit=2)
+
+    assert [[employee["employee_id"] for employee in page] for page in pages] == [
+        ["EMP001", "EMP002"], ["EMP003", "EMP004"], ["EMP005"],
+    ]
+
+
+async def test_attendance_pages_are_newest_first_without_gaps(client):
+    records = [
+        attendance_record(employee_id, att_date)
+        for att_date in ("2026-01-05", "2026-01-06", "2026-01-07")
+        for employee_id in ("EMP001", "EMP002")
+    ]
+    await attendance_collection.insert_many([dict(rec) for rec in records])
+
+    pages = await follow(client, "/attendance", limit=4)
+
+    assert [len(page) for page in pages] == [4, 2]
+    expected = sorted(records, key=lambda rec: (rec["date"], rec["_id"]), reverse=True)
+    assert [row["id"] for page in pages for row in page] == [str(rec["_id"]) for rec in expected]
+
+
+async def test_full_last_page_has_no_cursor(client):
+    await add_employee(client, "EMP001")
+    await add_employee(client, "EMP002")
+    response = await client.get("/employees", params={"limit": 2})
+    assert len(response.json()) == 2
+    assert "X-Next-Cursor" not in response.headers
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30"])
+async def test_malformed_cursor_is_rejected(client, cursor):
+    response = await client.get("/attendance", params={"after": cursor})
+    assert response.status_code == 400
@@ -0,0 +1,119 @@
+import pytest
+
+from database import monthly_rollup_collection, report_months_collection
+from services import reports
+from tests.conftest import add_employee
+
+pytestmark = pytest.mark.anyio
+
+
+async def mark_in(client, employee_id, att_date, in_time="09:00"):
+    response = await client.post(
+        "/attendance/mark-in", json={"employee_id": employee_id, "date": att_date, "in_time": in_time}
+    )
+    assert response.status_code == 201, response.text
+
+
+@pytest.fixture
+async def built_month(client, today):
+    """The current month, built (empty) so writes adjust its rollups in place."""
+    month = today[:7]
+    response = await client.post("/reports/monthly/rebuild", params={"month": month})
+    assert response.status_code == 200
+    return month
+
+
+def rows_by_employee(report: dict) -> dict:
+    return {row["employee_id"]: row for row in report["employees"]}
+
+
+async def test_transitions_update_built_month_rollups(client, today, built_month):
+    for employee_id in ("EMP001", "EMP002", "EMP003"):
+        await add_employee(client, employee_id)
+
+    await client.post("/attendance/mark-in", json={"employee_id": "EMP001", "date": today, "in_time": "9:00"})
+    await client.post("/attendance/mark-out", json={"employee_id": "EMP001", "date": today, "out_time": "18:30"})
+    await client.post("/attendance/mark-absent", json={"employee_id": "EMP002", "date": today})
+    await client.post("/attendance/mark-in", json={"employee_id": "EMP003", "date": today, "in_time": "10:00"})
+    await client.post("/attendance/mark-out", json={"employee_id": "EMP003", "date": today, "out_time": "17:00"})
+
+    response = await client.get("/reports/monthly", params={"month": built_month})
+    assert response.status_code == 200
+    rows = rows_by_employee(response.json())
+    assert (rows["EMP001"]["days_present"], rows["EMP001"]["hours_worked"]) == (1, 9.5)
+    assert (rows["EMP002"]["days_present"], rows["EMP002"]["absences"]) == (0, 1)
+    assert (rows["EMP003"]["late"], rows["EMP003"]["early_exits"], rows["EMP003"]["hours_worked"]) == (1, 1, 7.0)
+
+    rollup = await monthly_rollup_collection.find_one({"_id": f"{built_month}:EMP001"})
+    assert rollup["marked_days"] == 1
+    assert {status: count for status, count in rollup["by_status"].items() if count} == {"Present": 1}
+
+
+async def test_incomplete_record_moves_to_its_final_status(client, today, built_month):
+    await add_employee(client, "EMP001")
+    await client.post("/attendance/mark-in", json={"employee_id": "EMP001", "date": today, "in_time": "09:00"})
+
+    rollup = await monthly_rollup_collection.find_one({"_id": f"{built_month}:EMP001"})
+    assert rollup["by_status"] == {"Incomplete": 1}
+
+    await client.post("/attendance/mark-out", json={"employee_id": "EMP001", "date": today, "out_time": "18:00"})
+    rollup = await monthly_rollup_collection.find_one({"_id": f"{built_month}:EMP001"})
+    assert rollup["by_status"] == {"Incomplete": 0, "Present": 1}
+    assert (rollup["marked_days"], rollup["worked_minutes"]) == (1, 540)
+
+
+async def test_unbuilt_months_are_not_adjusted(client, today):
+    await add_employee(client, "EMP001")
+    await client.post("/attendance/mark-in", json={"employee_id": "EMP001", "date": today, "in_time": "09:00"})
+    assert await monthly_rollup_collection.count_documents({}) == 0
+
+
+async def test_first_request_builds_the_month_from_raw_attendance(client, today):
+    for employee_id in ("EMP001", "EMP002"):
+        await add_employee(client, employee_id)
+    await mark_in(client, "EMP001", today, "9:00")
+    await client.post("/attendance/mark-out", json={"employee_id": "EMP001", "date": today, "out_time": "17:30"})
+    await client.post("/attendance/mark-absent", json={"employee_id": "EMP002", "date": today})
+
+    response = await client.get("/reports/monthly", params={"month": today[:7]})
+
+    rows = rows_by_employee(response.json())
+    assert (rows["EMP001"]["early_exits"], rows["EMP001"]["hours_worked"]) == (1, 8.5)
+    assert rows["EMP002"]["absences"] == 1
+    assert await report_months_collection.count_documents({"_id": today[:7], "built_at": {"$exists": True}}) == 1
+
+
+async def test_write_during_a_build_is_not_lost(client, today, monkeypatch):
+    month = today[:7]
+    for employee_id in ("EMP001", "EMP002"):
+        await add_employee(client, employee_id)
+    await mark_in(client, "EMP001", today)
+    count_month = reports._count_month
+
+    async def count_then_write(*args):
+        counted = await count_month(*args)
+        if args == (month,):
+            # Land after the build counted raw attendance, before it stores the result
+            await client.post("/attendance/mark-out", json={"employee_id": "EMP001", "date": today, "out_time": "18:00"})
+            await mark_in(client, "EMP002", today)
+        return counted
+
+    monkeypatch.setattr(reports, "_count_month", count_then_write)
+    await reports.build_month(month)
+
+    first = await monthly_rollup_collection.find_one({"_id": f"{month}:EMP001"})
+    assert ({k: v for k, v in first["by_status"].items() if v}, first["worked_minutes"]) == ({"Present": 1}, 540)
+    second = await monthly_rollup_collection.find_one({"_id": f"{month}:EMP002"})
+    assert (second["by_status"], second["marked_days"]) == ({"Incomplete": 1}, 1)
+
+
+async def test_rebuild_drops_rollups_no_record_backs(client, today, built_month):
+    await add_employee(client, "EMP002")
+    await mark_in(client, "EMP002", today)
+    await monthly_rollup_collection.insert_one(
+        {"_id": f"{built_month}:EMP003", "month": built_month, "employee_id": "EMP003", "marked_days": 4}
+    )
+
+    await client.post("/reports/monthly/rebuild", params={"month": built_month})
+
+    assert [doc["employee_id"] async for doc in monthly_rollup_collection.find({"month": built_month})] == ["EMP002"]
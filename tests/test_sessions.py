@@ -0,0 +1,68 @@
+import pytest
+
+from database import admins_collection
+from services import passwords, sessions
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def admin(client):
+    await admins_collection.insert_one({
+        "username": "admin",
+        "full_name": "System Administrator",
+        "password_hash": passwords.hash_password_sync("Admin@123"),
+    })
+
+
+async def login(client, password: str):
+    return await client.post("/admin/login", json={"username": "admin", "password": password})
+
+
+async def test_protected_routes_need_a_session(client):
+    response = await client.get("/employees", headers={"Authorization": ""})
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+@pytest.mark.parametrize("token", ["garbage", "local.e30.AAAA"])
+async def test_invalid_tokens_are_rejected(client, token):
+    response = await client.get("/employees", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+async def test_expired_token_is_rejected(client):
+    token, _ = sessions.issue_token("tests", "Test Runner", "admin", ttl=-1)
+    response = await client.get("/employees", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+async def test_login_issues_a_working_token(client, admin):
+    response = await login(client, "Admin@123")
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+
+    response = await client.get("/admin/info", headers={"Authorization": f"Bearer {token}"})
+    assert response.json() == {"username": "admin", "full_name": "System Administrator", "role": "admin"}
+
+
+async def test_wrong_password_is_rejected(client, admin):
+    assert (await login(client, "wrong")).status_code == 401
+
+
+async def test_logout_revokes_the_token(client, admin):
+    token = (await login(client, "Admin@123")).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert (await client.post("/admin/logout", headers=headers)).status_code == 200
+    assert (await client.get("/employees", headers=headers)).status_code == 401
+
+
+async def test_admin_lookup_needs_a_session(client, admin):
+    response = await client.get("/admin/info", params={"username": "admin"}, headers={"Authorization": ""})
+    assert response.status_code == 401
+
+
+async def test_query_plan_diagnostics_need_a_session(client):
+    response = await client.get("/health/query-plans", headers={"Authorization": ""})
+    assert response.status_code == 401